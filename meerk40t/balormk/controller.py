@@ -205,6 +205,24 @@ BUSY = 0x04
 READY = 0x20
 
 
+class CompiledList:
+    """
+    Ready to send list packets of a job. The packets are the complete 0xC00 byte lists in the order they are sent, the
+    tail is the last partial list which is still open when the job returns to rapid mode.
+    """
+
+    def __init__(self, start):
+        self.start = start
+        self.end = start
+        self.port_bits = 0
+        self.packets = []
+        self.tail = None
+        self.tail_index = 0
+
+    def __len__(self):
+        return len(self.packets) + (1 if self.tail_index else 0)
+
+
 def _bytes_to_words(r):
     b0 = r[1] << 8 | r[0]
     b1 = r[3] << 8 | r[2]
@@ -281,6 +299,8 @@ class GalvoController:
         self._number_of_list_packets = 0
         self.paused = False
 
+        self._recording = None
+
     def set_disable_connect(self, status):
         self._disable_connect = status
 
@@ -424,28 +444,37 @@ class GalvoController:
             self.write_port()
             self.set_fiber_mo(1)
         else:
-            self.mode = DRIVER_STATE_PROGRAM
-            self.reset_list()
-            self.port_on(bit=0)
-            self.write_port()
-            self.set_fiber_mo(1)
-            self._ready = None
-            self._speed = None
-            self._travel_speed = None
-            self._frequency = None
-            self._power = None
-            self._pulse_width = None
+            self._program_single_start()
+            self._program_list_start()
 
-            self._delay_jump = None
-            self._delay_on = None
-            self._delay_off = None
-            self._delay_poly = None
-            self._delay_end = None
-            self.list_ready()
-            if self.service.delay_openmo != 0:
-                self.list_delay_time(int(self.service.delay_openmo * 100))
-            self.list_write_port()
-            self.list_jump_speed(self.service.default_rapid_speed)
+    def _program_single_start(self):
+        self.mode = DRIVER_STATE_PROGRAM
+        self.reset_list()
+        self.port_on(bit=0)
+        self.write_port()
+        self.set_fiber_mo(1)
+
+    def _reset_list_settings(self):
+        self._ready = None
+        self._speed = None
+        self._travel_speed = None
+        self._frequency = None
+        self._power = None
+        self._pulse_width = None
+
+        self._delay_jump = None
+        self._delay_on = None
+        self._delay_off = None
+        self._delay_poly = None
+        self._delay_end = None
+
+    def _program_list_start(self):
+        self._reset_list_settings()
+        self.list_ready()
+        if self.service.delay_openmo != 0:
+            self.list_delay_time(int(self.service.delay_openmo * 100))
+        self.list_write_port()
+        self.list_jump_speed(self.service.default_rapid_speed)
 
     def light_mode(self):
         if self.mode == DRIVER_STATE_LIGHT:
@@ -482,6 +511,8 @@ class GalvoController:
 
     def _list_end(self):
         if self._active_list and self._active_index:
+            if self._recording is not None:
+                self._recording.packets.append(bytes(self._active_list))
             self.wait_ready()
             while self.paused:
                 time.sleep(0.3)
@@ -511,6 +542,30 @@ class GalvoController:
         )
         self._active_index += 12
 
+    def _list_write_rows(self, rows):
+        """
+        Writes packed commands into the list, starting new lists as they fill.
+
+        @param rows: array of commands, 6 little endian words each
+        @return:
+        """
+        import numpy as np
+
+        data = np.ascontiguousarray(rows, dtype="<u2").tobytes()
+        position = 0
+        while position < len(data):
+            if self._active_index >= 0xC00:
+                self._list_end()
+            if self._active_list is None:
+                self._list_new()
+            index = self._active_index
+            length = min(0xC00 - index, len(data) - position)
+            self._active_list[index : index + length] = data[
+                position : position + length
+            ]
+            self._active_index += length
+            position += length
+
     def _command(self, command, v1=0, v2=0, v3=0, v4=0, v5=0, read=True):
         cmd = struct.pack(
             "<6H", int(command), int(v1), int(v2), int(v3), int(v4), int(v5)
@@ -531,6 +586,62 @@ class GalvoController:
     def raw_clear(self):
         self._list_new()
 
+    #######################
+    # COMPILED LISTS
+    #######################
+
+    def begin_recording(self):
+        """
+        Records the list packets sent from here on, until end_recording is called.
+
+        @return:
+        """
+        self._recording = CompiledList((self._last_x, self._last_y))
+
+    def end_recording(self):
+        """
+        Ends the recording. The list which is still open becomes the tail of the recording.
+
+        @return: CompiledList or None if nothing was recorded.
+        """
+        compiled = self._recording
+        self._recording = None
+        if compiled is None:
+            return None
+        if self._active_list is not None and self._active_index:
+            compiled.tail = bytes(self._active_list)
+            compiled.tail_index = self._active_index
+        compiled.end = (self._last_x, self._last_y)
+        compiled.port_bits = self._port_bits
+        return compiled
+
+    def replay(self, compiled, aborted=None):
+        """
+        Sends a compiled job from rapid mode, which ends in program mode exactly as if the job had been given command
+        by command. Only the abort and pause checks are performed between the packets.
+
+        @param compiled: CompiledList
+        @param aborted: function returning whether the job should abort
+        @return: whether the job was entirely sent
+        """
+        self._program_single_start()
+        self._reset_list_settings()
+        for packet in compiled.packets:
+            if aborted is not None and aborted():
+                self.abort()
+                return False
+            self._active_list = packet
+            self._active_index = len(packet)
+            self._list_end()
+        if compiled.tail_index:
+            self._active_list = bytearray(compiled.tail)
+        else:
+            self._active_list = None
+        self._active_index = compiled.tail_index
+        self._last_x, self._last_y = compiled.end
+        self._port_bits = compiled.port_bits
+        return True
+
     #######################
     # SETS FOR PLOTLIKES
     #######################
@@ -670,6 +781,114 @@ class GalvoController:
             self.list_jump_speed(self._dark_speed)
         self.list_jump(x, y, long=long, short=short, distance_limit=distance_limit)
 
+    def plot_points(self, x, y, marks=None, powers=None):
+        """
+        Writes the marks and jumps to many points into the list at once. The commands are packed together rather than
+        one by one, and are the same as calling power(powers[i]) and then mark(x[i], y[i]), or goto(x[i], y[i]) where
+        marks[i] is False, for each point in turn. Power commands which would not change the power are left out.
+
+        @param x: array of x positions
+        @param y: array of y positions
+        @param marks: optional boolean array, False for the points which are jumped to rather than marked
+        @param powers: optional array of powers in percent, nan for the points which keep the current power
+        @return:
+        """
+        import numpy as np
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        count = len(x)
+        if count == 0:
+            return
+        if marks is None:
+            marks = np.ones(count, dtype=bool)
+        else:
+            marks = np.asarray(marks, dtype=bool)
+        if self._wobble and marks.any():
+            # Wobble patterns are generated per mark.
+            for i in range(count):
+                if powers is not None and not np.isnan(powers[i]):
+                    self.power(float(powers[i]))
+                if marks[i]:
+                    self.mark(x[i], y[i])
+                else:
+                    self.goto(x[i], y[i])
+            return
+        rows = np.zeros((count, 3, 6), dtype="<u2")
+        present = np.zeros((count, 3), dtype=bool)
+
+        if powers is not None:
+            powers = np.asarray(powers, dtype=float)
+            given = np.flatnonzero(~np.isnan(powers))
+            values = powers[given]
+            previous = np.empty(len(values))
+            previous[:1] = np.nan if self._power is None else self._power
+            previous[1:] = values[:-1]
+            changed = values != previous
+            given = given[changed]
+            values = values[changed]
+            if len(values):
+                rows[given, 0, 0] = listMarkCurrent
+                rows[given, 0, 1] = np.round(values * 0xFFF / 100.0).astype(int)
+                present[given, 0] = True
+                self._power = float(values[-1])
+
+        # Moves out of range are not performed, moves to the current position are skipped.
+        valid = np.flatnonzero((x >= 0) & (x <= 0xFFFF) & (y >= 0) & (y <= 0xFFFF))
+        vx = x[valid]
+        vy = y[valid]
+        px = np.empty(len(valid))
+        py = np.empty(len(valid))
+        px[:1] = self._last_x
+        py[:1] = self._last_y
+        px[1:] = np.trunc(vx[:-1])
+        py[1:] = np.trunc(vy[:-1])
+        moved = (vx != px) | (vy != py)
+        kept = valid[moved]
+        if len(kept) == 0:
+            self._list_write_rows(rows[present])
+            return
+        kx = x[kept].astype(np.int64)
+        ky = y[kept].astype(np.int64)
+        lx = np.empty(len(kept))
+        ly = np.empty(len(kept))
+        lx[0] = self._last_x
+        ly[0] = self._last_y
+        lx[1:] = kx[:-1]
+        ly[1:] = ky[:-1]
+        distance = np.minimum(np.hypot(x[kept] - lx, y[kept] - ly), 0xFFFF)
+        kept_marks = marks[kept]
+        rows[kept, 2, 0] = np.where(kept_marks, listMarkTo, listJumpTo)
+        rows[kept, 2, 1] = kx
+        rows[kept, 2, 2] = ky
+        rows[kept, 2, 4] = distance.astype(np.int64)
+        present[kept, 2] = True
+
+        # The speeds only change before the first mark and the first jump.
+        first = kept[kept_marks][:1]
+        if len(first) and self._mark_speed is not None:
+            self._speed_row(rows, present, first[0], listMarkSpeed, self._mark_speed)
+        first = kept[~kept_marks][:1]
+        if len(first) and self._goto_speed is not None:
+            self._speed_row(rows, present, first[0], listJumpSpeed, self._goto_speed)
+
+        self._list_write_rows(rows[present])
+        self._last_x = int(kx[-1])
+        self._last_y = int(ky[-1])
+
+    def _speed_row(self, rows, present, index, command, speed):
+        if command == listMarkSpeed:
+            if self._speed == speed:
+                return
+            self._speed = speed
+        else:
+            if self._travel_speed == speed:
+                return
+            self._travel_speed = speed
+        rows[index, 1, 0] = command
+        rows[index, 1, 1] = min(self._convert_speed(speed), 0xFFFF)
+        present[index, 1] = True
+
     def set_xy(self, x, y):
         distance = int(abs(complex(x, y) - complex(self._last_x, self._last_y)))
         if distance > 0xFFFF:
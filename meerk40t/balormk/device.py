@@ -15,6 +15,7 @@ from meerk40t.balormk.liveselectionlightjob import LiveSelectionLightJob
 from meerk40t.core.laserjob import LaserJob
 from meerk40t.core.spoolers import Spooler
 from meerk40t.core.units import Angle, Length, ViewPort
+from meerk40t.device.basedevice import register_estimate_choices
 from meerk40t.kernel import Service, signal_listener, CommandSyntaxError
 from meerk40t.svgelements import Path, Point, Polygon
 
@@ -207,6 +208,17 @@ class BalorDevice(Service, ViewPort):
                 "section": "_10_Parameters",
                 "tip": _("Number of curve interpolation points"),
             },
+            {
+                "attr": "curve_tolerance",
+                "object": self,
+                "default": "0.01mm",
+                "type": Length,
+                "label": _("Curve Tolerance"),
+                "tip": _(
+                    "Maximal distance of the interpolated curves from the curves, 0 interpolates a fixed number of points."
+                ),
+                "section": "_10_Parameters",
+            },
             {
                 "attr": "mock",
                 "object": self,
@@ -704,6 +716,7 @@ class BalorDevice(Service, ViewPort):
             swap_xy=self.swap_xy,
         )
         self.spooler = Spooler(self)
+        register_estimate_choices(self)
         self.driver = BalorDriver(self)
         self.spooler.driver = self.driver
 
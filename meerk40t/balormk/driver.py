@@ -6,7 +6,7 @@ driver.
 """
 import time
 
-from meerk40t.balormk.controller import GalvoController
+from meerk40t.balormk.controller import DRIVER_STATE_RAPID, GalvoController
 from meerk40t.core.cutcode.cubiccut import CubicCut
 from meerk40t.core.cutcode.dwellcut import DwellCut
 from meerk40t.core.cutcode.gotocut import GotoCut
@@ -18,9 +18,25 @@ from meerk40t.core.cutcode.plotcut import PlotCut
 from meerk40t.core.cutcode.quadcut import QuadCut
 from meerk40t.core.cutcode.setorigincut import SetOriginCut
 from meerk40t.core.cutcode.waitcut import WaitCut
-from meerk40t.core.drivers import PLOT_FINISH, PLOT_JOG, PLOT_RAPID, PLOT_SETTING
+from meerk40t.core.drivers import (
+    PLOT_FINISH,
+    PLOT_JOG,
+    PLOT_RAPID,
+    PLOT_SETTING,
+    curve_points,
+    curve_tolerance,
+)
 from meerk40t.core.plotplanner import PlotPlanner
 
+try:
+    import numpy as np
+except ImportError:
+    # Plotcuts are marked point by point.
+    np = None
+
+# Points given to the controller between the loop checks of a plotcut.
+PLOT_CHUNK = 1024
+
 
 class BalorDriver:
     def __init__(self, service, force_mock=False):
@@ -47,6 +63,8 @@ class BalorDriver:
         self.plot_planner.settings_then_jog = True
         self._aborting = False
         self._list_bits = None
+        # (cutcode, state, CompiledList) of the last job.
+        self._compiled = None
 
     def __repr__(self):
         return f"BalorDriver({self.name})"
@@ -142,6 +160,9 @@ class BalorDriver:
         """
         This is called after all the cutcode objects are sent. This says it shouldn't expect more cutcode for a bit.
 
+        If the same cutcode is sent again with unchanged settings, as each loop of a job does, the list packets recorded
+        while sending it the first time are sent again rather than being rebuilt.
+
         @return:
         """
         # preprocess queue to establish steps
@@ -149,12 +170,142 @@ class BalorDriver:
         con._light_speed = None
         con._dark_speed = None
         con._goto_speed = None
-        con.program_mode()
-        self._list_bits = con._port_bits
-        last_on = None
-        con.set_wobble(None)
         queue = self.queue
         self.queue = list()
+        state = self._job_state(queue)
+        compiled = self._compiled_for(queue, state)
+        if (
+            compiled is not None
+            and con.mode == DRIVER_STATE_RAPID
+            and con.get_last_xy() == compiled.start
+        ):
+            if not con.replay(compiled, self._replay_aborted):
+                return
+        else:
+            record = con.mode == DRIVER_STATE_RAPID and self._compilable(queue)
+            if record:
+                con.begin_recording()
+            con.program_mode()
+            self._list_bits = con._port_bits
+            con.set_wobble(None)
+            if not self._plot_queue(queue):
+                con.end_recording()
+                con.abort()
+                self._aborting = False
+                return
+            con.list_delay_time(int(self.service.delay_end / 10.0))
+            if record:
+                self._compiled = queue, state, con.end_recording()
+        self._list_bits = None
+        con.rapid_mode()
+
+        if self.service.redlight_preferred:
+            con.light_on()
+            con.write_port()
+        else:
+            con.light_off()
+            con.write_port()
+
+    def _compilable(self, queue):
+        """
+        Cutcode waiting on software checked inputs leaves program mode within the job, it is never compiled.
+        """
+        if self.service.input_operation_hardware:
+            return True
+        for q in queue:
+            if isinstance(q, InputCut):
+                return False
+        return True
+
+    def _job_state(self, queue):
+        """
+        Values the list packets of the cutcode depend upon, beyond the cutcode objects themselves.
+        """
+        settings = {}
+        penboxes = {}
+        for q in queue:
+            s = q.settings
+            if s is None or id(s) in settings:
+                continue
+            settings[id(s)] = dict(s)
+            penbox = s.get("penbox_value")
+            if penbox is not None:
+                try:
+                    penboxes[penbox] = repr(self.service.elements.penbox[penbox])
+                except (KeyError, AttributeError):
+                    penboxes[penbox] = None
+        service = [
+            (key, value)
+            for key, value in vars(self.service).items()
+            if isinstance(value, (int, float, str))
+        ]
+        return list(settings.values()), penboxes, service
+
+    def _compiled_for(self, queue, state):
+        """
+        Finds the recorded packets of the given cutcode, if it was recorded with the same state.
+        """
+        if self._compiled is None:
+            return None
+        compiled_queue, compiled_state, compiled = self._compiled
+        if compiled is None or len(compiled_queue) != len(queue):
+            return None
+        for a, b in zip(compiled_queue, queue):
+            if a is not b:
+                return None
+        if compiled_state != state:
+            return None
+        return compiled
+
+    def _replay_aborted(self):
+        if self._aborting:
+            self._aborting = False
+            return True
+        while self.paused:
+            time.sleep(0.05)
+        return False
+
+    def _plot_points(self, q, last_on):
+        """
+        Marks the points of the plotcut, scaling the power by their on values. The points are given to the controller
+        in chunks, with the loop checks between chunks.
+
+        @param q: PlotCut
+        @param last_on: on value of the last point marked
+        @return: on value of the last point, False if the job was aborted.
+        """
+        con = self.connection
+        plot = np.array(q.plot[1:], dtype=float).reshape((-1, 3))
+        if not len(plot):
+            return last_on
+        settings = self.plot_planner.settings
+        current_power = float(settings.get("power", self.service.default_power)) / 10.0
+        on = plot[:, 2]
+        previous = np.empty(len(on))
+        previous[0] = np.nan if last_on is None else last_on
+        previous[1:] = on[:-1]
+        # q.plot can have different on values, the power changes with them.
+        powers = np.where(on != previous, current_power * on, np.nan)
+        for i in range(0, len(plot), PLOT_CHUNK):
+            # LOOP CHECKS
+            if self._aborting:
+                return False
+            while self.paused:
+                time.sleep(0.05)
+            chunk = slice(i, i + PLOT_CHUNK)
+            con.plot_points(plot[chunk, 0], plot[chunk, 1], powers=powers[chunk])
+        return q.plot[-1][2]
+
+    def _plot_queue(self, queue):
+        """
+        Gives the list commands of the cutcode to the controller.
+
+        @param queue: cutcode objects
+        @return: False if the job was aborted.
+        """
+        con = self.connection
+        last_on = None
+        tolerance = curve_tolerance(self.service)
         for q in queue:
             settings = q.settings
             penbox = settings.get("penbox_value")
@@ -167,9 +318,7 @@ class BalorDriver:
             con.set_wobble(settings)
             # LOOP CHECKS
             if self._aborting:
-                con.abort()
-                self._aborting = False
-                return
+                return False
             if isinstance(q, LineCut):
                 last_x, last_y = con.get_last_xy()
                 x, y = q.start
@@ -181,32 +330,40 @@ class BalorDriver:
                 x, y = q.start
                 if last_x != x or last_y != y:
                     con.goto(x, y)
-                interp = self.service.interpolate
-                step_size = 1.0 / float(interp)
-                t = step_size
-                for p in range(int(interp)):
+                points = curve_points(q, tolerance, self.service.interpolate)
+                if np is None:
+                    for p in points:
+                        # LOOP CHECKS
+                        if self._aborting:
+                            return False
+                        while self.paused:
+                            time.sleep(0.05)
+                        con.mark(*p)
+                    continue
+                points = np.array(points, dtype=float).reshape((-1, 2))
+                for i in range(0, len(points), PLOT_CHUNK):
                     # LOOP CHECKS
                     if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
+                        return False
                     while self.paused:
                         time.sleep(0.05)
-
-                    p = q.point(t)
-                    con.mark(*p)
-                    t += step_size
+                    chunk = points[i : i + PLOT_CHUNK]
+                    con.plot_points(chunk[:, 0], chunk[:, 1])
             elif isinstance(q, PlotCut):
                 last_x, last_y = con.get_last_xy()
                 x, y = q.start
                 if last_x != x or last_y != y:
                     con.goto(x, y)
+                if not self.value_penbox and np is not None:
+                    # We are using traditional power-scaling
+                    last_on = self._plot_points(q, last_on)
+                    if last_on is False:
+                        return False
+                    continue
                 for x, y, on in q.plot[1:]:
                     # LOOP CHECKS
                     if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
+                        return False
                     while self.paused:
                         time.sleep(0.05)
 
@@ -271,9 +428,7 @@ class BalorDriver:
                 for x, y, on in self.plot_planner.gen():
                     # LOOP CHECKS
                     if self._aborting:
-                        con.abort()
-                        self._aborting = False
-                        return
+                        return False
                     while self.paused:
                         time.sleep(0.05)
 
@@ -330,16 +485,7 @@ class BalorDriver:
                                 )
                                 con.power(current_power * on)
                         con.mark(x, y)
-        con.list_delay_time(int(self.service.delay_end / 10.0))
-        self._list_bits = None
-        con.rapid_mode()
-
-        if self.service.redlight_preferred:
-            con.light_on()
-            con.write_port()
-        else:
-            con.light_off()
-            con.write_port()
+        return True
 
     def move_abs(self, x, y):
         """
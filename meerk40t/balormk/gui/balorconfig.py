@@ -35,6 +35,7 @@ class BalorConfiguration(MWindow):
             ("balor-global", "Global"),
             ("balor-global-timing", "Timings"),
             ("balor-extra", "Extras"),
+            ("estimate", "Time Estimate"),
         )
         self.panels = []
         for item in options:
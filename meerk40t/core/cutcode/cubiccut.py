@@ -63,6 +63,23 @@ class CubicCut(CutObject):
             end[1],
         )
 
+    def steps(self):
+        start = self.start
+        c1 = self.c1()
+        c2 = self.c2()
+        end = self.end
+        x, y = ZinglPlotter.plot_cubic_bezier_array(
+            start[0],
+            start[1],
+            c1[0],
+            c1[1],
+            c2[0],
+            c2[1],
+            end[0],
+            end[1],
+        )
+        yield x, y, None
+
     def point(self, t):
         x0, y0 = self.start
         x1, y1 = self.c1()
@@ -72,3 +89,23 @@ class CubicCut(CutObject):
         x = e * e * e * x0 + 3 * e * e * t * x1 + 3 * e * t * t * x2 + t * t * t * x3
         y = e * e * e * y0 + 3 * e * e * t * y1 + 3 * e * t * t * y2 + t * t * t * y3
         return x, y
+
+    def flatten(self, tolerance):
+        """
+        Points along the curve after its start, ending with its end. The curve is subdivided adaptively, the line
+        segments between the points stay within tolerance of the curve.
+
+        @param tolerance: maximal distance of the line segments from the curve
+        @return: list of (x, y) points
+        """
+        from ...tools.geomstr import Geomstr
+
+        geometry = Geomstr()
+        geometry.cubic(
+            complex(*self.start),
+            complex(*self.c1()),
+            complex(*self.c2()),
+            complex(*self.end),
+        )
+        points = geometry.as_polylines(tolerance)[0][1:]
+        return list(zip(points.real.tolist(), points.imag.tolist()))
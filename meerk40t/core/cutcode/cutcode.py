@@ -97,6 +97,20 @@ class CutCode(CutGroup):
             yield "plot", cutobject
         yield "plot_start"
 
+    def generate_count(self, driver=None):
+        """
+        Number of driver steps generate() gives, without generating them.
+
+        @param driver: driver executing the steps, steps the driver lacks are not counted.
+        @return: step count
+        """
+        count = 0
+        if driver is None or hasattr(driver, "plot"):
+            count += sum(1 for _ in self.flat())
+        if driver is None or hasattr(driver, "plot_start"):
+            count += 1
+        return count
+
     def provide_statistics(self, include_start=False):
         result = []
         cutcode = list(self.flat())
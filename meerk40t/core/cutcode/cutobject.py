@@ -1,4 +1,5 @@
 from ...svgelements import Point
+from ..plotplanner import plot_steps
 
 
 class CutObject:
@@ -151,6 +152,14 @@ class CutObject:
     def generator(self):
         raise NotImplementedError
 
+    def steps(self):
+        """
+        Plots of the generator() as numpy arrays, for the batch processing of the plotplanner.
+
+        @return: generator of x, y, on arrays
+        """
+        return plot_steps(self.generator())
+
     def point(self, t):
         raise NotImplementedError
 
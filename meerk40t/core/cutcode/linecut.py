@@ -26,6 +26,16 @@ class LineCut(CutObject):
         end = self.end
         return ZinglPlotter.plot_line(start[0], start[1], end[0], end[1])
 
+    def steps(self):
+        x, y = self.plot_array()
+        yield x, y, None
+
+    def plot_array(self):
+        # pylint: disable=unsubscriptable-object
+        start = self.start
+        end = self.end
+        return ZinglPlotter.plot_line_array(start[0], start[1], end[0], end[1])
+
     def point(self, t):
         x0, y0 = self.start
         x1, y1 = self.end
@@ -52,6 +52,21 @@ class QuadCut(CutObject):
             end[1],
         )
 
+    def steps(self):
+        # pylint: disable=unsubscriptable-object
+        start = self.start
+        c = self.c()
+        end = self.end
+        x, y = ZinglPlotter.plot_quad_bezier_array(
+            start[0],
+            start[1],
+            c[0],
+            c[1],
+            end[0],
+            end[1],
+        )
+        yield x, y, None
+
     def point(self, t):
         x0, y0 = self.start
         x1, y1 = self.c()
@@ -60,3 +75,22 @@ class QuadCut(CutObject):
         x = e * e * x0 + 2 * e * t * x1 + t * t * x2
         y = e * e * y0 + 2 * e * t * y1 + t * t * y2
         return x, y
+
+    def flatten(self, tolerance):
+        """
+        Points along the curve after its start, ending with its end. The curve is subdivided adaptively, the line
+        segments between the points stay within tolerance of the curve.
+
+        @param tolerance: maximal distance of the line segments from the curve
+        @return: list of (x, y) points
+        """
+        from ...tools.geomstr import Geomstr
+
+        geometry = Geomstr()
+        geometry.quad(
+            complex(*self.start),
+            complex(*self.c()),
+            complex(*self.end),
+        )
+        points = geometry.as_polylines(tolerance)[0][1:]
+        return list(zip(points.real.tolist(), points.imag.tolist()))
@@ -1,10 +1,18 @@
+from array import array
+from bisect import bisect_left
+from math import hypot
+
 from meerk40t.core.cutcode.cutobject import CutObject
-from meerk40t.tools.rasterplotter import RasterPlotter
+from meerk40t.tools.rasterplotter import NumpyRasterPlotter, RasterPlotter
 
 
 class RasterCut(CutObject):
     """
     Rastercut accepts an image of type "L" or "1", and an offset in the x and y.
+
+    The plotted raster can be run-length encoded once with encode(). Each run is the position
+    at which a run of equal pixels along a scanline ends and the value of that run. Once encoded,
+    the generator, length and position queries iterate the runs rather than the image pixels.
     """
 
     def __init__(
@@ -54,8 +62,18 @@ class RasterCut(CutObject):
             def image_filter(pixel):
                 return (255 - pixel) / 255.0
 
-        self.plot = RasterPlotter(
-            data=image.load(),
+        try:
+            import numpy  # noqa: F401
+
+            # Filter is applied to the whole image at once.
+            plotter = NumpyRasterPlotter
+            data = image
+        except ImportError:
+            plotter = RasterPlotter
+            data = image.load()
+
+        self.plot = plotter(
+            data=data,
             width=self.width,
             height=self.height,
             horizontal=self.horizontal,
@@ -70,6 +88,8 @@ class RasterCut(CutObject):
             step_y=self.step_y,
             filter=image_filter,
         )
+        self._runs = None
+        self._distances = None
 
     def reversible(self):
         return False
@@ -97,45 +117,65 @@ class RasterCut(CutObject):
     def left(self):
         return self.plot.offset_x
 
+    def encode(self):
+        """
+        Run-length encode the raster plot. This is done only once, later calls return the
+        existing encoding.
+
+        @return: x, y, on arrays of the run ends
+        """
+        if self._runs is not None:
+            return self._runs
+        xs = array("l")
+        ys = array("l")
+        ons = array("d")
+        distances = array("d")
+        distance = 0.0
+        last_x, last_y = self.start
+        for x, y, on in self.plot.plot():
+            xs.append(x)
+            ys.append(y)
+            ons.append(on)
+            distance += hypot(x - last_x, y - last_y)
+            distances.append(distance)
+            last_x = x
+            last_y = y
+        self._runs = xs, ys, ons
+        self._distances = distances
+        if isinstance(self.plot, NumpyRasterPlotter):
+            # Pixel arrays are no longer required.
+            self.plot.clear()
+        return self._runs
+
+    def runs(self):
+        """
+        Iterate the encoded runs of the raster as x, y, on.
+        """
+        return zip(*self.encode())
+
+    def position_at(self, fraction):
+        """
+        Position of the laser after the given fraction of the raster length is done.
+
+        @param fraction: 0 to 1 ratio of the raster length
+        @return: x, y position
+        """
+        xs, ys, ons = self.encode()
+        if not xs:
+            return self.start
+        distances = self._distances
+        index = bisect_left(distances, fraction * distances[-1])
+        index = min(index, len(xs) - 1)
+        return xs[index], ys[index]
+
     def length(self):
-        # a crosshatch will be translated into two passes,
-        # so we have either a clear horizontal or a clear vertical
-        # orientation
-        # Self.scan_x * width in pixel = real width
-        # Overscan is as well in device units
-        if self.horizontal:
-            result = (
-                self.width * self.height
-                + (2 * self.scan * self.height)
-                + (self.height * self.step_y)
-            )
-            scanlines = self.height
-            ss = self.step_y
-            sd = self.width
-        else:
-            result = (
-                self.width * self.height
-                + (2 * self.scan * self.height)
-                + (self.width * self.step_x)
-            )
-            scanlines = self.width
-            sd = self.height
-            ss = self.step_y
-        # The variable name is misleading, if True -> burn in one direction, if False -> burn back and forth
-        if self.bidirectional:
-            scanlines *= 2
-        msc = self.scan
-        myresult = scanlines * (sd * ss + msc)
-        # mm = self.settings.get("native_mm", 39.3701)
-        # iw = self.width * self.step_x / mm
-        # ih = self.height * self.step_y / mm
-        # print (f"Flags: bidir={self.bidirectional}, hor={self.horizontal}")
-        # print (f"Length {'horizontal' if self.horizontal else 'vertical'} Rastercut: Image: {self.width} x {self.height}")
-        # print (f"Supposed dimensions: {iw:.1f}mm x {ih:.1f}mm ({iw/25.4:.1f}in x {ih/25.4:.1f}in)")
-        # print (f"Scanlines: {scanlines}, Step-X: {self.step_x:.2f}, Step-Y: {self.step_y:.2f}")
-        # print (f"Overscan: {self.scan}, Direction: {'back and forth' if self.bidirectional else 'one direction only'}")
-        # print (f"Result in device-units: {result:.1f} ({myresult:.1f}), mm={result/mm:.1f} ({myresult/mm:.1f})")
-        return myresult
+        """
+        Distance travelled by the laser head over all runs of the raster.
+        """
+        self.encode()
+        if not self._distances:
+            return 0
+        return self._distances[-1]
 
     def extra(self):
         return self.width * 0.105  # 105ms for the turnaround.
@@ -150,4 +190,10 @@ class RasterCut(CutObject):
         return 1 if self.plot.start_on_top else -1
 
     def generator(self):
-        return self.plot.plot()
+        return self.runs()
+
+    def steps(self):
+        import numpy as np
+
+        xs, ys, ons = self.encode()
+        yield np.asarray(xs), np.asarray(ys), np.asarray(ons)
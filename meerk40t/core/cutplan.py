@@ -14,6 +14,9 @@ CutPlan handles the various complicated algorithms to optimising the sequence of
     those inside the same curves so that raster burns are fully optimised.
 """
 
+import random
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import copy
 from os import times
 from time import time
@@ -48,6 +51,14 @@ class CutPlan:
     5. Preopt: Preoptimize adds in the relevant optimization operations into the cutcode.
     6. Optimize: This calls the added functions set during the preopt process.
         a. Calls `execute` operation.
+
+    With more than one worker (`opt_workers`, or the `workers` set for the plan) the operations are processed
+    concurrently in a thread pool. The commands each operation added during preprocess run in parallel with those of
+    the other operations, and the operations are converted to cutcode in parallel during blob. The results keep the
+    original order of the plan.
+
+    Operations copied from the tree are stored in the operation cache of the planner once processed. Planning the
+    same unchanged operation again reuses that processed copy, skipping its preprocess and validate stages.
     """
 
     def __init__(self, name, planner):
@@ -56,6 +67,15 @@ class CutPlan:
         self.plan = list()
         self.spool_commands = list()
         self.commands = list()
+        # id(copy) -> operation in the tree, for the copied operations of the plan.
+        self.origins = dict()
+        # (operation, fingerprint, copy) of the copies to be stored in the operation cache once processed.
+        self._uncached = list()
+        # id(command) -> id of the operation which added the command during preprocess.
+        self._command_groups = dict()
+        self._pool = None
+        self._workers = None
+        self.travel_time_limit = None
         self.channel = self.context.channel("optimize", timestamp=True)
         # self.setting(bool, "opt_rasters_split", True)
 
@@ -73,6 +93,31 @@ class CutPlan:
             parts.append("-- Empty --")
         return " ".join(parts)
 
+    def _operation_cache(self):
+        """
+        The operation cache of the planner, if enabled.
+        """
+        if not getattr(self.context, "opt_operation_cache", False):
+            return None
+        return getattr(self.context, "operation_cache", None)
+
+    @property
+    def workers(self):
+        """
+        Number of worker threads used to process the operations. This is the count set for this plan, or else the
+        `opt_workers` setting.
+        """
+        if self._workers is not None:
+            return self._workers
+        try:
+            return max(1, int(self.context.opt_workers))
+        except (AttributeError, TypeError, ValueError):
+            return 1
+
+    @workers.setter
+    def workers(self, value):
+        self._workers = value
+
     def execute(self):
         """
         Execute runs all the commands built during `preprocess` and `preopt` (preoptimize) stages.
@@ -85,8 +130,60 @@ class CutPlan:
             # Executing command can add a command, complete them all.
             commands = self.commands[:]
             self.commands.clear()
-            for command in commands:
+            workers = self.workers
+            if workers <= 1:
+                for command in commands:
+                    self._command_groups.pop(id(command), None)
+                    command()
+                continue
+            self._execute_parallel(commands, workers)
+        if self._uncached:
+            # The copies are processed.
+            cache = self._operation_cache()
+            if cache is not None:
+                for origin, fingerprint, op in self._uncached:
+                    cache.put(origin, fingerprint, op)
+            self._uncached.clear()
+
+    def _execute_parallel(self, commands, workers):
+        """
+        Runs the commands of different operations concurrently. The commands of each operation run in their
+        original order. Commands which belong to no operation run alone, after all commands before them.
+
+        @param commands: commands to execute
+        @param workers: number of worker threads
+        @return:
+        """
+        groups = dict()
+
+        def run_groups():
+            if len(groups) == 1:
+                for group in groups.values():
+                    run_group(group)
+            elif groups:
+                with ThreadPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+                    futures = [pool.submit(run_group, g) for g in groups.values()]
+                for future in futures:
+                    # Raises the first failure in plan order.
+                    future.result()
+            groups.clear()
+
+        def run_group(group):
+            for c in group:
+                c()
+
+        for command in commands:
+            key = self._command_groups.pop(id(command), None)
+            if key is None:
+                run_groups()
                 command()
+            else:
+                group = groups.get(key)
+                if group is None:
+                    groups[key] = [command]
+                else:
+                    group.append(command)
+        run_groups()
 
     def final(self):
         """
@@ -128,10 +225,23 @@ class CutPlan:
         # if rotary.rotary_enabled:
         #     axis = rotary.axis
 
-        for op in self.plan:
+        cache = self._operation_cache()
+        for index, op in enumerate(self.plan):
             if not hasattr(op, "type"):
                 continue
             if op.type.startswith("op"):
+                origin = self.origins.pop(id(op), None)
+                if cache is not None and origin is not None:
+                    fingerprint = cache.fingerprint(
+                        origin, matrix, context.device, context.elements.penbox
+                    )
+                    processed = cache.get(origin, fingerprint)
+                    if processed is not None:
+                        # Unchanged since it was last processed, no preprocess or validate needed.
+                        self.plan[index] = processed
+                        continue
+                    self._uncached.append((origin, fingerprint, op))
+                first = len(self.commands)
                 if hasattr(op, "preprocess"):
                     op.preprocess(self.context, matrix, self)
                 for node in op.flat():
@@ -139,6 +249,9 @@ class CutPlan:
                         continue
                     if hasattr(node, "preprocess"):
                         node.preprocess(self.context, matrix, self)
+                # The commands of each operation may run in parallel with those of other operations.
+                for command in self.commands[first:]:
+                    self._command_groups[id(command)] = id(op)
 
     def _to_grouped_plan(self, plan):
         """
@@ -262,18 +375,29 @@ class CutPlan:
             settings = (
                 settings_dict if op.implicit_passes == passes else dict(settings_dict)
             )
-            cutcode = CutCode(
-                op.as_cutobjects(
-                    closed_distance=context.opt_closed_distance,
-                    passes=passes,
-                ),
-                settings=settings,
-            )
-            if len(cutcode) == 0:
+
+            def convert(settings=settings, pass_idx=pass_idx):
+                cutcode = CutCode(
+                    op.as_cutobjects(
+                        closed_distance=context.opt_closed_distance,
+                        passes=passes,
+                    ),
+                    settings=settings,
+                )
+                if len(cutcode) == 0:
+                    return None
+                cutcode.constrained = op.type == "op cut" and context.opt_inner_first
+                cutcode.pass_index = pass_idx if force_idx is None else force_idx
+                cutcode.original_op = op.type
+                return cutcode
+
+            if self._pool is not None:
+                # Converted by the pool, blob collects the result in plan order.
+                yield self._pool.submit(convert)
+                continue
+            cutcode = convert()
+            if cutcode is None:
                 break
-            cutcode.constrained = op.type == "op cut" and context.opt_inner_first
-            cutcode.pass_index = pass_idx if force_idx is None else force_idx
-            cutcode.original_op = op.type
             yield cutcode
 
     def _to_merged_plan(self, blob_plan):
@@ -367,10 +491,23 @@ class CutPlan:
             return
         context = self.context
         grouped_plan = list(self._to_grouped_plan(self.plan))
-        if context.opt_merge_ops and not context.opt_merge_passes:
-            blob_plan = list(self._to_blob_plan_passes_first(grouped_plan))
-        else:
-            blob_plan = list(self._to_blob_plan(grouped_plan))
+        workers = self.workers
+        if workers > 1:
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            if context.opt_merge_ops and not context.opt_merge_passes:
+                blob_plan = list(self._to_blob_plan_passes_first(grouped_plan))
+            else:
+                blob_plan = list(self._to_blob_plan(grouped_plan))
+            if self._pool is not None:
+                blob_plan = [
+                    b.result() if isinstance(b, Future) else b for b in blob_plan
+                ]
+                blob_plan = [b for b in blob_plan if b is not None]
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
         self.plan.clear()
         self.plan.extend(self._to_merged_plan(blob_plan))
 
@@ -411,20 +548,48 @@ class CutPlan:
         elif context.opt_inner_first:
             self.commands.append(self.optimize_cuts)
         self.commands.append(self.merge_cutcode)
+        self.commands.append(self.encode_rasters)
         if context.opt_reduce_directions:
             pass
         if context.opt_remove_overlap:
             pass
 
-    def optimize_travel_2opt(self):
+    def optimize_travel_2opt(self, time_limit=None):
         """
         Optimize travel 2opt at optimize stage on cutcode
+
+        With a time limit (in seconds) the time-budgeted 2-opt/Or-opt optimizer is used instead of
+        fixed 2-opt passes. The budget is shared between cutcode objects by their size. If not
+        given, the limit is taken from the plan's `travel_time_limit` and then the
+        `opt_2opt_time_limit` setting, where 0 means fixed passes.
         @return:
         """
+        if time_limit is None:
+            time_limit = self.travel_time_limit
+        if time_limit is None:
+            time_limit = self.context.opt_2opt_time_limit
         channel = self.context.channel("optimize", timestamp=True)
+        if not time_limit or time_limit <= 0:
+            for i, c in enumerate(self.plan):
+                if isinstance(c, CutCode):
+                    self.plan[i] = short_travel_cutcode_2opt(
+                        self.plan[i], channel=channel
+                    )
+            return
+        sizes = [
+            len(list(c.flat())) if isinstance(c, CutCode) else 0 for c in self.plan
+        ]
+        total = sum(sizes)
+        deadline = time() + time_limit
         for i, c in enumerate(self.plan):
-            if isinstance(c, CutCode):
-                self.plan[i] = short_travel_cutcode_2opt(self.plan[i], channel=channel)
+            if not isinstance(c, CutCode) or not sizes[i]:
+                continue
+            remaining = deadline - time()
+            share = remaining * sizes[i] / total
+            total -= sizes[i]
+            self.plan[i] = short_travel_cutcode_oropt(
+                self.plan[i], time_limit=max(share, 0.0), channel=channel
+            )
 
     def optimize_cuts(self):
         """
@@ -518,9 +683,26 @@ class CutPlan:
                 prev.extend(cur)
                 del self.plan[i]
 
+    def encode_rasters(self):
+        """
+        Run-length encode all raster cuts, so the plot planner, length calculations and simulation
+        share the same runs rather than each walking the raster image.
+        @return:
+        """
+        for op in self.plan:
+            if not isinstance(op, CutCode):
+                continue
+            for cut in op.flat():
+                if isinstance(cut, RasterCut):
+                    cut.encode()
+
     def clear(self):
         self.plan.clear()
         self.commands.clear()
+        self._workers = None
+        self.origins.clear()
+        self._uncached.clear()
+        self._command_groups.clear()
 
 
 def is_inside(inner, outer, tolerance=0):
@@ -646,6 +828,75 @@ def correct_empty(context: CutGroup):
             del context[index]
 
 
+def _group_outline(group):
+    """
+    Flattened outline of the cutgroup path, as complex numpy array. The curves are flattened to a thousandth of the
+    size of the path.
+
+    @param group: cutgroup
+    @return: outline or None if the group has no path.
+    """
+    import numpy as np
+
+    from ..tools.geomstr import Geomstr
+
+    path = getattr(group, "path", None)
+    if path is None:
+        return None
+    geometry = Geomstr.svg(path)
+    segments = geometry.segments[: geometry.index]
+    if not len(segments):
+        return None
+    # The curves lie within the hull of their control points.
+    controls = segments[:, (0, 1, 3, 4)]
+    size = abs(complex(np.ptp(controls.real), np.ptp(controls.imag)))
+    polylines = geometry.as_polylines(tolerance=size / 1000.0)
+    if not polylines:
+        return None
+    return np.concatenate(polylines)
+
+
+def _points_inside(points, polygon, tolerance=0):
+    """
+    Tests whether the points are inside the closed polygon, within tolerance along the x-axis, by counting the edge
+    intercepts on the horizontal line through each point.
+
+    @param points: complex numpy array of points
+    @param polygon: complex numpy array of the polygon
+    @param tolerance: wiggle room
+    @return: boolean numpy array
+    """
+    import numpy as np
+
+    if polygon[0] != polygon[-1]:
+        polygon = np.append(polygon, polygon[0])
+    starts = polygon[:-1]
+    ends = polygon[1:]
+    sx, sy = starts.real, starts.imag
+    ex, ey = ends.real, ends.imag
+    low = np.minimum(sy, ey)
+    high = np.maximum(sy, ey)
+    q = low != high
+    sx, sy, ex, ey, low, high = sx[q], sy[q], ex[q], ey[q], low[q], high[q]
+    slope = (ex - sx) / (ey - sy)
+
+    results = np.zeros(len(points), dtype=bool)
+    chunk = max(1, 1000000 // max(1, len(sx)))
+    for i in range(0, len(points), chunk):
+        px = points[i : i + chunk].real[:, None]
+        py = points[i : i + chunk].imag[:, None]
+        crossing = (low < py) & (py <= high)
+        intercept = sx + (py - sy) * slope
+        count = np.sum(crossing, axis=1)
+        # Intercepts wholly to the left of the point, and those up to the point.
+        left = np.sum(crossing & (intercept < px - tolerance), axis=1)
+        upto = np.sum(crossing & (intercept <= px + tolerance), axis=1)
+        # Inside the span between the intercepts 2k and 2k + 1, if 2k + 1 >= left and 2k < upto.
+        pair = left // 2
+        results[i : i + chunk] = (2 * pair < upto) & (pair < count // 2)
+    return results
+
+
 def inner_first_ident(context: CutGroup, channel=None, tolerance=0):
     """
     Identifies closed CutGroups and then identifies any other CutGroups which
@@ -656,6 +907,9 @@ def inner_first_ident(context: CutGroup, channel=None, tolerance=0):
 
     The Cutcode is resequenced in either short_travel_cutcode or inner_selection_cutcode
     based on this information, as used in the
+
+    Each group path is flattened once. Candidate pairs are found by sweeping the bounding boxes sorted by their
+    left edge, only the candidates are tested for all their outline points being inside the outer outline.
     """
     if channel:
         start_time = time()
@@ -666,16 +920,74 @@ def inner_first_ident(context: CutGroup, channel=None, tolerance=0):
     closed_groups = [g for g in groups if isinstance(g, CutGroup) and g.closed]
     context.contains = closed_groups
 
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
     constrained = False
-    for outer in closed_groups:
-        for inner in groups:
-            if outer is inner:
-                continue
-            # if outer is inside inner, then inner cannot be inside outer
-            if inner.contains and outer in inner.contains:
-                continue
+    if np is None:
+        for outer in closed_groups:
+            for inner in groups:
+                if outer is inner:
+                    continue
+                # if outer is inside inner, then inner cannot be inside outer
+                if inner.contains and outer in inner.contains:
+                    continue
 
-            if is_inside(inner, outer, tolerance):
+                if is_inside(inner, outer, tolerance):
+                    constrained = True
+                    if outer.contains is None:
+                        outer.contains = list()
+                    outer.contains.append(inner)
+
+                    if inner.inside is None:
+                        inner.inside = list()
+                    inner.inside.append(outer)
+    else:
+        outlines = [
+            _group_outline(g) if isinstance(g, CutGroup) else None for g in groups
+        ]
+        index = {id(g): i for i, g in enumerate(groups)}
+        bounds = np.full((len(groups), 4), np.nan)
+        for i, outline in enumerate(outlines):
+            if outline is not None:
+                bounds[i] = (
+                    np.min(outline.real),
+                    np.min(outline.imag),
+                    np.max(outline.real),
+                    np.max(outline.imag),
+                )
+        # Sweep order, sorted by left edge. Groups without outline are sorted last.
+        order = np.argsort(bounds[:, 0], kind="stable")
+        sorted_minx = bounds[order, 0]
+        for outer in closed_groups:
+            o = index[id(outer)]
+            polygon = outlines[o]
+            if polygon is None:
+                continue
+            x0, y0, x1, y1 = bounds[o]
+            # The flattened outline may lie within the flattening tolerance of the path.
+            slack = tolerance + abs(complex(x1 - x0, y1 - y0)) / 1000.0
+            lo = np.searchsorted(sorted_minx, x0 - slack, side="left")
+            hi = np.searchsorted(sorted_minx, x1 + slack, side="right")
+            candidates = order[lo:hi]
+            b = bounds[candidates]
+            candidates = np.sort(
+                candidates[
+                    (b[:, 1] >= y0 - slack)
+                    & (b[:, 2] <= x1 + slack)
+                    & (b[:, 3] <= y1 + slack)
+                    & (candidates != o)
+                ]
+            )
+            for i in candidates:
+                inner = groups[i]
+                # if outer is inside inner, then inner cannot be inside outer
+                if inner.contains and outer in inner.contains:
+                    continue
+                if not np.all(_points_inside(outlines[i], polygon, tolerance)):
+                    continue
                 constrained = True
                 if outer.contains is None:
                     outer.contains = list()
@@ -708,11 +1020,268 @@ def inner_first_ident(context: CutGroup, channel=None, tolerance=0):
     return context
 
 
+class _KDNode:
+    __slots__ = (
+        "minx",
+        "miny",
+        "maxx",
+        "maxy",
+        "alive",
+        "low",
+        "high",
+        "entries",
+        "parent",
+    )
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.low = None
+        self.high = None
+        self.entries = None
+        self.alive = 0
+        self.minx = self.miny = self.maxx = self.maxy = 0
+
+
+class CutEndpointIndex:
+    """
+    KD-tree over the start and end points of the candidate cuts within a CutCode, used by
+    short_travel_cutcode to find the nearest candidate without rescanning every cut.
+
+    The tree is static, built once per optimization. Burned cuts are deleted by decrementing the
+    alive counts of the nodes containing them, so exhausted branches are never visited again.
+
+    Each entry is the list [x, y, order, cut, group, dead, leaf]. The order is the position the
+    endpoint would have within `CutCode.candidate()`, which is used to break ties exactly as the
+    linear scan would.
+    """
+
+    LEAF_SIZE = 8
+
+    def __init__(self, context: CutCode, complete_path: Optional[bool] = False):
+        self.entries = dict()
+        points = list()
+        order = 0
+        for grp in context:
+            if complete_path and not grp.closed and isinstance(grp, CutGroup):
+                # Only the ends of non-closed subpaths are candidates.
+                eligible = (grp[0], grp[-1]) if len(grp) else ()
+            else:
+                eligible = None
+            for cut in grp.flat():
+                order += 2
+                if eligible is not None and not any(cut is e for e in eligible):
+                    continue
+                cut_entries = list()
+                if not complete_path or cut.closed or cut.first:
+                    s = cut.start
+                    cut_entries.append([s[0], s[1], order, cut, grp, False, None])
+                if cut.reversible() and (not complete_path or cut.closed or cut.last):
+                    e = cut.end
+                    cut_entries.append([e[0], e[1], order + 1, cut, grp, False, None])
+                if cut_entries:
+                    self.entries[id(cut)] = cut_entries
+                    points.extend(cut_entries)
+        # Groups that take part in inner-first grouping.
+        self.grouped = [
+            grp for grp in context if grp.contains is not None or grp.inside is not None
+        ]
+        self.root = self._build(points, None, 0) if points else None
+
+    def _build(self, points, parent, depth):
+        node = _KDNode(parent)
+        node.alive = len(points)
+        node.minx = min(p[0] for p in points)
+        node.maxx = max(p[0] for p in points)
+        node.miny = min(p[1] for p in points)
+        node.maxy = max(p[1] for p in points)
+        if len(points) <= self.LEAF_SIZE:
+            node.entries = points
+            for p in points:
+                p[6] = node
+            return node
+        axis = 0 if (node.maxx - node.minx) >= (node.maxy - node.miny) else 1
+        points.sort(key=lambda p: p[axis])
+        mid = len(points) // 2
+        node.low = self._build(points[:mid], node, depth + 1)
+        node.high = self._build(points[mid:], node, depth + 1)
+        return node
+
+    def remove(self, cut):
+        """
+        Removes the endpoints of the given cut from the index.
+        """
+        cut_entries = self.entries.pop(id(cut), None)
+        if cut_entries is None:
+            return
+        for entry in cut_entries:
+            entry[5] = True
+            node = entry[6]
+            while node is not None:
+                node.alive -= 1
+                node = node.parent
+
+    def nearest(self, x, y, distance=float("inf"), valid=None):
+        """
+        Finds the nearest live endpoint strictly closer than distance for which valid(entry) holds.
+
+        Distances of 0.1 or less are treated as zero and the lowest candidate order wins, matching
+        the early exit of the linear scan.
+
+        @param x: x position
+        @param y: y position
+        @param distance: exclusive upper bound of distance
+        @param valid: function taking an entry and returning whether it may be used.
+        @return: entry or None
+        """
+        if self.root is None:
+            return None
+        best = [distance, -1, None]
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.alive <= 0:
+                continue
+            dx = max(node.minx - x, 0, x - node.maxx)
+            dy = max(node.miny - y, 0, y - node.maxy)
+            bound = best[0] if best[0] > 0.1 else 0.1
+            if dx > bound or dy > bound or dx * dx + dy * dy > bound * bound:
+                continue
+            if node.entries is None:
+                low = node.low
+                high = node.high
+                # Push the farther child first so the nearer child is searched first.
+                if low.alive and high.alive:
+                    dlx = max(low.minx - x, 0, x - low.maxx)
+                    dly = max(low.miny - y, 0, y - low.maxy)
+                    dhx = max(high.minx - x, 0, x - high.maxx)
+                    dhy = max(high.miny - y, 0, y - high.maxy)
+                    if dlx * dlx + dly * dly <= dhx * dhx + dhy * dhy:
+                        stack.append(high)
+                        stack.append(low)
+                    else:
+                        stack.append(low)
+                        stack.append(high)
+                elif low.alive:
+                    stack.append(low)
+                elif high.alive:
+                    stack.append(high)
+                continue
+            for entry in node.entries:
+                if entry[5]:
+                    continue
+                d = abs(complex(entry[0] - x, entry[1] - y))
+                if d <= 0.1:
+                    d = 0
+                if d > best[0] or (d == best[0] and entry[2] > best[1]):
+                    continue
+                if valid is not None and not valid(entry):
+                    continue
+                best[0] = d
+                best[1] = entry[2]
+                best[2] = entry
+        return best[2]
+
+
+def _short_travel_linear(context, curr, distance, complete_path, grouped_inner):
+    """
+    Scans every candidate for the one nearest to curr, strictly closer than distance.
+
+    @return: closest, backwards tuple.
+    """
+    closest = None
+    backwards = False
+    for cut in context.candidate(
+        complete_path=complete_path, grouped_inner=grouped_inner
+    ):
+        s = cut.start
+        if (
+            abs(s[0] - curr.real) <= distance
+            and abs(s[1] - curr.imag) <= distance
+            and (not complete_path or cut.closed or cut.first)
+        ):
+            d = abs(complex(s[0], s[1]) - curr)
+            if d < distance:
+                closest = cut
+                backwards = False
+                if d <= 0.1:  # Distance in px is zero, we cannot improve.
+                    break
+                distance = d
+
+        if not cut.reversible():
+            continue
+        e = cut.end
+        if (
+            abs(e[0] - curr.real) <= distance
+            and abs(e[1] - curr.imag) <= distance
+            and (not complete_path or cut.closed or cut.last)
+        ):
+            d = abs(complex(e[0], e[1]) - curr)
+            if d < distance:
+                closest = cut
+                backwards = True
+                if d <= 0.1:  # Distance in px is zero, we cannot improve.
+                    break
+                distance = d
+    return closest, backwards
+
+
+def _short_travel_indexed(index, curr, distance, grouped_inner):
+    """
+    Queries the endpoint index for the candidate nearest to curr, strictly closer than distance.
+
+    This gives the same result as _short_travel_linear, the candidate rules of `CutCode.candidate()`
+    are applied as a validity check on each endpoint found.
+
+    @return: closest, backwards tuple.
+    """
+
+    def is_candidate(entry):
+        cut = entry[3]
+        if cut.burns_done >= cut.passes:
+            return False
+        grp = entry[4]
+        return not grp.contains_unburned_groups()
+
+    def is_grouped_candidate(entry):
+        if not is_candidate(entry):
+            return False
+        return is_grouped_inner(entry[4])
+
+    def is_grouped_inner(grp):
+        if grp.is_burned() or (grp.contains is None and grp.inside is None):
+            return False
+        if grp.contains is not None and grp.contains_unburned_groups():
+            return False
+        if grp.inside is not None:
+            for outer in grp.inside:
+                if outer.contains_burned_groups():
+                    return True
+            return False
+        return True
+
+    x = curr.real
+    y = curr.imag
+    if grouped_inner and index.grouped:
+        entry = index.nearest(x, y, distance, is_grouped_candidate)
+        if entry is None:
+            for grp in index.grouped:
+                if is_grouped_inner(grp):
+                    # Grouped candidates exist, but none are closer.
+                    return None, False
+            entry = index.nearest(x, y, distance, is_candidate)
+    else:
+        entry = index.nearest(x, y, distance, is_candidate)
+    if entry is None:
+        return None, False
+    return entry[3], bool(entry[2] & 1)
+
+
 def short_travel_cutcode(
     context: CutCode,
     channel=None,
     complete_path: Optional[bool] = False,
     grouped_inner: Optional[bool] = False,
+    spatial_index: Optional[bool] = True,
 ):
     """
     Selects cutcode from candidate cutcode (burns_done < passes in this CutCode),
@@ -722,6 +1291,9 @@ def short_travel_cutcode(
 
     We start at either 0,0 or the value given in `context.start`
 
+    With spatial_index the nearest candidate is found with a CutEndpointIndex rather than by
+    scanning all candidates for every cut, the resulting order is identical.
+
     This is time-intense hyper-optimized code, so it contains several seemingly redundant
     checks.
     """
@@ -729,7 +1301,10 @@ def short_travel_cutcode(
         start_length = context.length_travel(True)
         start_time = time()
         start_times = times()
-        channel("Executing Greedy Short-Travel optimization")
+        if spatial_index:
+            channel("Executing Greedy Short-Travel optimization (spatial index)")
+        else:
+            channel("Executing Greedy Short-Travel optimization")
         channel(f"Length at start: {start_length:.0f} steps")
 
     curr = context.start
@@ -741,6 +1316,10 @@ def short_travel_cutcode(
     for c in context.flat():
         c.burns_done = 0
 
+    index = None
+    if spatial_index:
+        index = CutEndpointIndex(context, complete_path=complete_path)
+
     ordered = CutCode()
     while True:
         closest = None
@@ -783,38 +1362,17 @@ def short_travel_cutcode(
         # Stay on path in same direction if gap <= 1/20" i.e. path not quite closed
         # Travel only if path is completely burned or gap > 1/20"
         if distance > 50:
-            for cut in context.candidate(
-                complete_path=complete_path, grouped_inner=grouped_inner
-            ):
-                s = cut.start
-                if (
-                    abs(s[0] - curr.real) <= distance
-                    and abs(s[1] - curr.imag) <= distance
-                    and (not complete_path or cut.closed or cut.first)
-                ):
-                    d = abs(complex(s[0], s[1]) - curr)
-                    if d < distance:
-                        closest = cut
-                        backwards = False
-                        if d <= 0.1:  # Distance in px is zero, we cannot improve.
-                            break
-                        distance = d
-
-                if not cut.reversible():
-                    continue
-                e = cut.end
-                if (
-                    abs(e[0] - curr.real) <= distance
-                    and abs(e[1] - curr.imag) <= distance
-                    and (not complete_path or cut.closed or cut.last)
-                ):
-                    d = abs(complex(e[0], e[1]) - curr)
-                    if d < distance:
-                        closest = cut
-                        backwards = True
-                        if d <= 0.1:  # Distance in px is zero, we cannot improve.
-                            break
-                        distance = d
+            if index is not None:
+                cut, reverse = _short_travel_indexed(
+                    index, curr, distance, grouped_inner
+                )
+            else:
+                cut, reverse = _short_travel_linear(
+                    context, curr, distance, complete_path, grouped_inner
+                )
+            if cut is not None:
+                closest = cut
+                backwards = reverse
 
         if closest is None:
             break
@@ -839,6 +1397,8 @@ def short_travel_cutcode(
                 backwards = True
 
         closest.burns_done += 1
+        if index is not None and closest.burns_done >= closest.passes:
+            index.remove(closest)
         c = copy(closest)
         if backwards:
             c.reverse()
@@ -904,7 +1464,7 @@ def short_travel_cutcode_2opt(context: CutCode, passes: int = 50, channel=None):
     if curr is None:
         curr = 0
     else:
-        curr = complex(curr)
+        curr = complex(*curr)
 
     current_pass = 1
     min_value = -1e-10  # Do not swap on rounding error.
@@ -912,7 +1472,12 @@ def short_travel_cutcode_2opt(context: CutCode, passes: int = 50, channel=None):
     endpoints = np.zeros((length, 4), dtype="complex")
     # start, index, reverse-index, end
     for i in range(length):
-        endpoints[i] = complex(ordered[i].start), i, ~i, complex(ordered[i].end)
+        endpoints[i] = (
+            complex(*ordered[i].start),
+            i,
+            ~i,
+            complex(*ordered[i].end),
+        )
     indexes0 = np.arange(0, length - 1)
     indexes1 = indexes0 + 1
 
@@ -1002,6 +1567,358 @@ def short_travel_cutcode_2opt(context: CutCode, passes: int = 50, channel=None):
     return ordered
 
 
+def _morton_order(np, points, shift):
+    """
+    Order of the points along a Z-order curve, with the grid shifted by the given fraction.
+    """
+    x = points.real - points.real.min()
+    y = points.imag - points.imag.min()
+    scale = max(x.max(), y.max(), 1.0)
+    x = ((x / scale + shift) * 0x7FFF).astype(np.uint64)
+    y = ((y / scale + shift) * 0x7FFF).astype(np.uint64)
+    code = np.zeros(len(points), dtype=np.uint64)
+    for bit in range(16):
+        code |= ((x >> np.uint64(bit)) & np.uint64(1)) << np.uint64(2 * bit)
+        code |= ((y >> np.uint64(bit)) & np.uint64(1)) << np.uint64(2 * bit + 1)
+    return np.argsort(code, kind="stable")
+
+
+def _endpoint_neighbors(np, points, count):
+    """
+    Approximate nearest neighbor lists for endpoints, endpoint 2 * i is the start and 2 * i + 1
+    the end of cut i. Candidates are taken from a window around each endpoint along several
+    shifted Z-order curves, endpoints of the same cut are never neighbors.
+
+    @param np: numpy module
+    @param points: complex array of endpoints
+    @param count: neighbors per endpoint
+    @return: list of neighbor lists
+    """
+    total = len(points)
+    window = max(count, 4)
+    offsets = np.array([o for o in range(-window, window + 1) if o != 0])
+    candidates = list()
+    for shift in (0.0, 0.25, 0.5, 0.75):
+        order = _morton_order(np, points, shift)
+        rank = np.empty(total, dtype=int)
+        rank[order] = np.arange(total)
+        positions = np.clip(rank[:, None] + offsets[None, :], 0, total - 1)
+        candidates.append(order[positions])
+    candidates = np.sort(np.concatenate(candidates, axis=1), axis=1)
+    dists = np.abs(points[candidates] - points[:, None])
+    own = np.arange(total)[:, None]
+    dists[(candidates >> 1) == (own >> 1)] = np.inf
+    # Windows overlap, the same candidate may appear more than once.
+    dists[:, 1:][candidates[:, 1:] == candidates[:, :-1]] = np.inf
+    nearest = np.argsort(dists, axis=1, kind="stable")[:, :count]
+    candidates = np.take_along_axis(candidates, nearest, axis=1)
+    valid = np.isfinite(np.take_along_axis(dists, nearest, axis=1))
+    if valid.all():
+        return candidates.tolist()
+    neighbors = [
+        [q for q, v in zip(row, row_valid) if v]
+        for row, row_valid in zip(candidates.tolist(), valid.tolist())
+    ]
+    return neighbors
+
+
+def short_travel_cutcode_oropt(
+    context: CutCode,
+    time_limit: float = 1.0,
+    neighbors: int = 8,
+    channel=None,
+):
+    """
+    Time-budgeted travel optimization combining 2-opt segment reversal with Or-opt relocation
+    of chains of up to three cuts, using numpy.
+
+    Moves are only tried between endpoints that are near each other, as given by the neighbor
+    lists. When no improving move remains, the order is perturbed with a local double-bridge and
+    improved again until time_limit seconds have elapsed or perturbations stop finding
+    improvements. The best order found is returned, so
+    the result is never longer than the given order. Cuts that are not reversible are never
+    reversed.
+
+    Like 2-opt this does not perform inner first optimizations.
+
+    @param context: cutcode to be optimized
+    @param time_limit: time budget in seconds
+    @param neighbors: number of neighbors considered per endpoint
+    @param channel: Channel to send data about the optimization process.
+    @return:
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return context
+
+    deadline = time() + time_limit
+    if channel:
+        start_length = context.length_travel(True)
+        start_time = time()
+        start_times = times()
+        channel(f"Executing Or-Opt Short-Travel optimization ({time_limit:.2f}s)")
+        channel(f"Length at start: {start_length:.0f} steps")
+
+    ordered = CutCode(context.flat())
+    length = len(ordered)
+    if length <= 1:
+        if channel:
+            channel("Or-Opt: Not enough elements to optimize.")
+        return ordered
+
+    curr = context.start
+    if curr is None:
+        curr = 0
+    else:
+        curr = complex(*curr)
+
+    points = np.zeros(2 * length, dtype="complex")
+    for i, cut in enumerate(ordered):
+        points[2 * i] = complex(*cut.start)
+        points[2 * i + 1] = complex(*cut.end)
+    near = _endpoint_neighbors(np, points, neighbors)
+    pts = points.tolist()
+    reversible = [cut.reversible() for cut in ordered]
+    all_reversible = all(reversible)
+
+    # order[p] is the cut at position p, flip[p] whether that cut is reversed.
+    order = list(range(length))
+    flip = [False] * length
+    pos = list(range(length))
+
+    def a(p):
+        # Oriented start of the cut at position p.
+        c = order[p] << 1
+        return pts[c | 1] if flip[p] else pts[c]
+
+    def b(p):
+        # Oriented end of the cut at position p, position -1 is the start location.
+        if p < 0:
+            return curr
+        c = order[p] << 1
+        return pts[c] if flip[p] else pts[c | 1]
+
+    def edge(p):
+        # Travel from position p to position p + 1.
+        if p + 1 >= length:
+            return 0
+        return abs(b(p) - a(p + 1))
+
+    def can_reverse(i, j):
+        if all_reversible:
+            return True
+        for q in range(i, j + 1):
+            if not reversible[order[q]]:
+                return False
+        return True
+
+    def is_end(q):
+        # Whether endpoint q is currently the oriented end of its cut.
+        return bool(q & 1) != flip[pos[q >> 1]]
+
+    def reverse(i, j):
+        # Reverse positions i to j inclusive.
+        order[i : j + 1] = order[i : j + 1][::-1]
+        flip[i : j + 1] = [not f for f in flip[i : j + 1][::-1]]
+        for p, c in enumerate(order[i : j + 1], i):
+            pos[c] = p
+
+    def relocate(i, m, p, r):
+        # Move positions i to m after position p, reversed if r.
+        chain = order[i : m + 1]
+        chain_flip = flip[i : m + 1]
+        if r:
+            chain = chain[::-1]
+            chain_flip = [not f for f in chain_flip[::-1]]
+        del order[i : m + 1]
+        del flip[i : m + 1]
+        at = p + 1 if p < i else p + 1 - len(chain)
+        order[at:at] = chain
+        flip[at:at] = chain_flip
+        start = min(i, at)
+        for q, c in enumerate(order[start : max(m, p) + 1], start):
+            pos[c] = q
+
+    queue = deque(range(length))
+    queued = [True] * length
+
+    def push(*positions):
+        for p in positions:
+            if 0 <= p < length:
+                c = order[p]
+                if not queued[c]:
+                    queued[c] = True
+                    queue.append(c)
+
+    def try_2opt(p):
+        # Segment reversals which would connect an endpoint of the cut at p to a near endpoint.
+        c = order[p]
+        eb = (c << 1) | (0 if flip[p] else 1)
+        bp = b(p)
+        if p + 1 < length:
+            ap1 = a(p + 1)
+            base = abs(bp - ap1)
+            for q in near[eb]:
+                j = pos[q >> 1]
+                if j <= p or not is_end(q):
+                    continue
+                delta = abs(bp - pts[q]) - base
+                if j + 1 < length:
+                    delta += abs(ap1 - a(j + 1)) - abs(pts[q] - a(j + 1))
+                if delta < min_value and can_reverse(p + 1, j):
+                    reverse(p + 1, j)
+                    push(p, p + 1, j, j + 1)
+                    return delta
+        ea = eb ^ 1
+        ap = a(p)
+        bp0 = b(p - 1)
+        base = abs(bp0 - ap)
+        for q in near[ea]:
+            j = pos[q >> 1]
+            if j >= p or is_end(q):
+                continue
+            delta = (
+                abs(b(j - 1) - b(p - 1))
+                + abs(pts[q] - ap)
+                - abs(b(j - 1) - pts[q])
+                - base
+            )
+            if delta < min_value and can_reverse(j, p - 1):
+                reverse(j, p - 1)
+                push(j - 1, j, p - 1, p)
+                return delta
+        return 0
+
+    def try_oropt(i):
+        # Relocate chains of up to three cuts starting at position i next to a near endpoint.
+        before = b(i - 1)
+        ai = a(i)
+        for k in (1, 2, 3):
+            m = i + k - 1
+            if m >= length:
+                break
+            chain_reversible = can_reverse(i, m)
+            bm = b(m)
+            # Travel saved by taking the chain out of its current place.
+            saved = abs(before - ai)
+            if m + 1 < length:
+                am1 = a(m + 1)
+                saved += abs(bm - am1) - abs(before - am1)
+            ci = order[i] << 1
+            cm = order[m] << 1
+            ea = ci | (1 if flip[i] else 0)
+            eb = cm | (0 if flip[m] else 1)
+            for source, from_start in ((ea, True), (eb, False)):
+                for q in near[source]:
+                    j = pos[q >> 1]
+                    if i <= j <= m:
+                        continue
+                    if is_end(q):
+                        # Insert after j, chain meets q with the source endpoint.
+                        p = j
+                        r = not from_start
+                    else:
+                        # Insert before j, chain leaves the source endpoint towards q.
+                        p = j - 1
+                        r = from_start
+                    if p == i - 1 or p == m or (r and not chain_reversible):
+                        continue
+                    bp = b(p)
+                    if r:
+                        delta = abs(bp - bm) - saved
+                        last = ai
+                    else:
+                        delta = abs(bp - ai) - saved
+                        last = bm
+                    if p + 1 < length:
+                        ap1 = a(p + 1)
+                        delta += abs(last - ap1) - abs(bp - ap1)
+                    if delta < min_value:
+                        relocate(i, m, p, r)
+                        at = p + 1 if p < i else p + 1 - k
+                        push(i - 1, i, i + k - 1, i + k)
+                        push(at - 1, at, at + k - 1, at + k)
+                        return delta
+        return 0
+
+    def kick():
+        # Local double-bridge, segments A B C D become A C B D.
+        i = rng.randrange(-1, length - 3)
+        j = rng.randrange(i + 1, min(i + 30, length - 2))
+        k = rng.randrange(j + 1, min(j + 30, length - 1))
+        delta = (
+            abs(b(i) - a(j + 1)) + abs(b(k) - a(i + 1)) - edge(i) - edge(j) - edge(k)
+        )
+        if k + 1 < length:
+            delta += abs(b(j) - a(k + 1))
+        order[i + 1 : k + 1] = order[j + 1 : k + 1] + order[i + 1 : j + 1]
+        flip[i + 1 : k + 1] = flip[j + 1 : k + 1] + flip[i + 1 : j + 1]
+        for q, c in enumerate(order[i + 1 : k + 1], i + 1):
+            pos[c] = q
+        push(i, i + 1, i + k - j, i + k - j + 1, k, k + 1)
+        return delta
+
+    min_value = -1e-9
+    rng = random.Random(0)
+    cost = abs(curr - a(0)) + sum(edge(p) for p in range(length - 1))
+    best_cost = cost
+    best = order[:], flip[:]
+    moves = 0
+    kicks = 0
+    stale = 0
+    while True:
+        while queue and time() < deadline:
+            c = queue.popleft()
+            queued[c] = False
+            p = pos[c]
+            delta = try_2opt(p)
+            if delta == 0:
+                delta = try_oropt(p)
+            if delta != 0:
+                moves += 1
+                cost += delta
+                push(pos[c])
+        if cost < best_cost + min_value:
+            best_cost = cost
+            best = order[:], flip[:]
+            stale = 0
+        elif cost > best_cost:
+            # The perturbation did not lead to an improvement, return to the best order.
+            order[:] = best[0]
+            flip[:] = best[1]
+            for p, c in enumerate(order):
+                pos[c] = p
+            cost = best_cost
+            queue.clear()
+            queued[:] = [False] * length
+        if length < 5 or stale > 20 * length or time() >= deadline:
+            # Too small to perturb, no longer improving or out of time.
+            break
+        stale += 1
+        cost += kick()
+        kicks += 1
+
+    ordered.reordered([~c if f else c for c, f in zip(order, flip)])
+    if context.start is not None:
+        ordered._start_x, ordered._start_y = context.start
+    if channel:
+        end_times = times()
+        end_length = ordered.length_travel(True)
+        try:
+            change = (end_length - start_length) / start_length
+        except ZeroDivisionError:
+            change = 0
+        channel(
+            f"Length at end: {end_length:.0f} steps "
+            f"({change:+.0%}), "
+            f"optimized in {time() - start_time:.3f} "
+            f"elapsed seconds using {end_times[0] - start_times[0]:.3f} seconds CPU "
+            f"with {moves} moves and {kicks} perturbations"
+        )
+    return ordered
+
+
 def inner_selection_cutcode(
     context: CutCode, channel=None, grouped_inner: Optional[bool] = False
 ):
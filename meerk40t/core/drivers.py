@@ -14,6 +14,46 @@ PLOT_AXIS = 64
 PLOT_DIRECTION = 32
 
 
+def curve_tolerance(service):
+    """
+    Curve tolerance of the device in device units, the maximal distance of the interpolated curves from the curves.
+
+    @param service: device service with curve_tolerance and interpolate settings
+    @return: tolerance or None for interpolating a fixed number of points
+    """
+    tolerance = getattr(service, "curve_tolerance", None)
+    if not tolerance:
+        return None
+    try:
+        dx, dy = service.physical_to_device_length(tolerance, 0)
+    except ValueError:
+        return None
+    tolerance = abs(complex(dx, dy))
+    if not tolerance:
+        return None
+    return tolerance
+
+
+def curve_points(cut, tolerance, interpolate=50):
+    """
+    Interpolates a quad or cubic cut. With a tolerance the curve is flattened adaptively, otherwise it is divided
+    into interpolate equal steps.
+
+    @param cut: QuadCut or CubicCut
+    @param tolerance: curve_tolerance() of the device
+    @param interpolate: number of steps without a tolerance
+    @return: list of (x, y) points after the start of the cut, ending with its end.
+    """
+    if tolerance:
+        try:
+            return cut.flatten(tolerance)
+        except ImportError:
+            # Flattening requires numpy.
+            pass
+    interpolate = max(int(interpolate), 1)
+    return [cut.point((i + 1) / interpolate) for i in range(interpolate)]
+
+
 class Driver:
     """
     A driver is a class which implements the spoolable commands which are issued to the spooler by something in the
@@ -5915,14 +5915,39 @@ def init_commands(kernel):
     def undo_mark(data=None, **kwgs):
         self.undo.mark()
 
+    @self.console_argument(
+        "action", type=str, help=_("stats: report the memory used by the undo states")
+    )
     @self.console_command(
         "undo",
     )
-    def undo_undo(command, channel, _, **kwgs):
+    def undo_undo(command, channel, _, action=None, **kwgs):
+        if action is not None:
+            if action != "stats":
+                raise CommandSyntaxError
+            stats = self.undo.stats()
+            channel(_("Undo states: {states}").format(states=stats["states"]))
+            channel(
+                _("Nodes: {nodes}, distinct copies: {copies}, images: {images}").format(
+                    nodes=stats["nodes"], copies=stats["copies"], images=stats["images"]
+                )
+            )
+            if stats["limit"] is None:
+                limit = _("unlimited")
+            else:
+                limit = f"{stats['limit'] / 1048576:.1f} MB"
+            channel(
+                _("Memory: {memory} (limit: {limit})").format(
+                    memory=f"{stats['memory'] / 1048576:.1f} MB", limit=limit
+                )
+            )
+            return
         if not self.undo.undo():
             # At bottom of stack.
             channel("No undo available.")
             return
+        # Restored nodes are not notified as attached.
+        self.element_index.invalidate()
         self.validate_selected_area()
         channel(f"Undo: {self.undo}")
         self.signal("refresh_scene", "Scene")
@@ -5935,6 +5960,7 @@ def init_commands(kernel):
         if not self.undo.redo():
             channel("No redo available.")
             return
+        self.element_index.invalidate()
         channel(f"Redo: {self.undo}")
         self.validate_selected_area()
         self.signal("refresh_scene", "Scene")
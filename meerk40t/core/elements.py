@@ -13,6 +13,7 @@ from .node.op_engrave import EngraveOpNode
 from .node.op_image import ImageOpNode
 from .node.op_raster import RasterOpNode
 from .node.rootnode import RootNode
+from .spatialindex import BoundsGrid, ElementIndex, cell_size_for
 from .undos import Undo
 from .units import UNITS_PER_MIL, Length
 from .wordlist import Wordlist
@@ -404,9 +405,17 @@ class Elemental(Service):
         self._emphasized_bounds_painted = None
         self._emphasized_bounds_dirty = True
         self._tree = RootNode(self)
+        self.element_index = ElementIndex(lambda: self.elem_branch)
         self._save_restore_job = ConsoleFunction(self, ".save_restore_point\n", times=1)
 
-        self.undo = Undo(self._tree)
+        # Memory limit of the undo states in MB, 0 for unlimited.
+        self.setting(int, "undo_memory_limit", 512)
+        self.undo = Undo(
+            self._tree,
+            memory_limit=(
+                self.undo_memory_limit * 1048576 if self.undo_memory_limit > 0 else None
+            ),
+        )
         self.do_undo = True
         self.suppress_updates = False
 
@@ -1077,6 +1086,8 @@ class Elemental(Service):
         self.unlisten_tree(self)
 
     def service_attach(self, *args, **kwargs):
+        # Changes while detached were not seen by the element index.
+        self.element_index.invalidate()
         self.listen_tree(self)
 
     def shutdown(self, *args, **kwargs):
@@ -1137,16 +1148,18 @@ class Elemental(Service):
         self._emphasized_bounds = None
         self._emphasized_bounds_painted = None
 
-    def altered(self, *args):
+    def altered(self, node=None, *args, **kwargs):
         self._emphasized_bounds_dirty = True
         self._emphasized_bounds = None
         self._emphasized_bounds_painted = None
+        self.element_index.changed(node)
         self.prepare_undo()
 
-    def modified(self, *args):
+    def modified(self, node=None, *args, **kwargs):
         self._emphasized_bounds_dirty = True
         self._emphasized_bounds = None
         self._emphasized_bounds_painted = None
+        self.element_index.changed(node)
         self.prepare_undo()
 
     def translated(self, node=None, dx=0, dy=0, *args):
@@ -1156,6 +1169,7 @@ class Elemental(Service):
         self._emphasized_bounds_dirty = True
         self._emphasized_bounds = None
         self._emphasized_bounds_painted = None
+        self.element_index.changed(node)
         self.prepare_undo()
 
     def scaled(self, node=None, sx=1, sy=1, ox=0, oy=0, *args):
@@ -1165,12 +1179,15 @@ class Elemental(Service):
         self._emphasized_bounds_dirty = True
         self._emphasized_bounds = None
         self._emphasized_bounds_painted = None
+        self.element_index.changed(node)
         self.prepare_undo()
 
     def node_attached(self, node, **kwargs):
+        self.element_index.attached(node)
         self.prepare_undo()
 
     def node_detached(self, node, **kwargs):
+        self.element_index.detached(node)
         self.prepare_undo()
 
     def listen_tree(self, listener):
@@ -1635,6 +1652,9 @@ class Elemental(Service):
         If any element is emphasized, all references are highlighted.
         If any element is emphasized, all operations a references to that element are targeted.
         """
+        if emphasize is not None:
+            emphasize = list(emphasize)
+            emphasize_ids = set(id(e) for e in emphasize)
         for s in self._tree.flat():
             if s.highlighted:
                 s.highlighted = False
@@ -1643,7 +1663,7 @@ class Elemental(Service):
             if s.selected:
                 s.selected = False
 
-            in_list = emphasize is not None and s in emphasize
+            in_list = emphasize is not None and id(s) in emphasize_ids
             if s.emphasized:
                 if not in_list:
                     s.emphasized = False
@@ -1740,7 +1760,9 @@ class Elemental(Service):
         if keep_old_selection:
             for node in self.elems(emphasized=True):
                 e_list.append(node)
-        for node in self.elems_nodes(emphasized=False):
+        for node in self.element_index.at(position[0], position[1]):
+            if node.emphasized:
+                continue
             try:
                 bounds = node.bounds
             except AttributeError:
@@ -2875,10 +2897,18 @@ class Elemental(Service):
         return False
 
     def group_elements_overlap(self, g1, g2):
+        if len(g1) * len(g2) <= 64:
+            for e1 in g1:
+                for e2 in g2:
+                    if self.bbox_overlap(e1[1], e2[1]):
+                        return True
+            return False
+        grid = BoundsGrid(cell_size_for([e[1] for e in g2]))
+        for i, e2 in enumerate(g2):
+            grid.insert(i, e2[1])
         for e1 in g1:
-            for e2 in g2:
-                if self.bbox_overlap(e1[1], e2[1]):
-                    return True
+            if grid.query(e1[1]):
+                return True
         return False
 
     def remove_empty_groups(self):
@@ -0,0 +1,380 @@
+"""
+Motion Estimator
+
+The motion estimator gives the time a plan takes, modelling the motion of the laser head rather than assuming
+constant speed. The cuts of the plan are converted into a path of straight segments: lines, flattened curves, the
+runs of rasters and the travel between cuts. Each segment accelerates from the speed at its start towards its speed
+limit and decelerates to the speed at its end, with a trapezoidal speed profile. The speed at a junction is limited by
+the angle between the segments, as junction deviation limits it for grbl, and is zero at the start and end of travel
+and at reversals. The overscan of rasters is part of their runs, so it is travelled at the raster speed.
+
+The estimate is the sum of the components of the plan, each times its factor. The factors are fitted to the durations
+logged for completed jobs by calibrate(). The spooler logs the components of completed jobs unless the device setting
+estimate_log_motion is turned off.
+"""
+
+import numpy as np
+
+from .cutcode.cutcode import CutCode
+from .cutcode.cutgroup import CutGroup
+from .cutcode.dwellcut import DwellCut
+from .cutcode.linecut import LineCut
+from .cutcode.plotcut import PlotCut
+from .cutcode.rastercut import RasterCut
+from .cutcode.rawcut import RawCut
+from .cutcode.waitcut import WaitCut
+
+COMPONENTS = ("cut", "raster", "travel", "turnarounds", "cuts", "dwell")
+
+# Seconds per second of modelled motion, seconds per turnaround and per cut, seconds per second of dwell.
+DEFAULT_FACTORS = {
+    "cut": 1.0,
+    "raster": 1.0,
+    "travel": 1.0,
+    "turnarounds": 0.0,
+    "cuts": 0.0,
+    "dwell": 1.0,
+}
+
+CURVE_SEGMENTS = 16
+
+KIND_CUT = 0
+KIND_RASTER = 1
+KIND_TRAVEL = 2
+
+
+class MotionEstimator:
+    def __init__(
+        self,
+        acceleration=1000.0,
+        junction_deviation=0.05,
+        rapid_speed=None,
+        factors=None,
+    ):
+        """
+        @param acceleration: acceleration of the laser head in mm/s², 0 moves at constant speed.
+        @param junction_deviation: junction deviation in mm, limits the speed through corners.
+        @param rapid_speed: travel speed in mm/s, None uses the rapid speed of the cuts.
+        @param factors: factors of the components, see DEFAULT_FACTORS.
+        """
+        self.acceleration = acceleration
+        self.junction_deviation = junction_deviation
+        self.rapid_speed = rapid_speed
+        self.factors = dict(DEFAULT_FACTORS)
+        if factors is not None:
+            self.factors.update(factors)
+
+    def estimate(self, items):
+        """
+        Estimated seconds to execute the items.
+
+        @param items: plan items, the cutcode of which is estimated.
+        @return: seconds
+        """
+        return self.total(self.components(items))
+
+    def total(self, components):
+        """
+        Seconds of the given components with the factors of this estimator.
+        """
+        return sum(self.factors[key] * components.get(key, 0) for key in COMPONENTS)
+
+    def components(self, items):
+        """
+        Components of the motion of the items. Motion components are in seconds of the modelled motion, turnarounds
+        and cuts are counts, dwell is in seconds.
+
+        @param items: plan items, the cutcode of which is estimated.
+        @return: dict of components
+        """
+        path = _MotionPath()
+        components = dict.fromkeys(COMPONENTS, 0)
+        for item in items:
+            if not isinstance(item, CutCode):
+                continue
+            for cut in item.flat():
+                if isinstance(cut, (DwellCut, WaitCut)):
+                    if cut.dwell_time:
+                        components["dwell"] += cut.dwell_time / 1000.0
+                    continue
+                points = self.cut_points(cut)
+                if points is None:
+                    continue
+                components["cuts"] += 1
+                if isinstance(cut, RasterCut):
+                    components["turnarounds"] += self.turnarounds(cut)
+                settings = cut.settings
+                native_mm = settings.get("native_mm", 39.3701)
+                native_speed = settings.get(
+                    "native_speed", settings.get("speed", 0) * native_mm
+                )
+                if self.rapid_speed:
+                    rapid_speed = self.rapid_speed * native_mm
+                else:
+                    rapid_speed = settings.get("native_rapid_speed", native_speed)
+                path.add(
+                    points,
+                    KIND_RASTER if isinstance(cut, RasterCut) else KIND_CUT,
+                    native_speed,
+                    rapid_speed,
+                    self.acceleration * native_mm,
+                    self.junction_deviation * native_mm,
+                )
+        times, kinds = path.solve()
+        components["cut"] = float(times[kinds == KIND_CUT].sum())
+        components["raster"] = float(times[kinds == KIND_RASTER].sum())
+        components["travel"] = float(times[kinds == KIND_TRAVEL].sum())
+        return components
+
+    @staticmethod
+    def cut_points(cut):
+        """
+        Path of the cut as an array of points, or None if the cut does not move.
+
+        @param cut: cut object
+        @return: n x 2 array
+        """
+        if isinstance(cut, CutGroup):
+            return None
+        if isinstance(cut, RasterCut):
+            xs, ys, ons = cut.encode()
+            runs = np.column_stack((np.asarray(xs), np.asarray(ys)))
+            return np.concatenate((np.array([cut.start]), runs)).astype(float)
+        if isinstance(cut, (PlotCut, RawCut)):
+            if not len(cut.plot):
+                return None
+            return np.array([(p[0], p[1]) for p in cut.plot], dtype=float)
+        start = cut.start
+        end = cut.end
+        if start is None or end is None:
+            return None
+        if isinstance(cut, LineCut) or not hasattr(cut, "point"):
+            return np.array([start, end], dtype=float)
+        try:
+            t = np.linspace(0.0, 1.0, CURVE_SEGMENTS + 1)
+            x, y = cut.point(t)
+        except (NotImplementedError, TypeError):
+            return np.array([start, end], dtype=float)
+        points = np.column_stack((x, y))
+        points[0] = start
+        points[-1] = end
+        return points
+
+    @staticmethod
+    def turnarounds(cut):
+        """
+        Reversals of the raster along its major axis.
+
+        @param cut: raster cut
+        @return: count
+        """
+        xs, ys, ons = cut.encode()
+        major = np.asarray(xs if cut.major_axis() == 0 else ys)
+        direction = np.sign(np.diff(major))
+        direction = direction[direction != 0]
+        return int(np.count_nonzero(direction[1:] != direction[:-1]))
+
+    def calibrate(self, samples):
+        """
+        Fits the factors to the durations of logged jobs, the dwell factor remains. Factors of components which none
+        of the samples have remain. With fewer samples than components one common factor scales the estimate.
+
+        @param samples: list of components and seconds per pass
+        @return: fitted sample count
+        """
+        keys = [k for k in COMPONENTS if k != "dwell"]
+        keys = [k for k in keys if any(c.get(k, 0) for c, d in samples)]
+        if not samples or not keys:
+            return 0
+        a = np.array([[c.get(k, 0) for k in keys] for c, d in samples], dtype=float)
+        b = np.array(
+            [d - c.get("dwell", 0) * self.factors["dwell"] for c, d in samples]
+        )
+        if len(samples) < len(keys):
+            current = a @ np.array([self.factors[k] for k in keys])
+            if not current.any():
+                return 0
+            scale = max(float(current @ b / (current @ current)), 0.0)
+            for k in keys:
+                self.factors[k] *= scale
+            return len(samples)
+        # Least squares without negative factors, the most negative factor is dropped until none remain.
+        active = list(range(len(keys)))
+        solution = np.zeros(len(keys))
+        while active:
+            fit = np.linalg.lstsq(a[:, active], b, rcond=None)[0]
+            if (fit >= 0).all():
+                solution[active] = fit
+                break
+            del active[int(np.argmin(fit))]
+        for k, value in zip(keys, solution):
+            self.factors[k] = float(value)
+        return len(samples)
+
+
+class _MotionPath:
+    """
+    Straight segments of the motion, with the speed limit of each segment and of each junction.
+    """
+
+    def __init__(self):
+        self.points = []
+        self.kinds = []
+        self.speeds = []
+        self.accelerations = []
+        self.deviations = []
+        self.joins = []
+        self.position = None
+        self.kind = None
+
+    def add(self, points, kind, speed, rapid_speed, acceleration, deviation):
+        if self.position is None or (self.position != points[0]).any():
+            if self.position is not None:
+                self._add(
+                    np.array([self.position, points[0]]),
+                    KIND_TRAVEL,
+                    rapid_speed,
+                    acceleration,
+                    deviation,
+                    False,
+                )
+            join = False
+        else:
+            # Vector cuts continuing where the last cut ended are joined.
+            join = kind == KIND_CUT and self.kind == KIND_CUT
+        self._add(points, kind, speed, acceleration, deviation, join)
+        self.position = points[-1]
+        self.kind = kind
+
+    def _add(self, points, kind, speed, acceleration, deviation, join):
+        # Consecutive duplicate points are not moves.
+        keep = np.ones(len(points), dtype=bool)
+        keep[1:] = (points[1:] != points[:-1]).any(axis=1)
+        points = points[keep]
+        count = len(points) - 1
+        if count < 1:
+            return
+        self.points.append(points)
+        self.joins.append(join)
+        self.kinds.append(np.full(count, kind))
+        self.speeds.append(np.full(count, float(speed)))
+        self.accelerations.append(np.full(count, float(acceleration)))
+        self.deviations.append(np.full(count, float(deviation)))
+
+    def solve(self):
+        """
+        Time of each segment with the speed limits of the segments and junctions.
+
+        @return: times, kinds of the segments
+        """
+        if not self.points:
+            return np.zeros(0), np.zeros(0, dtype=int)
+        starts = np.concatenate([p[:-1] for p in self.points])
+        ends = np.concatenate([p[1:] for p in self.points])
+        # Segments of separate paths stop between them.
+        first = np.zeros(len(starts), dtype=bool)
+        path_starts = np.cumsum([0] + [len(p) - 1 for p in self.points[:-1]])
+        first[path_starts[~np.array(self.joins)]] = True
+        kinds = np.concatenate(self.kinds)
+        speeds = np.concatenate(self.speeds)
+        accelerations = np.concatenate(self.accelerations)
+        deviations = np.concatenate(self.deviations)
+
+        delta = ends - starts
+        lengths = np.hypot(delta[:, 0], delta[:, 1])
+        units = delta / lengths[:, None]
+        moving = speeds > 0
+        speeds = np.where(moving, speeds, 1.0)
+
+        # Junction speeds, squared. Straight junctions are limited by the segment speeds, reversals stop.
+        cos_theta = -np.einsum("ij,ij->i", units[:-1], units[1:])
+        sin_half = np.sqrt(np.clip((1.0 - cos_theta) / 2.0, 0.0, 1.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            junction = np.where(
+                sin_half < 1.0,
+                accelerations[1:] * deviations[1:] * sin_half / (1.0 - sin_half),
+                np.inf,
+            )
+        junction = np.minimum(junction, np.minimum(speeds[:-1], speeds[1:]) ** 2)
+        junction[first[1:]] = 0.0
+        limits = np.concatenate(([0.0], junction, [0.0]))
+
+        if (accelerations > 0).all():
+            # Reachable squared speeds are the minimum of the limits plus the speed gained since, both ways.
+            gain = 2.0 * accelerations * lengths
+            prefix = np.concatenate(([0.0], np.cumsum(gain)))
+            forward = prefix + np.minimum.accumulate(limits - prefix)
+            suffix = prefix[-1] - prefix
+            backward = suffix + np.minimum.accumulate((limits - suffix)[::-1])[::-1]
+            reachable = np.maximum(np.minimum(forward, backward), 0.0)
+            speed_in = np.sqrt(reachable[:-1])
+            speed_out = np.sqrt(reachable[1:])
+            # Trapezoidal profile, triangular if the speed limit is not reached.
+            peak_squared = (gain + speed_in**2 + speed_out**2) / 2.0
+            peak = np.sqrt(np.minimum(peak_squared, speeds**2))
+            times = (2.0 * peak - speed_in - speed_out) / accelerations
+            cruise = lengths - (2.0 * peak**2 - speed_in**2 - speed_out**2) / (
+                2.0 * accelerations
+            )
+            times += np.maximum(cruise, 0.0) / speeds
+        else:
+            times = lengths / speeds
+        times = np.where(moving, times, 0.0)
+        return times, kinds
+
+
+def device_estimator(device):
+    """
+    Motion estimator with the settings and calibrated factors of the device.
+
+    @param device: device service
+    @return: MotionEstimator
+    """
+    acceleration = device.setting(float, "estimate_acceleration", 1000.0)
+    deviation = device.setting(float, "estimate_junction_deviation", 0.05)
+    rapid_speed = device.setting(float, "estimate_rapid_speed", 0.0)
+    factors = {
+        key: device.setting(float, f"estimate_factor_{key}", value)
+        for key, value in DEFAULT_FACTORS.items()
+    }
+    return MotionEstimator(
+        acceleration=acceleration,
+        junction_deviation=deviation,
+        rapid_speed=rapid_speed if rapid_speed > 0 else None,
+        factors=factors,
+    )
+
+
+def logged_samples(logging, device):
+    """
+    Components and seconds per pass of the completed jobs of the device in the log.
+
+    @param logging: logging service
+    @param device: device service
+    @return: list of components and seconds
+    """
+    samples = []
+    for key, event in logging.matching_events(
+        "job", status="completed", device=device.label
+    ):
+        motion = event.get("motion")
+        duration = event.get("duration")
+        loops = event.get("loop")
+        if not motion or not duration or not loops:
+            continue
+        samples.append((motion, duration / loops))
+    return samples
+
+
+def calibrate_device(device, logging):
+    """
+    Fits the factors of the device to its logged jobs and stores them.
+
+    @return: calibrated estimator, fitted sample count
+    """
+    estimator = device_estimator(device)
+    count = estimator.calibrate(logged_samples(logging, device))
+    if count:
+        for key, value in estimator.factors.items():
+            setattr(device, f"estimate_factor_{key}", value)
+    return estimator, count
@@ -14,13 +14,14 @@ class LaserJob:
         self.runtime = 0
         self.time_pass_started = None
         self.steps_done = 0
-        self.steps_total = 0
+        self._steps_total = None
         self.avg_time_per_pass = None
         self.loops = loops
         self.loops_executed = 0
         self._driver = driver
         self.helper = False
         self.item_index = 0
+        self.prepared = False
 
         self._stopped = True
 
@@ -48,6 +49,19 @@ class LaserJob:
     def is_running(self):
         return not self._stopped
 
+    @property
+    def steps_total(self):
+        """
+        Steps of one pass. These are counted when first needed, and are the steps done once a pass completed.
+        """
+        if self._steps_total is None:
+            self.calc_steps()
+        return self._steps_total
+
+    @steps_total.setter
+    def steps_total(self, value):
+        self._steps_total = value
+
     def execute(self, driver=None):
         """
         Execute calls each item in the list of items in order. This is intended to be called by the spooler thread. And
@@ -57,8 +71,6 @@ class LaserJob:
         self._stopped = False
         self.time_started = time.time()
         self.time_pass_started = time.time()
-        self.steps_total = 0
-        self.calc_steps()
         try:
             while self.loops_executed < self.loops:
                 self.steps_done = 0
@@ -73,6 +85,8 @@ class LaserJob:
                         return False
                     self.item_index += 1
                 self.item_index = 0
+                # The steps of a completed pass are exact.
+                self._steps_total = self.steps_done
                 self.loops_executed += 1
                 self.time_pass_started = time.time()
                 self.avg_time_per_pass = self.elapsed_time() / self.loops_executed
@@ -81,26 +95,55 @@ class LaserJob:
             self._stopped = True
         return True
 
+    def prepare(self, aborted=None):
+        """
+        Prepare is called by the spooler while this job waits behind the running job. This counts the steps and lets the
+        driver compute its data of the cutcode ahead, if the driver has a prepare(cutcodes, aborted) function.
+
+        @param aborted: function returning whether to stop preparing
+        @return:
+        """
+        self.prepared = True
+        if self._steps_total is None:
+            self.calc_steps()
+        if aborted is not None and aborted():
+            return
+        prepare = getattr(self._driver, "prepare", None)
+        if prepare is None:
+            return
+        cutcodes = [item for item in self.items if isinstance(item, CutCode)]
+        if cutcodes:
+            prepare(cutcodes, aborted)
+
     def calc_steps(self):
+        """
+        Counts the steps of one pass, without executing them. Items giving a generate_count() are not generated.
+        """
+        steps_total = 0
+
         def simple_step(item):
+            nonlocal steps_total
             if isinstance(item, tuple):
                 attr = item[0]
                 if hasattr(self._driver, attr):
-                    self.steps_total += 1
+                    steps_total += 1
             # STRING
             elif isinstance(item, str):
                 attr = item
                 if hasattr(self._driver, attr):
-                    self.steps_total += 1
+                    steps_total += 1
+            # Count of the generated steps.
+            elif hasattr(item, "generate_count"):
+                steps_total += item.generate_count(self._driver)
             # .generator is a Generator
             elif hasattr(item, "generate"):
                 item = getattr(item, "generate")
                 for p in item():
                     simple_step(p)
 
-        self.steps_total = 0
         for pitem in self.items:
             simple_step(pitem)
+        self._steps_total = steps_total
 
     def execute_item(self, item):
         """
@@ -4,6 +4,7 @@ from math import ceil, floor
 
 from meerk40t.core.node.node import Node
 from meerk40t.core.units import UNITS_PER_INCH
+from meerk40t.image.imagecache import image_cache
 from meerk40t.image.imagetools import RasterScripts
 from meerk40t.svgelements import Matrix, Path, Polygon
 
@@ -278,7 +279,9 @@ class ImageNode(Node):
         if step_y is None:
             step_y = self.step_y
         try:
-            actualized_matrix, image = self._process_image(step_x, step_y, crop=crop)
+            actualized_matrix, image = self._process_image_cached(
+                step_x, step_y, crop=crop
+            )
             inverted_main_matrix = Matrix(self.matrix).inverse()
             self._processed_matrix = actualized_matrix * inverted_main_matrix
             self._processed_image = image
@@ -290,6 +293,46 @@ class ImageNode(Node):
             self._process_image_failed = True
         self.updated()
 
+    def _process_parameters(self, step_x, step_y, crop):
+        """
+        All values the processed image depends upon, other than the image itself.
+        """
+        m = self.matrix
+        return (
+            (m.a, m.b, m.c, m.d, m.e, m.f),
+            step_x,
+            step_y,
+            bool(crop),
+            self.invert,
+            self.dither,
+            self.dither_type,
+            self.red,
+            self.green,
+            self.blue,
+            self.lightness,
+            self.operations,
+        )
+
+    def _process_image_cached(self, step_x, step_y, crop=True):
+        """
+        Provides the processed image from the image cache, processing the image if it is not cached.
+
+        The raster script may set the dither values, these are restored along with the cached image.
+        """
+        if self.image is None:
+            return self._process_image(step_x, step_y, crop=crop)
+        key = image_cache.key(
+            self.image, self._process_parameters(step_x, step_y, crop)
+        )
+        cached = image_cache.get(key)
+        if cached is not None:
+            actualized_matrix, image, state = cached
+            self.dither, self.dither_type = state
+            return actualized_matrix, image
+        actualized_matrix, image = self._process_image(step_x, step_y, crop=crop)
+        image_cache.put(key, actualized_matrix, image, [self.dither, self.dither_type])
+        return actualized_matrix, image
+
     @property
     def opaque_image(self):
         from PIL import Image
@@ -340,7 +340,6 @@ class Node:
         for c in self._children:
             assert c._parent is self
             assert c._root is self._root
-            assert c in c._parent._children
             for q in c._references:
                 assert q.node is c
             if c.type == "reference":
@@ -295,8 +295,15 @@ class HatchOpNode(Node, Parameters):
         self.settings["native_mm"] = native_mm
         self.settings["native_speed"] = self.speed * native_mm
         self.settings["native_rapid_speed"] = self.rapid_speed * native_mm
+        # Outlines are in device units, flattened within 0.01mm.
+        tolerance = native_mm / 100.0
 
         def hatch():
+            try:
+                from meerk40t.tools.geomstr import Geomstr
+            except ImportError:
+                # Without numpy, outlines are sampled at fixed steps.
+                Geomstr = None
             settings = self.settings
             outlines = list()
             for node in self.children:
@@ -304,6 +311,10 @@ class HatchOpNode(Node, Parameters):
                     path = node.as_path()
                 except AttributeError:
                     continue
+                if Geomstr is not None:
+                    geometry = Geomstr.svg(path)
+                    outlines.extend(geometry.as_polylines(tolerance=tolerance))
+                    continue
                 path.approximate_arcs_with_cubics()
                 for subpath in path.as_subpaths():
                     if len(subpath) == 0:
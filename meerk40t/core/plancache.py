@@ -0,0 +1,134 @@
+"""
+Operation Cache
+
+The operation cache keeps the processed copy of each operation of the last plan. The processed copy is the copied
+operation after the preprocess and validate stages, with its hatches, rasters and processed images already made. If
+the same operation is planned again, unchanged, the processed copy replaces the new copy and both stages are skipped
+for it. Blob converts the processed copy into new cutcode, since cutcode is changed during optimization.
+
+Entries are dropped by the tree notifications of the operation, its children and the elements its children refer
+to. The fingerprint of the operation settings, the device matrix, the bounds of the elements and the penbox pass
+the operation refers to catches changes which are not notified.
+"""
+
+import threading
+import weakref
+
+
+class OperationCache:
+    def __init__(self):
+        # id(operation) -> (weakref of operation, fingerprint, processed copy)
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def fingerprint(op, matrix, device=None, penbox=None):
+        """
+        Values the processed copy of the operation depends upon.
+
+        @param op: operation in the tree
+        @param matrix: scene to device matrix
+        @param device: device the operation is planned for
+        @param penbox: penbox of the elements, the pass settings of hatches are read from it
+        @return: fingerprint
+        """
+        parts = [
+            op.type,
+            id(device),
+            (matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f),
+        ]
+        settings = getattr(op, "settings", None)
+        if settings is not None:
+            parts.append(repr(sorted(settings.items(), key=lambda e: e[0])))
+            penbox_pass = settings.get("penbox_pass")
+            if penbox_pass is not None and penbox is not None:
+                # Penbox edits are not notified.
+                parts.append(repr(penbox.get(penbox_pass)))
+        for child in op.children:
+            node = getattr(child, "node", None)
+            if node is None:
+                node = child
+            try:
+                bounds = node.bounds
+            except AttributeError:
+                bounds = None
+            parts.append((id(child), id(node), node.type, repr(bounds)))
+        return tuple(parts)
+
+    def get(self, op, fingerprint):
+        """
+        Finds the processed copy of the operation.
+
+        @param op: operation in the tree
+        @param fingerprint: current fingerprint of the operation
+        @return: processed copy or None
+        """
+        with self._lock:
+            entry = self._entries.get(id(op))
+            if entry is not None and entry[0]() is op and entry[1] == fingerprint:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, op, fingerprint, processed):
+        """
+        Stores the processed copy of the operation, replacing any earlier copy.
+
+        @param op: operation in the tree
+        @param fingerprint: fingerprint of the operation when it was copied
+        @param processed: processed copy
+        @return:
+        """
+        key = id(op)
+
+        def forget(ref, key=key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] is ref:
+                    del self._entries[key]
+
+        with self._lock:
+            self._entries[key] = weakref.ref(op, forget), fingerprint, processed
+
+    def invalidate(self, node):
+        """
+        Drops the entries of the operations containing the node or referring to it.
+
+        @param node: changed node
+        @return:
+        """
+        if not self._entries:
+            return
+        entries = self._entries
+        with self._lock:
+            n = node
+            while n is not None:
+                entries.pop(id(n), None)
+                n = n._parent
+            for n in node.flat():
+                for ref in n._references:
+                    if ref._parent is not None:
+                        entries.pop(id(ref._parent), None)
+
+    # Tree notifications.
+
+    def _changed(self, node, **kwargs):
+        self.invalidate(node)
+
+    node_changed = _changed
+    modified = _changed
+    altered = _changed
+    translated = _changed
+    scaled = _changed
+    node_attached = _changed
+    node_detached = _changed
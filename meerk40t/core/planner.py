@@ -16,6 +16,7 @@ from .node.util_home import HomeOperation
 from .node.util_origin import SetOriginOperation
 from .node.util_output import OutputOperation
 from .node.util_wait import WaitOperation
+from .plancache import OperationCache
 from .units import Length
 
 
@@ -37,6 +38,17 @@ def plugin(kernel, lifecycle=None):
                     "Open the Spooler window automatically when you Execute a Job"
                 ),
             },
+            {
+                "attr": "opt_workers",
+                "object": context,
+                "default": 1,
+                "type": int,
+                "label": _("Planning Threads"),
+                "tip": _(
+                    "Number of operations that are processed at the same time while a job is planned. "
+                    + "Raster, image and hatch operations are prepared faster on computers with several cores."
+                ),
+            },
         ]
         kernel.register_choices("planner", choices)
 
@@ -225,10 +237,12 @@ def plugin(kernel, lifecycle=None):
         kernel.register_choices("optimize", choices)
 
         context.setting(bool, "opt_2opt", False)
+        context.setting(float, "opt_2opt_time_limit", 0.0)
         context.setting(bool, "opt_nearest_neighbor", True)
         context.setting(bool, "opt_reduce_directions", False)
         context.setting(bool, "opt_remove_overlap", False)
         context.setting(bool, "opt_start_from_position", False)
+        context.setting(bool, "opt_operation_cache", True)
 
         # context.setting(int, "opt_closed_distance", 15)
         # context.setting(bool, "opt_merge_passes", False)
@@ -255,6 +269,7 @@ class Planner(Service):
         Service.__init__(self, kernel, "planner")
         self._plan = dict()
         self._default_plan = "0"
+        self.operation_cache = OperationCache()
 
     def length(self, v):
         return float(Length(v))
@@ -281,6 +296,7 @@ class Planner(Service):
 
     def service_attach(self, *args, **kwargs):
         _ = self.kernel.translation
+        self.elements.listen_tree(self.operation_cache)
 
         @self.console_command(
             "plan",
@@ -478,6 +494,7 @@ class Planner(Service):
                 except AttributeError:
                     pass
                 data.plan.append(copy_c)
+                data.origins[id(copy_c)] = c
 
             # Add default start ops
             add_ops(False)
@@ -658,6 +675,7 @@ class Planner(Service):
                 except AttributeError:
                     pass
                 data.plan.append(copy_c)
+                data.origins[id(copy_c)] = c
             # Add default trailing ops
             add_ops(False)
             channel(_("Copied Operations."))
@@ -752,17 +770,127 @@ class Planner(Service):
             self.signal("plan", data.name, 5)
             return data_type, data
 
+        @self.console_option(
+            "time",
+            "t",
+            type=float,
+            help=_("time budget in seconds for 2-opt travel optimization"),
+        )
         @self.console_command(
             "optimize",
             help=_("plan<?> optimize"),
             input_type="plan",
             output_type="plan",
         )
-        def plan_optimize(data_type=None, data=None, **kwgs):
+        def plan_optimize(data_type=None, data=None, time=None, **kwgs):
+            data.travel_time_limit = time
             data.execute()
             self.signal("plan", data.name, 6)
             return data_type, data
 
+        @self.console_argument(
+            "count", type=int, help=_("number of operations processed at once")
+        )
+        @self.console_command(
+            "workers",
+            help=_("plan<?> workers <count>"),
+            input_type="plan",
+            output_type="plan",
+        )
+        def plan_workers(
+            command, channel, _, data_type=None, data=None, count=None, **kwgs
+        ):
+            if count is not None:
+                if count < 1:
+                    channel(_("Worker count must be at least 1."))
+                    return data_type, data
+                data.workers = count
+            channel(
+                _("Operations processed by {count} workers.").format(count=data.workers)
+            )
+            return data_type, data
+
+        @self.console_argument("action", type=str, help=_("on, off or clear"))
+        @self.console_command(
+            "cache",
+            help=_("plan<?> cache [on|off|clear]"),
+            input_type="plan",
+            output_type="plan",
+        )
+        def plan_cache(
+            command, channel, _, data_type=None, data=None, action=None, **kwgs
+        ):
+            cache = self.operation_cache
+            if action == "on":
+                self.opt_operation_cache = True
+            elif action == "off":
+                self.opt_operation_cache = False
+                cache.clear()
+            elif action == "clear":
+                cache.clear()
+            elif action is not None:
+                channel(_("Use on, off or clear."))
+                return data_type, data
+            state = _("on") if self.opt_operation_cache else _("off")
+            channel(
+                _(
+                    "Operation cache {state}: {count} operations, {hits} hits, {misses} misses."
+                ).format(
+                    state=state, count=len(cache), hits=cache.hits, misses=cache.misses
+                )
+            )
+            return data_type, data
+
+        @self.console_option(
+            "calibrate",
+            "c",
+            type=bool,
+            action="store_true",
+            help=_("fit the estimate to the logged durations of completed jobs"),
+        )
+        @self.console_command(
+            "estimate",
+            help=_("plan<?> estimate"),
+            input_type="plan",
+            output_type="plan",
+        )
+        def plan_estimate(
+            command, channel, _, data_type=None, data=None, calibrate=False, **kwgs
+        ):
+            from .estimator import calibrate_device, device_estimator
+
+            device = self.device
+            if calibrate:
+                estimator, count = calibrate_device(device, self.kernel.logging)
+                channel(_("Calibrated from {count} logged jobs.").format(count=count))
+                if not count and not device.setting(bool, "estimate_log_motion", True):
+                    channel(
+                        _(
+                            "The motion of jobs is not logged, set estimate_log_motion to calibrate the estimate."
+                        )
+                    )
+            else:
+                estimator = device_estimator(device)
+            components = estimator.components(data.plan)
+            constant = 0
+            for item in data.plan:
+                if isinstance(item, CutCode):
+                    constant += (
+                        item.duration_cut() + item.duration_travel() + item.extra_time()
+                    )
+            channel(
+                _(
+                    "Motion: cut {cut:.1f}s, raster {raster:.1f}s, travel {travel:.1f}s, "
+                    + "{turnarounds} turnarounds, {cuts} cuts, dwell {dwell:.1f}s"
+                ).format(**components)
+            )
+            channel(
+                _("Estimate: {estimate:.1f}s (constant speed: {constant:.1f}s)").format(
+                    estimate=estimator.total(components), constant=constant
+                )
+            )
+            return data_type, data
+
         @self.console_command(
             "clear",
             help=_("plan<?> clear"),
@@ -35,8 +35,49 @@ of zero will remain zero.
 * Dot Length requires any train of on-values must be of at least the proscribed length.
 * Shift moves isolated single-on values to be adjacent to other on-values.
 * Groups manipulates the output as max-length changeless orthogonal/diagonal positions.
+
+In batch mode the cuts give their plots as numpy arrays of x, y, and on values, see CutObject.steps(), and each
+manipulation transforms whole arrays with process_steps(). The emitted plot stream is identical to the stream of the
+tuple-by-tuple processing. Flushes are always processed as tuples. The steps of queued cuts can be computed ahead with
+prepare(), such as while another job runs. Without numpy, batch mode falls back to the tuple-by-tuple processing.
 """
 
+STEP_CHUNK = 16384  # Steps processed per batch.
+PREPARE_STEPS = 1 << 20  # Most steps buffered by prepare().
+
+
+def plot_steps(plot, size=STEP_CHUNK):
+    """
+    Collects a series of 2 or 3 value plots into x, y, on numpy arrays.
+
+    Events without an on-value are given in chunks with on None, which are given the single_default value by
+    Single. Chunks never mix events with and without on-values.
+
+    @param plot: plot generator
+    @param size: events per chunk
+    @return: generator of x, y, on arrays.
+    """
+    import numpy as np
+
+    xs = []
+    ys = []
+    ons = []
+    width = None
+    for event in plot:
+        if len(event) != width or len(xs) >= size:
+            if xs:
+                yield np.array(xs), np.array(ys), np.array(ons) if width >= 3 else None
+                xs = []
+                ys = []
+                ons = []
+            width = len(event)
+        xs.append(event[0])
+        ys.append(event[1])
+        if width >= 3:
+            ons.append(event[2])
+    if xs:
+        yield np.array(xs), np.array(ys), np.array(ons) if width >= 3 else None
+
 
 class PlotPlanner(Parameters):
     def __init__(
@@ -47,10 +88,17 @@ class PlotPlanner(Parameters):
         ppi=True,
         shift=True,
         group=True,
+        batch=False,
         **kwargs,
     ):
         super().__init__(settings, **kwargs)
         self.debug = False
+        if batch:
+            try:
+                import numpy  # pylint: disable=unused-import
+            except ImportError:
+                batch = False
+        self.batch = batch  # Process cuts as step arrays.
 
         self.abort = False
         self.force_shift = False
@@ -79,6 +127,7 @@ class PlotPlanner(Parameters):
         self.pos_x = None
         self.pos_y = None
         self.settings_then_jog = False
+        self._prepared = {}
 
     def push(self, plot):
         self.abort = False
@@ -88,6 +137,41 @@ class PlotPlanner(Parameters):
         self.queue.clear()
         self.abort = True
 
+    def prepare(self, cuts, aborted=None):
+        """
+        Computes the step arrays of cuts which are plotted later, in batch mode. The buffered steps of a cut are used by
+        its next plot, at most PREPARE_STEPS steps are buffered and the steps of the remaining cuts are computed when
+        they are plotted. Preparing replaces the previously buffered steps.
+
+        This may be called from another thread than the thread plotting.
+
+        @param cuts: cut objects
+        @param aborted: function returning whether to stop preparing
+        @return:
+        """
+        prepared = {}
+        self._prepared = prepared
+        if not self.batch:
+            return
+        total = 0
+        for cut in cuts:
+            if total >= PREPARE_STEPS or (aborted is not None and aborted()):
+                return
+            steps = list(cut.steps())
+            total += sum(len(s[0]) for s in steps)
+            # The cut is kept to keep its id unique.
+            prepared[id(cut)] = cut, steps
+
+    def _steps(self, cut):
+        """
+        Step arrays of the cut, buffered by prepare() or computed.
+        """
+        try:
+            prepared, steps = self._prepared.pop(id(cut))
+        except KeyError:
+            return cut.steps()
+        return iter(steps)
+
     def gen(self):
         """
         Main method of generating the plot stream.
@@ -144,13 +228,23 @@ class PlotPlanner(Parameters):
                         and abs(self.pos_y - new_start_y) < distance
                     ) or not self.jog_enable:
                         # Jog distance smaller than threshold. Or jog isn't allowed
-                        def walk():
-                            for event in ZinglPlotter.plot_line(
-                                self.pos_x, self.pos_y, new_start_x, new_start_y
-                            ):
-                                yield event[0], event[1], 0
+                        if self.batch and not self.debug:
+                            import numpy as np
 
-                        yield from self.process_plots(walk())
+                            x, y = ZinglPlotter.plot_line_array(
+                                self.pos_x, self.pos_y, new_start_x, new_start_y
+                            )
+                            walk = ((x, y, np.zeros(len(x), dtype=np.int64)),)
+                            yield from self.process_steps(walk)
+                        else:
+
+                            def walk():
+                                for event in ZinglPlotter.plot_line(
+                                    self.pos_x, self.pos_y, new_start_x, new_start_y
+                                ):
+                                    yield event[0], event[1], 0
+
+                            yield from self.process_plots(walk())
                     else:
                         # Request standard jog new location required.
                         flush = True
@@ -194,7 +288,10 @@ class PlotPlanner(Parameters):
             # Plot the current.
             # Current is executed in cut settings.
             yield None, None, PLOT_START
-            yield from self.process_plots(cut.generator())
+            if self.batch and not self.debug:
+                yield from self.process_steps(self._steps(cut))
+            else:
+                yield from self.process_plots(cut.generator())
             self.pos_x = self.single.single_x
             self.pos_y = self.single.single_y
 
@@ -220,6 +317,8 @@ class PlotPlanner(Parameters):
         @param plot: plottable element that should be wrapped
         @return: generator to produce plottable elements.
         """
+        if self.batch and not self.debug and plot is not None:
+            return self.process_steps(plot_steps(plot))
 
         def debug(plot, manipulator):
             for q in plot:
@@ -248,6 +347,23 @@ class PlotPlanner(Parameters):
             plot = debug(plot, self.group)
         return plot
 
+    def process_steps(self, steps):
+        """
+        Batch form of process_plots(). Converts a series of x, y, on arrays into the series of outputs, each
+        manipulation transforms whole arrays at once. Flushes must be processed with process_plots().
+
+        @param steps: generator of x, y, on arrays, see plot_steps()
+        @return: generator to produce plottable elements.
+        """
+        for manipulator in (self.single, self.smooth, self.ppi, self.shift, self.group):
+            if manipulator is not None:
+                steps = manipulator.process_steps(steps)
+        for x, y, on in steps:
+            for event in zip(x.tolist(), y.tolist(), on.tolist()):
+                if self.abort:
+                    return
+                yield event
+
     def step_move(self, x0, y0, x1, y1):
         """
         Step move walks a line from a point to another point.
@@ -296,6 +412,22 @@ class PlotManipulation:
     def process(self, plot):
         pass
 
+    def process_steps(self, steps):
+        """
+        Batch form of process(). Manipulations without an array implementation process the events of each array
+        with process().
+
+        @param steps: generator of x, y, on arrays
+        @return: generator of x, y, on arrays
+        """
+        import numpy as np
+
+        for x, y, on in steps:
+            events = list(self.process(zip(x.tolist(), y.tolist(), on.tolist())))
+            if events:
+                x, y, on = zip(*events)
+                yield np.array(x), np.array(y), np.array(on)
+
     def flush(self):
         pass
 
@@ -368,6 +500,65 @@ class Single(PlotManipulation):
                 self.single_y = cy + (i * dy)
                 yield self.single_x, self.single_y, on
 
+    def process_steps(self, steps):
+        """
+        Batch form of process(). Expands the arrays of positions into single unit steps.
+
+        Steps are given in chunks of about STEP_CHUNK steps, abort is checked between the chunks.
+
+        @param steps: generator of x, y, on arrays, on may be None
+        @return: generator of x, y, on arrays
+        """
+        import numpy as np
+
+        for x, y, on in steps:
+            if not len(x):
+                continue
+            if on is None:
+                on = np.full(len(x), self.single_default)
+            if self.single_x is None or self.single_y is None:
+                self.single_x = x[0].item()
+                self.single_y = y[0].item()
+            px = np.concatenate(([self.single_x], x))
+            py = np.concatenate(([self.single_y], y))
+            total_dx = np.diff(px)
+            total_dy = np.diff(py)
+            dx = np.sign(total_dx)
+            dy = np.sign(total_dy)
+            invalid = np.flatnonzero(total_dy * dx != total_dx * dy)
+            count = invalid[0] if len(invalid) else len(x)
+            moves = np.flatnonzero((total_dx[:count] != 0) | (total_dy[:count] != 0))
+            lengths = np.maximum(np.abs(total_dx[moves]), np.abs(total_dy[moves]))
+            ends = np.cumsum(lengths)
+            start = 0
+            while start < len(moves):
+                if self.planner.abort:
+                    self.single_x = None
+                    self.single_y = None
+                    return
+                done = ends[start - 1] if start else 0
+                stop = int(np.searchsorted(ends, done + STEP_CHUNK, side="right"))
+                stop = max(stop, start + 1)
+                chunk = moves[start:stop]
+                n = lengths[start:stop]
+                index = np.repeat(np.arange(len(chunk)), n)
+                i = (
+                    np.arange(ends[stop - 1] - done)
+                    - (ends[start:stop] - n - done)[index]
+                    + 1
+                )
+                chunk = chunk[index]
+                step_x = px[chunk] + i * dx[chunk]
+                step_y = py[chunk] + i * dy[chunk]
+                self.single_x = step_x[-1].item()
+                self.single_y = step_y[-1].item()
+                yield step_x, step_y, on[chunk]
+                start = stop
+            if len(invalid):
+                raise ValueError(
+                    f"Must be uniformly diagonal or orthogonal: ({total_dx[count]}, {total_dy[count]}) is not."
+                )
+
     def flush(self):
         yield None, None, self.single_default
 
@@ -449,6 +640,19 @@ class Smooth(PlotManipulation):
             self.smooth_y += dy
             yield self.smooth_x, self.smooth_y, on
 
+    def process_steps(self, steps):
+        """
+        Batch form of process(). Arrays pass unchanged when not smoothing.
+
+        @param steps: generator of x, y, on arrays
+        @return: generator of x, y, on arrays
+        """
+        if not self.planner.settings.get(
+            "_constant_move_x", False
+        ) and not self.planner.settings.get("_constant_move_y", False):
+            return steps
+        return super().process_steps(steps)
+
     def flush(self):
         if not self.flushed():
             if self.goal_x is None or self.goal_y is None:
@@ -522,6 +726,55 @@ class PPI(PlotManipulation):
                     on = 0
             yield x, y, on
 
+    def process_steps(self, steps):
+        """
+        Batch form of process().
+
+        Without dot length the pulses of whole arrays are found from the running total of the power. The total is
+        exact if the total and the power of each step are integral. Otherwise, the steps are totalled one by one, as
+        rounding of the total changes the pulses.
+
+        @param steps: generator of x, y, on arrays
+        @return: generator of x, y, on arrays
+        """
+        import numpy as np
+
+        for x, y, on in steps:
+            planner_power = self.planner.power
+            dot_length = self.planner.dot_length
+            power = planner_power * on
+            total = self.ppi_total
+            if (
+                dot_length == 1
+                and self.dot_left == 0
+                and 0 <= total < 1000
+                and total == int(total)
+                and np.all((power >= 0) & (power <= 1000) & (power == np.floor(power)))
+            ):
+                # Each step adds at most 1000, so one step triggers at most one pulse.
+                totals = total + np.cumsum(power)
+                pulses = (totals // 1000.0).astype(np.int64)
+                if len(totals):
+                    self.ppi_total = totals[-1].item() - 1000.0 * pulses[-1].item()
+                yield x, y, np.diff(pulses, prepend=0)
+                continue
+            dot_left = self.dot_left
+            pulses = []
+            for value in on.tolist():
+                total += planner_power * value
+                if value and dot_left > 0:
+                    dot_left -= 1
+                    pulses.append(1)
+                elif total >= 1000.0:
+                    total -= 1000.0 * dot_length
+                    dot_left = dot_length - 1
+                    pulses.append(1)
+                else:
+                    pulses.append(0)
+            self.ppi_total = total
+            self.dot_left = dot_left
+            yield x, y, np.array(pulses, dtype=np.int64)
+
 
 class Shift(PlotManipulation):
     def __init__(self, planner: PlotPlanner):
@@ -570,6 +823,25 @@ class Shift(PlotManipulation):
                 yield bx, by, bon
         # There are no more plots.
 
+    def process_steps(self, steps):
+        """
+        Batch form of process(). Arrays pass unchanged when not shifting.
+
+        @param steps: generator of x, y, on arrays
+        @return: generator of x, y, on arrays
+        """
+        for x, y, on in steps:
+            if (
+                not self.planner.force_shift
+                and not self.planner.shift_enabled
+                and not self.shift_buffer
+            ):
+                if len(x):
+                    self.clear()
+                yield x, y, on
+                continue
+            yield from super().process_steps(((x, y, on),))
+
     def flush(self):
         while len(self.shift_buffer) > 0:
             self.shift_pixels <<= 1
@@ -678,6 +950,63 @@ class Group(PlotManipulation):
             self.group_on = on
         # There are no more plots.
 
+    def process_steps(self, steps):
+        """
+        Batch form of process().
+
+        Each step is the same orthogonal/diagonal step as the one before it, or it drops the point before it. The
+        dropped points of whole arrays are found by comparing each step with the one before.
+
+        @param steps: generator of single stepped x, y, on arrays
+        @return: generator of grouped x, y, on arrays
+        """
+        import numpy as np
+
+        for x, y, on in steps:
+            if not len(x):
+                continue
+            if not self.planner.group_enabled:
+                yield from super().process_steps(((x, y, on),))
+                continue
+            if self.group_x is None:
+                self.group_x = x[0].item()
+            if self.group_y is None:
+                self.group_y = y[0].item()
+            if self.group_on is None:
+                self.group_on = on[0].item()
+            px = np.concatenate(([self.group_x], x))
+            py = np.concatenate(([self.group_y], y))
+            pon = np.concatenate(([self.group_on], on))
+            dx = np.diff(px)
+            dy = np.diff(py)
+            last_dx = np.concatenate(([self.group_dx], dx[:-1]))
+            last_dy = np.concatenate(([self.group_dy], dy[:-1]))
+            drop = ((last_dx != 0) | (last_dy != 0)) & ~(
+                (dx == last_dx) & (dy == last_dy) & (pon[1:] == pon[:-1])
+            )
+            invalid = np.flatnonzero((np.abs(dx) > 1) | (np.abs(dy) > 1))
+            count = invalid[0] + 1 if len(invalid) else len(x)
+            drops = np.flatnonzero(drop[:count])
+            if len(drops):
+                last = drops[-1]
+                self.last_x = px[last].item()
+                self.last_y = py[last].item()
+                self.last_on = pon[last].item()
+            # Direction and buffered position after the last processed step.
+            self.group_dx = dx[count - 1].item()
+            self.group_dy = dy[count - 1].item()
+            end = count - 1 if len(invalid) else count
+            self.group_x = px[end].item()
+            self.group_y = py[end].item()
+            self.group_on = pon[end].item()
+            if len(drops):
+                yield px[drops], py[drops], pon[drops]
+            if len(invalid):
+                # The last step was not valid. Group() requires single step values.
+                raise ValueError(
+                    f"dx({self.group_dx}) or dy({self.group_dy}) exceeds 1"
+                )
+
     def flush(self):
         if not self.flushed():
             # If we have an established buffer, flush the buffer.
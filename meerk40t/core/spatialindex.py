@@ -0,0 +1,311 @@
+"""
+Spatial Index
+
+The spatial index finds the bounding boxes which overlap a given box without testing every box. The boxes are
+hashed into a uniform grid of square cells, each box is registered in every cell it covers. Boxes which cover too
+many cells are kept in a separate list that is always tested.
+
+The ElementIndex keeps a spatial index over the bounds of the element nodes of the tree. It is told about changes
+by the tree listeners of the elements service: changed nodes and their parents are reinserted when the index is
+next queried, attached and detached nodes are added and removed.
+"""
+
+from math import floor, isfinite
+
+from .element_types import elem_group_nodes
+
+# Boxes covering more cells than this are tested for every query.
+MAX_CELLS = 64
+
+
+class BoundsGrid:
+    def __init__(self, cell_size=1.0):
+        """
+        @param cell_size: width and height of the grid cells.
+        """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._large = set()
+        # key -> (bounds, cell range or None)
+        self._bounds = {}
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __contains__(self, key):
+        return key in self._bounds
+
+    def clear(self, cell_size=None):
+        if cell_size is not None:
+            self.cell_size = cell_size
+        self._cells.clear()
+        self._large.clear()
+        self._bounds.clear()
+
+    def _range(self, bounds):
+        x0, y0, x1, y1 = bounds
+        if not (isfinite(x0) and isfinite(y0) and isfinite(x1) and isfinite(y1)):
+            return None
+        size = self.cell_size
+        i0 = floor(x0 / size)
+        j0 = floor(y0 / size)
+        i1 = floor(x1 / size)
+        j1 = floor(y1 / size)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > MAX_CELLS:
+            return None
+        return i0, j0, i1, j1
+
+    def insert(self, key, bounds):
+        """
+        Adds the box, replacing any box of the same key.
+
+        @param key: hashable key of the box
+        @param bounds: (x0, y0, x1, y1) box
+        @return:
+        """
+        if key in self._bounds:
+            self.remove(key)
+        cells = self._range(bounds)
+        self._bounds[key] = bounds, cells
+        if cells is None:
+            self._large.add(key)
+            return
+        i0, j0, i1, j1 = cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = self._cells.get((i, j))
+                if cell is None:
+                    self._cells[(i, j)] = {key}
+                else:
+                    cell.add(key)
+
+    def remove(self, key):
+        """
+        Removes the box of the given key, if any.
+
+        @param key:
+        @return:
+        """
+        entry = self._bounds.pop(key, None)
+        if entry is None:
+            return
+        cells = entry[1]
+        if cells is None:
+            self._large.discard(key)
+            return
+        i0, j0, i1, j1 = cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = self._cells.get((i, j))
+                if cell is None:
+                    continue
+                cell.discard(key)
+                if not cell:
+                    del self._cells[(i, j)]
+
+    def bounds(self, key):
+        return self._bounds[key][0]
+
+    def query(self, box):
+        """
+        Finds the keys of all boxes overlapping the given box, touching boxes overlap.
+
+        @param box: (x0, y0, x1, y1) box
+        @return: set of keys
+        """
+        x0, y0, x1, y1 = box
+        candidates = set(self._large)
+        cells = self._range(box)
+        if cells is None:
+            candidates.update(self._bounds)
+        else:
+            i0, j0, i1, j1 = cells
+            get = self._cells.get
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    cell = get((i, j))
+                    if cell is not None:
+                        candidates.update(cell)
+        found = set()
+        for key in candidates:
+            b = self._bounds[key][0]
+            if b[0] <= x1 and b[2] >= x0 and b[1] <= y1 and b[3] >= y0:
+                found.add(key)
+        return found
+
+
+def cell_size_for(boxes):
+    """
+    Suitable cell size for the given boxes, the median of their larger side.
+
+    @param boxes: list of (x0, y0, x1, y1) boxes
+    @return:
+    """
+    sides = []
+    for x0, y0, x1, y1 in boxes:
+        side = max(x1 - x0, y1 - y0)
+        if side > 0 and isfinite(side):
+            sides.append(side)
+    if not sides:
+        return 1.0
+    sides.sort()
+    return sides[len(sides) // 2]
+
+
+def tree_order(nodes):
+    """
+    Sorts the nodes in the depth first order of the tree.
+
+    @param nodes: nodes within the same tree
+    @return: sorted list of nodes
+    """
+    if len(nodes) < 2:
+        return list(nodes)
+    positions = {}
+
+    def position(node):
+        parent = node._parent
+        if parent is None:
+            return ()
+        if len(nodes) <= 8:
+            # Few nodes, searching the siblings is faster than indexing them.
+            return position(parent) + (parent._children.index(node),)
+        index = positions.get(id(parent))
+        if index is None:
+            index = {id(c): i for i, c in enumerate(parent._children)}
+            positions[id(parent)] = index
+        return position(parent) + (index.get(id(node), -1),)
+
+    return sorted(nodes, key=position)
+
+
+class ElementIndex:
+    """
+    Spatial index over the bounds of the element and group nodes within the elements branch.
+    """
+
+    def __init__(self, branch):
+        """
+        @param branch: function providing the elements branch node
+        """
+        self.branch = branch
+        self.grid = BoundsGrid()
+        self._nodes = {}
+        self._dirty = {}
+        self._valid = False
+
+    def invalidate(self):
+        """
+        Rebuilds the index on the next query, for changes of the tree which were not notified.
+        """
+        self._valid = False
+        self._dirty.clear()
+
+    def changed(self, node):
+        """
+        The bounds of the node changed, which changes the bounds of its parents too.
+        """
+        if not self._valid:
+            return
+        dirty = self._dirty
+        while node is not None and node.type in elem_group_nodes:
+            if id(node) in dirty:
+                return
+            dirty[id(node)] = node
+            node = node._parent
+
+    def attached(self, node):
+        if not self._valid:
+            return
+        for n in node.flat(types=elem_group_nodes):
+            self._dirty[id(n)] = n
+        self.changed(node._parent)
+
+    def detached(self, node):
+        if not self._valid:
+            return
+        for n in node.flat(types=elem_group_nodes):
+            self._remove(n)
+        self.changed(node._parent)
+
+    def _remove(self, node):
+        self._dirty.pop(id(node), None)
+        if self._nodes.pop(id(node), None) is not None:
+            self.grid.remove(id(node))
+
+    def _insert(self, node):
+        try:
+            bounds = node.bounds
+        except AttributeError:
+            bounds = None
+        if bounds is None:
+            self._remove(node)
+            return
+        self._nodes[id(node)] = node
+        self.grid.insert(id(node), tuple(bounds))
+
+    def _in_branch(self, node, branch):
+        while node is not None:
+            if node is branch:
+                return True
+            node = node._parent
+        return False
+
+    def _refresh(self):
+        branch = self.branch()
+        if not self._valid:
+            nodes = list(branch.flat(types=elem_group_nodes))
+            boxes = []
+            for node in nodes:
+                try:
+                    bounds = node.bounds
+                except AttributeError:
+                    bounds = None
+                boxes.append(bounds)
+            self._nodes.clear()
+            self.grid.clear(cell_size_for([b for b in boxes if b is not None]))
+            for node, bounds in zip(nodes, boxes):
+                if bounds is not None:
+                    self._nodes[id(node)] = node
+                    self.grid.insert(id(node), tuple(bounds))
+            self._dirty.clear()
+            self._valid = True
+            return
+        if not self._dirty:
+            return
+        dirty = list(self._dirty.values())
+        self._dirty.clear()
+        for node in dirty:
+            if node.type in elem_group_nodes and self._in_branch(node, branch):
+                self._insert(node)
+            else:
+                self._remove(node)
+
+    def query(self, box, ordered=True):
+        """
+        Finds the nodes whose bounds overlap the box.
+
+        @param box: (x0, y0, x1, y1) box
+        @param ordered: whether the nodes must be given in tree order
+        @return: list of nodes
+        """
+        self._refresh()
+        nodes = []
+        for key in self.grid.query(box):
+            node = self._nodes[key]
+            if node.type is None or node._parent is None:
+                # Removed without notification.
+                self._remove(node)
+                continue
+            nodes.append(node)
+        if ordered:
+            return tree_order(nodes)
+        return nodes
+
+    def at(self, x, y):
+        """
+        Finds the nodes whose bounds contain the point.
+
+        @return: list of nodes in tree order
+        """
+        return self.query((x, y, x, y))
@@ -1,4 +1,6 @@
 import time
+from heapq import heapify, heappush
+from itertools import count
 from math import isinf
 from threading import Condition
 
@@ -392,6 +394,9 @@ class Spooler:
     When the queues are empty the idle job is repeatedly executed in a loop. If there is no idle job
     then the spooler is inactive.
 
+    Jobs are queued in a heap by priority, jobs of the same priority in the order they were sent. While a
+    job executes, a second thread prepares the next queued job, so it starts without computing its data.
+
     """
 
     def __init__(self, context, driver=None, **kwargs):
@@ -400,10 +405,13 @@ class Spooler:
         self._current = None
 
         self._lock = Condition()
+        # Heap of (-priority, sequence, job).
         self._queue = []
+        self._sequence = count()
 
         self._shutdown = False
         self._thread = None
+        self._prepare_thread = None
 
     def __repr__(self):
         return f"Spooler({str(self.context)})"
@@ -464,6 +472,16 @@ class Spooler:
                 thread_name=f"Spooler({self.context.path})",
             )
             self._thread.stop = clear_thread
+        if self._prepare_thread is None:
+
+            def clear_prepare_thread(*a):
+                self._prepare_thread = None
+
+            self._prepare_thread = self.context.threaded(
+                self.prepare_run,
+                result=clear_prepare_thread,
+                thread_name=f"SpoolerPrepare({self.context.path})",
+            )
 
     def run(self):
         """
@@ -482,7 +500,7 @@ class Spooler:
                 return  # Kernel shutdown spooler threads should die off.
             with self._lock:
                 try:
-                    program = self._queue[0]
+                    program = self._queue[0][2]
                 except IndexError:
                     # There is no work to do.
                     self._lock.wait()
@@ -493,7 +511,10 @@ class Spooler:
             if self.driver.hold_work(priority):
                 time.sleep(0.01)
                 continue
-            self._current = program
+            with self._lock:
+                self._current = program
+                # The next job can be prepared.
+                self._lock.notify_all()
             try:
                 fully_executed = program.execute(self.driver)
             except ConnectionAbortedError:
@@ -510,9 +531,48 @@ class Spooler:
                 # all work finished
                 self.remove(program)
 
+    def prepare_run(self):
+        """
+        Preparation thread for the spooler.
+
+        Prepares the first queued job which is not executing, while the spooler thread executes the current job.
+        Preparing stops once the job starts executing or is removed.
+
+        @return:
+        """
+        while not self._shutdown:
+            if self.context.kernel.is_shutdown:
+                return
+            with self._lock:
+                job = self._next_job()
+                if job is None or getattr(job, "prepared", True):
+                    self._lock.wait()
+                    continue
+                job.prepared = True
+
+            def aborted():
+                return (
+                    self._shutdown
+                    or job.is_running()
+                    or all(e[2] is not job for e in self._queue)
+                )
+
+            try:
+                job.prepare(aborted)
+            except Exception:
+                # The job computes its data as it executes.
+                pass
+
+    def _next_job(self):
+        for e in sorted(self._queue):
+            job = e[2]
+            if job is not self._current and not job.is_running():
+                return job
+        return None
+
     @property
     def is_idle(self):
-        return len(self._queue) == 0 or self._queue[0].priority < 0
+        return len(self._queue) == 0 or self._queue[0][2].priority < 0
 
     @property
     def current(self):
@@ -520,7 +580,13 @@ class Spooler:
 
     @property
     def queue(self):
-        return self._queue
+        """
+        Queued jobs, in the order they are executed.
+        """
+        return [e[2] for e in sorted(self._queue)]
+
+    def _push(self, job):
+        heappush(self._queue, (-job.priority, next(self._sequence), job))
 
     def laserjob(self, job, priority=0, loops=1, label=None, helper=False):
         """
@@ -536,9 +602,8 @@ class Spooler:
         ljob.uid = self.context.logging.uid("job")
         with self._lock:
             self._stop_lower_priority_running_jobs(priority)
-            self._queue.append(ljob)
-            self._queue.sort(key=lambda e: e.priority, reverse=True)
-            self._lock.notify()
+            self._push(ljob)
+            self._lock.notify_all()
         self.context.signal("spooler;queue", len(self._queue))
 
     def command(self, *job, priority=0, helper=True):
@@ -547,9 +612,8 @@ class Spooler:
         ljob.uid = self.context.logging.uid("job")
         with self._lock:
             self._stop_lower_priority_running_jobs(priority)
-            self._queue.append(ljob)
-            self._queue.sort(key=lambda e: e.priority, reverse=True)
-            self._lock.notify()
+            self._push(ljob)
+            self._lock.notify_all()
         self.context.signal("spooler;queue", len(self._queue))
 
     def send(self, job):
@@ -562,19 +626,49 @@ class Spooler:
         job.uid = self.context.logging.uid("job")
         with self._lock:
             self._stop_lower_priority_running_jobs(job.priority)
-            self._queue.append(job)
-            self._queue.sort(key=lambda e: e.priority, reverse=True)
-            self._lock.notify()
+            self._push(job)
+            self._lock.notify_all()
         self.context.signal("spooler;queue", len(self._queue))
 
+    def _log_motion(self, uid, element):
+        """
+        Adds the motion components of one pass of a completed job to its logged event, the calibration of the time
+        estimate fits these to the logged duration. Computed outside the spooler thread, unless estimate_log_motion is
+        turned off.
+
+        @param uid: uid of the logged event
+        @param element: completed job
+        @return:
+        """
+        if not self.context.setting(bool, "estimate_log_motion", True):
+            return
+        from meerk40t.core.cutcode.cutcode import CutCode
+
+        items = getattr(element, "items", None)
+        if not items or getattr(element, "helper", False):
+            return
+        if not any(isinstance(item, CutCode) for item in items):
+            return
+
+        def motion():
+            from meerk40t.core.estimator import device_estimator
+
+            components = device_estimator(self.context).components(items)
+            event = self.context.logging.logs.get(uid)
+            if event is not None:
+                event["motion"] = components
+
+        self.context.threaded(motion, thread_name=f"motion-{uid}", daemon=True)
+
     def _stop_lower_priority_running_jobs(self, priority):
         for e in self._queue:
-            if e.is_running() and e.priority < priority:
-                e.stop()
+            job = e[2]
+            if job.is_running() and job.priority < priority:
+                job.stop()
 
     def clear_queue(self):
         with self._lock:
-            for element in self._queue:
+            for element in self.queue:
                 loop = getattr(element, "loops_executed", 0)
                 total = getattr(element, "loops", 0)
                 if isinf(total):
@@ -601,10 +695,12 @@ class Spooler:
                         "steps_total": getattr(element, "steps_total", None),
                     }
                 )
+                if status == "completed":
+                    self._log_motion(getattr(element, "uid"), element)
                 self.context.signal("spooler;completed")
                 element.stop()
             self._queue.clear()
-            self._lock.notify()
+            self._lock.notify_all()
         self.context.signal("spooler;queue", len(self._queue))
 
     def remove(self, element):
@@ -631,11 +727,11 @@ class Spooler:
                     "steps_total": getattr(element, "steps_total", None),
                 }
             )
+            if status == "completed":
+                self._log_motion(getattr(element, "uid"), element)
             self.context.signal("spooler;completed")
             element.stop()
-            for i in range(len(self._queue) - 1, -1, -1):
-                e = self._queue[i]
-                if e is element:
-                    del self._queue[i]
-            self._lock.notify()
+            self._queue[:] = [e for e in self._queue if e[2] is not element]
+            heapify(self._queue)
+            self._lock.notify_all()
         self.context.signal("spooler;queue", len(self._queue))
@@ -4,8 +4,21 @@ Undo States
 The undo class centralizes the undo stack and related commands. It's passed the
 rootnode of the tree and can perform marks to save the current tree states and will
 execute undo and redo operations for the tree.
+
+The undo states share their node copies. Each mark only copies the nodes which changed
+since they were last copied, all other nodes reuse the copy made for an earlier state.
+Changed nodes are found by listening to the tree notifications for modified, altered,
+translated, scaled and changed nodes, and by comparing the node attribute values with
+those at the time of the copy. Likewise undo and redo only create new nodes for those
+nodes which differ from the state being restored and reuse the others.
+
+The stack is limited in memory, the oldest states are dropped first.
 """
 
+import sys
+from array import array
+from copy import copy
+
 
 class UndoState:
     def __init__(self, state, message=None):
@@ -18,17 +31,257 @@ class UndoState:
         return self.message
 
 
+def _signature(node):
+    """
+    The attribute values of the node, used to see whether attributes were replaced. The items
+    of dict, list and tuple values are included, since settings are changed within their dict.
+    """
+    signature = []
+    for k, v in node.__dict__.items():
+        if k.startswith("_"):
+            continue
+        signature.append(v)
+        if isinstance(v, dict):
+            signature.append(len(v))
+            signature.extend(v.keys())
+            signature.extend(v.values())
+        elif isinstance(v, (list, tuple)):
+            signature.append(len(v))
+            signature.extend(v)
+    return signature
+
+
+def _same(a, b):
+    if a is None or len(a) != len(b):
+        return False
+    for p, q in zip(a, b):
+        if p is not q:
+            return False
+    return True
+
+
+def _node_size(node):
+    """
+    Estimated memory of a node copy, excluding images which are shared with the original.
+    """
+    size = sys.getsizeof(node) + sys.getsizeof(node.__dict__)
+    for k, v in node.__dict__.items():
+        if k.startswith("_"):
+            continue
+        if k == "image":
+            continue
+        segments = getattr(v, "segments", None)
+        if segments is not None and hasattr(segments, "nbytes"):
+            # Geomstr
+            size += segments.nbytes
+            continue
+        try:
+            size += 64 * len(v)
+        except TypeError:
+            size += sys.getsizeof(v)
+    return size
+
+
+def _image_size(image):
+    try:
+        return image.width * image.height * len(image.getbands())
+    except AttributeError:
+        return 0
+
+
 class Undo:
-    def __init__(self, tree):
+    def __init__(self, tree, memory_limit=None):
+        """
+        @param tree: root node of the tree
+        @param memory_limit: maximal estimated memory of all states in bytes, None for unlimited.
+        """
         self.tree = tree
+        self.memory_limit = memory_limit
         self._undo_stack = []
         self._undo_index = -1
+
+        # id(node) -> (node, copy, signature) of the last copy of each node.
+        self._copies = {}
+        # id(copy) -> node, the node which currently equals that copy.
+        self._originals = {}
+        # id of nodes changed since they were copied.
+        self._dirty = set()
+        # id(copy) -> [copy, number of states using it, size]
+        self._usage = {}
+        # id(image) -> [number of copies using it, size]
+        self._images = {}
+        self._memory = 0
+
+        tree.listen(self)
         self.mark("init")  # Set initial tree state.
         self.message = None
 
     def __str__(self):
         return f"Undo(#{self._undo_index} in list of {len(self._undo_stack)} states)"
 
+    # Tree notifications for changed nodes.
+
+    def _changed(self, node, **kwargs):
+        self._dirty.add(id(node))
+
+    node_changed = _changed
+    modified = _changed
+    altered = _changed
+    translated = _changed
+    scaled = _changed
+
+    def _copy_of(self, node):
+        """
+        Provides the copy of the node, reusing the previous copy if the node did not change.
+        """
+        key = id(node)
+        signature = _signature(node)
+        entry = self._copies.get(key)
+        if (
+            entry is not None
+            and entry[0] is node
+            and key not in self._dirty
+            and _same(entry[2], signature)
+        ):
+            return entry[1]
+        node_copy = copy(node)
+        self._copies[key] = node, node_copy, signature
+        return node_copy
+
+    def _capture(self):
+        """
+        Captures the tree state. Nodes are stored in preorder, with the index of their parent
+        and for reference nodes the index of the referenced node.
+        """
+        nodes = []
+        parents = array("l")
+        references = {}
+
+        def walk(parent, parent_index):
+            for c in parent._children:
+                index = len(nodes)
+                nodes.append(c)
+                parents.append(parent_index)
+                walk(c, index)
+
+        walk(self.tree, -1)
+        indexes = {id(n): i for i, n in enumerate(nodes)}
+        for i, n in enumerate(nodes):
+            if n.type == "reference":
+                references[i] = indexes[id(n.node)]
+        copies = [self._copy_of(n) for n in nodes]
+
+        # Only nodes in the tree are kept.
+        self._copies = {id(n): self._copies[id(n)] for n in nodes}
+        self._originals = {id(c): n for n, c in zip(nodes, copies)}
+        self._dirty.clear()
+        return copies, parents, references
+
+    def _restore(self, state):
+        """
+        Restores the tree state, reusing the existing nodes which equal their copy in the state.
+        """
+        copies, parents, references = state
+        for key in self._dirty:
+            # Changed nodes no longer equal their copy.
+            entry = self._copies.pop(key, None)
+            if entry is not None:
+                self._originals.pop(id(entry[1]), None)
+        self._dirty.clear()
+
+        root = self.tree
+        nodes = []
+        fresh = []
+        used = set()
+        for node_copy in copies:
+            node = self._originals.get(id(node_copy))
+            if node is not None:
+                entry = self._copies.get(id(node))
+                if (
+                    id(node) in used
+                    or entry is None
+                    or entry[1] is not node_copy
+                    or not _same(entry[2], _signature(node))
+                ):
+                    node = None
+            if node is None:
+                node = copy(node_copy)
+                fresh.append(len(nodes))
+            used.add(id(node))
+            node._children.clear()
+            node._references.clear()
+            node._root = root
+            nodes.append(node)
+        branches = []
+        for node, parent_index in zip(nodes, parents):
+            if parent_index == -1:
+                node._parent = root
+                branches.append(node)
+            else:
+                parent = nodes[parent_index]
+                node._parent = parent
+                parent._children.append(node)
+        for index, referenced_index in references.items():
+            node = nodes[index]
+            referenced = nodes[referenced_index]
+            node.node = referenced
+            referenced._references.append(node)
+        # New nodes and the relinked references now equal their copies.
+        for index in set(fresh).union(references):
+            node = nodes[index]
+            node_copy = copies[index]
+            self._copies[id(node)] = node, node_copy, _signature(node)
+            self._originals[id(node_copy)] = node
+        for node in nodes:
+            node.set_dirty_bounds()
+        self.tree.restore_tree(branches)
+
+    def _acquire(self, state):
+        for node_copy in state[0]:
+            usage = self._usage.get(id(node_copy))
+            if usage is not None:
+                usage[1] += 1
+                continue
+            size = _node_size(node_copy)
+            self._usage[id(node_copy)] = [node_copy, 1, size]
+            self._memory += size
+            image = getattr(node_copy, "image", None)
+            if image is not None:
+                images = self._images.get(id(image))
+                if images is None:
+                    images = [image, 0, _image_size(image)]
+                    self._images[id(image)] = images
+                    self._memory += images[2]
+                images[1] += 1
+        self._memory += sys.getsizeof(state[0]) + sys.getsizeof(state[1])
+
+    def _release(self, state):
+        for node_copy in state[0]:
+            usage = self._usage[id(node_copy)]
+            usage[1] -= 1
+            if usage[1]:
+                continue
+            del self._usage[id(node_copy)]
+            self._memory -= usage[2]
+            image = getattr(node_copy, "image", None)
+            if image is not None:
+                images = self._images[id(image)]
+                images[1] -= 1
+                if not images[1]:
+                    del self._images[id(image)]
+                    self._memory -= images[2]
+        self._memory -= sys.getsizeof(state[0]) + sys.getsizeof(state[1])
+
+    def _evict(self):
+        """
+        Drops the oldest states while the memory limit is exceeded. The current state is kept.
+        """
+        if self.memory_limit is None:
+            return
+        while self._memory > self.memory_limit and self._undo_index > 0:
+            self._release(self._undo_stack.pop(0).state)
+            self._undo_index -= 1
+
     def mark(self, message=None):
         """
         Marks an undo state require a backup the tree information.
@@ -37,37 +290,35 @@ class Undo:
 
         @return:
         """
-        self._undo_index += 1
         if message is None:
             message = self.message
         try:
-            self._undo_stack.insert(
-                self._undo_index, UndoState(self.tree.backup_tree(), message=message)
-            )
+            state = self._capture()
         except KeyError:
             # Hit a concurrent issue.
-            pass
+            self.message = None
+            return
+        for undo in self._undo_stack[self._undo_index + 1 :]:
+            self._release(undo.state)
         del self._undo_stack[self._undo_index + 1 :]
+        self._undo_index += 1
+        self._undo_stack.append(UndoState(state, message=message))
+        self._acquire(state)
+        self._evict()
         self.message = None
 
     def undo(self):
         """
         Performs an undo operation restoring the tree state.
 
-        Note: because the undo.state is used directly, the UndoState's state must be
-        given a fresh copy.
         @return:
         """
-        if self._undo_index == 0:
+        if self._undo_index <= 0:
             # At bottom of stack.
             return False
         self._undo_index -= 1
         undo = self._undo_stack[self._undo_index]
-        self.tree.restore_tree(undo.state)
-        try:
-            undo.state = self.tree.backup_tree()  # Get unused copy
-        except KeyError:
-            pass
+        self._restore(undo.state)
         return True
 
     def redo(self):
@@ -78,14 +329,26 @@ class Undo:
             return False
         self._undo_index += 1
         redo = self._undo_stack[self._undo_index]
-        self.tree.restore_tree(redo.state)
-        try:
-            redo.state = self.tree.backup_tree()  # Get unused copy
-        except KeyError:
-            pass
+        self._restore(redo.state)
         return True
 
     def undolist(self):
         for i, v in enumerate(self._undo_stack):
             q = "*" if i == self._undo_index else " "
             yield f"{q}{str(i).ljust(5)}: state {str(v)}"
+
+    def stats(self):
+        """
+        Provides the memory statistics of the undo stack.
+
+        @return: dict of states, nodes (total over states), copies (distinct node copies),
+            images (distinct images), memory (estimated bytes) and limit.
+        """
+        return {
+            "states": len(self._undo_stack),
+            "nodes": sum(len(u.state[0]) for u in self._undo_stack),
+            "copies": len(self._usage),
+            "images": len(self._images),
+            "memory": self._memory,
+            "limit": self.memory_limit,
+        }
@@ -15,6 +15,60 @@ PLOT_LEFT_UPPER = 512
 PLOT_RIGHT_LOWER = 1024
 
 
+def register_estimate_choices(device):
+    """
+    Registers the choices of the motion model of the time estimate of the device, see meerk40t.core.estimator.
+
+    @param device: device service
+    @return:
+    """
+    _ = device.kernel.translation
+    device.setting(bool, "estimate_log_motion", True)
+    device.setting(float, "estimate_acceleration", 1000.0)
+    device.setting(float, "estimate_junction_deviation", 0.05)
+    device.setting(float, "estimate_rapid_speed", 0.0)
+    choices = [
+        {
+            "attr": "estimate_log_motion",
+            "object": device,
+            "default": True,
+            "type": bool,
+            "label": _("Log job motion"),
+            "tip": _(
+                "Logs the motion of completed jobs, 'plan estimate --calibrate' fits the time estimate to them."
+            ),
+        },
+        {
+            "attr": "estimate_acceleration",
+            "object": device,
+            "default": 1000.0,
+            "type": float,
+            "label": _("Acceleration"),
+            "trailer": "mm/s²",
+            "tip": _("Acceleration of the laser head, 0 estimates at constant speed."),
+        },
+        {
+            "attr": "estimate_junction_deviation",
+            "object": device,
+            "default": 0.05,
+            "type": float,
+            "label": _("Junction deviation"),
+            "trailer": "mm",
+            "tip": _("Limits the speed through corners, larger values corner faster."),
+        },
+        {
+            "attr": "estimate_rapid_speed",
+            "object": device,
+            "default": 0.0,
+            "type": float,
+            "label": _("Rapid speed"),
+            "trailer": "mm/s",
+            "tip": _("Travel speed between cuts, 0 uses the rapid speed of the cuts."),
+        },
+    ]
+    device.register_choices("estimate", choices)
+
+
 def plugin(kernel, lifecycle=None):
     if lifecycle == "plugins":
         from .ch341 import ch341
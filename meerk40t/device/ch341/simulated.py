@@ -0,0 +1,165 @@
+# MIT License.
+
+import time
+
+from ...lihuiyu.controller import (
+    STATUS_BUSY,
+    STATUS_ERROR,
+    STATUS_FINISH,
+    STATUS_OK,
+    onewire_crc_lookup,
+)
+from .ch341 import Connection as CH341Connection
+
+
+class SimulatedCH341(CH341Connection):
+    """
+    Simulated CH341 connected to a Lihuiyu board. Packets are checked and counted rather than sent anywhere, and the
+    status reads answer with the handshake of the board:
+
+    * BUSY for the given number of status reads after each packet, or while the board buffer is full.
+    * OK once the packet is accepted, ERROR once if its crc failed.
+    * FINISH once after the board executed all accepted packets.
+
+    Latencies are in seconds and are slept by the calls, as the usb transfers would take that time.
+    """
+
+    def __init__(
+        self,
+        channel=None,
+        state=None,
+        write_latency=0.0,
+        status_latency=0.0,
+        busy_polls=0,
+        packet_time=0.0,
+        buffer_packets=None,
+    ):
+        """
+        @param channel: usb log channel
+        @param state: state change function
+        @param write_latency: seconds each packet write takes.
+        @param status_latency: seconds each status read takes.
+        @param busy_polls: status reads answering BUSY after each packet.
+        @param packet_time: seconds the board takes to execute a packet, 0 executes instantly.
+        @param buffer_packets: packets the board buffers before it reports BUSY, None for unlimited.
+        """
+        CH341Connection.__init__(self, channel, state)
+        self.channel = channel if channel is not None else lambda code: None
+        self.state = state if state is not None else lambda state: None
+        self.driver_name = "Simulated"
+        self.driver_value = None
+
+        self.write_latency = write_latency
+        self.status_latency = status_latency
+        self.busy_polls = busy_polls
+        self.packet_time = packet_time
+        self.buffer_packets = buffer_packets
+
+        self.packets = []
+        self.keep_packets = True
+        self.packet_count = 0
+        self.byte_count = 0
+        self.error_count = 0
+        self.status_count = 0
+
+        self._busy = 0
+        self._reply = None
+        self._executed = 0.0
+        self._finished = True
+
+    @property
+    def finished(self):
+        """
+        Whether FINISH was reported since the last accepted packet.
+        """
+        return self._finished
+
+    def validate(self):
+        pass
+
+    def open(self):
+        if self.driver_value is None:
+            self.state("STATE_USB_CONNECTED")
+            self.driver_value = 0
+            self.index = 0
+            self.chipv = 999
+
+    def close(self):
+        self.driver_value = None
+        self.index = None
+        self.chipv = None
+        self.state("STATE_USB_DISCONNECTED")
+
+    def release(self):
+        pass
+
+    def reset(self):
+        self._busy = 0
+        self._reply = None
+        self._executed = 0.0
+        self._finished = True
+
+    def write(self, packet):
+        """
+        Receives a 32 byte packet, \x00 + 30 bytes + CRC.
+
+        @param packet: 32 bytes of data.
+        @return:
+        """
+        if self.driver_value is None:
+            raise ConnectionError
+        if self.write_latency:
+            time.sleep(self.write_latency)
+        self._busy = self.busy_polls
+        if len(packet) != 32 or onewire_crc_lookup(packet[1:31]) != packet[31]:
+            self.error_count += 1
+            self._reply = STATUS_ERROR
+            return
+        self._reply = STATUS_OK
+        self.packet_count += 1
+        self.byte_count += len(packet)
+        if self.keep_packets:
+            self.packets.append(bytes(packet[1:31]))
+        now = time.perf_counter()
+        self._executed = max(self._executed, now) + self.packet_time
+        self._finished = False
+
+    def write_addr(self, packet):
+        if self.driver_value is None:
+            raise ConnectionError
+
+    def _backlog(self):
+        if not self.packet_time:
+            return 0
+        return (self._executed - time.perf_counter()) / self.packet_time
+
+    def get_status(self):
+        """
+        Status of the simulated board.
+
+        @return: status bytes, the second being the status code.
+        """
+        if self.driver_value is None:
+            raise ConnectionError
+        if self.status_latency:
+            time.sleep(self.status_latency)
+        self.status_count += 1
+        if self._busy > 0:
+            self._busy -= 1
+            status = STATUS_BUSY
+        elif self.buffer_packets is not None and self._backlog() > self.buffer_packets:
+            status = STATUS_BUSY
+        elif self._reply is not None:
+            status = self._reply
+            self._reply = None
+        elif not self._finished and self._backlog() <= 0:
+            self._finished = True
+            status = STATUS_FINISH
+        else:
+            status = STATUS_OK
+        return [255, status, 0, 0, 0, 1]
+
+    def get_chip_version(self):
+        if self.driver_value is None:
+            raise ConnectionRefusedError
+        return 999
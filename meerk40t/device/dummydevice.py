@@ -2,6 +2,7 @@ from meerk40t.core.spoolers import Spooler
 from meerk40t.kernel import Service
 
 from ..core.units import UNITS_PER_MIL, ViewPort
+from .basedevice import register_estimate_choices
 
 
 def plugin(kernel, lifecycle=None):
@@ -24,6 +25,7 @@ class DummyDevice(Service, ViewPort):
         self.settings = dict()
         self.state = 0
         self.spooler = Spooler(self, "default")
+        register_estimate_choices(self)
         self.viewbuffer = ""
         self.label = "Dummy Device"
 
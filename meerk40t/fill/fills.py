@@ -51,6 +51,36 @@ def split(points):
         yield points[pos : len(points)]
 
 
+def outline_points(outline):
+    """
+    Outline as complex numpy array. Outlines are complex arrays, as given by Geomstr.as_polylines(), or sequences
+    of points.
+    """
+    import numpy as np
+
+    if isinstance(outline, np.ndarray) and np.iscomplexobj(outline):
+        return outline
+    return np.array([complex(p[0], p[1]) for p in outline], dtype=complex)
+
+
+def rotated_points(outline, rotation):
+    """
+    Points of the outline rotated by the complex rotation, as x, y tuples. Complex arrays are rotated at once,
+    sequences of points point by point.
+    """
+    if getattr(outline, "dtype", None) is not None and outline.dtype.kind == "c":
+        pts = outline * rotation
+        return list(zip(pts.real.tolist(), pts.imag.tolist()))
+    points = []
+    for p in outline:
+        if p is None:
+            points.append(None)
+            continue
+        pt = complex(p[0], p[1]) * rotation
+        points.append((pt.real, pt.imag))
+    return points
+
+
 def eulerian_fill(settings, outlines, matrix, limit=None):
     """
     Applies optimized Eulerian fill
@@ -71,13 +101,7 @@ def eulerian_fill(settings, outlines, matrix, limit=None):
     rotate = Matrix.rotate(angle)
     counter_rotate = Matrix.rotate(-angle)
 
-    def mx_rotate(pt):
-        if pt is None:
-            return None
-        return (
-            pt[0] * rotate.a + pt[1] * rotate.c + 1 * rotate.e,
-            pt[0] * rotate.b + pt[1] * rotate.d + 1 * rotate.f,
-        )
+    rotation = complex(rotate.a, rotate.b)
 
     def mx_counter(pt):
         if pt is None:
@@ -90,9 +114,8 @@ def eulerian_fill(settings, outlines, matrix, limit=None):
     transformed_vector = matrix.transform_vector([0, distance_y])
     distance = abs(complex(transformed_vector[0], transformed_vector[1]))
     efill = EulerianFill(distance)
-    for sp in outlines:
-        sp = list(map(mx_rotate, sp))
-        efill += sp
+    for outline in outlines:
+        efill += rotated_points(outline, rotation)
     if limit and efill.estimate() > limit:
         return []
     points = efill.get_fill()
@@ -121,13 +144,7 @@ def scanline_fill(settings, outlines, matrix, limit=None):
     rotate = Matrix.rotate(angle)
     counter_rotate = Matrix.rotate(-angle)
 
-    def mx_rotate(pt):
-        if pt is None:
-            return None
-        return (
-            pt[0] * rotate.a + pt[1] * rotate.c + 1 * rotate.e,
-            pt[0] * rotate.b + pt[1] * rotate.d + 1 * rotate.f,
-        )
+    rotation = complex(rotate.a, rotate.b)
 
     def mx_counter(pt):
         if pt is None:
@@ -142,8 +159,7 @@ def scanline_fill(settings, outlines, matrix, limit=None):
 
     vm = VectorMontonizer()
     for outline in outlines:
-        pts = list(map(Point, map(mx_rotate, outline)))
-        vm.add_polyline(pts)
+        vm.add_polyline(list(map(Point, rotated_points(outline, rotation))))
     y_min, y_max = vm.event_range()
     height = y_max - y_min
     try:
@@ -180,6 +196,104 @@ def scanline_fill(settings, outlines, matrix, limit=None):
     return points
 
 
+def fast_scanline_fill(settings, outlines, matrix, limit=None):
+    """
+    Applies scanline fill, computing all scanline intercepts at once with numpy.
+
+    Gives the same hatch lines as scanline_fill. All edges are rotated at once, the scanlines crossing each edge are
+    found by bisecting the scanline positions and all intercepts are sorted by scanline and position.
+    @return:
+    """
+    import numpy as np
+
+    if matrix is None:
+        matrix = Matrix()
+
+    settings = dict(settings)
+    h_dist = settings.get("hatch_distance", "1mm")
+    h_angle = settings.get("hatch_angle", "0deg")
+    distance_y = float(Length(h_dist))
+    if isinstance(h_angle, float):
+        angle = Angle.degrees(h_angle)
+    else:
+        angle = Angle.parse(h_angle)
+
+    rotate = Matrix.rotate(angle)
+    rotation = complex(rotate.a, rotate.b)
+
+    transformed_vector = matrix.transform_vector([0, distance_y])
+    distance = abs(complex(transformed_vector[0], transformed_vector[1]))
+
+    starts = []
+    ends = []
+    for outline in outlines:
+        pts = outline_points(outline)
+        if len(pts) < 2:
+            continue
+        starts.append(pts[:-1])
+        ends.append(pts[1:])
+    if not starts:
+        return []
+    starts = np.concatenate(starts) * rotation
+    ends = np.concatenate(ends) * rotation
+    sy = starts.imag
+    ey = ends.imag
+    y_min = min(np.min(sy), np.min(ey))
+    y_max = max(np.max(sy), np.max(ey))
+    height = y_max - y_min
+    try:
+        count = height / distance
+    except ZeroDivisionError:
+        return []
+    if limit and count > limit:
+        return []
+
+    # Scanlines, stepped by repeated addition as the scanline fill does.
+    steps = np.full(int((height + 2 * distance) / distance) + 3, distance)
+    steps[0] = y_min - distance
+    scanlines = np.cumsum(steps)
+    n = np.searchsorted(scanlines, y_max + distance, side="right")
+    scanlines = scanlines[1 : n + 1]
+
+    # Edges are crossed by the scanlines within low < y <= high.
+    low = np.minimum(sy, ey)
+    high = np.maximum(sy, ey)
+    first = np.searchsorted(scanlines, low, side="right")
+    last = np.searchsorted(scanlines, high, side="right")
+    crossings = np.maximum(last - first, 0)
+    total = int(np.sum(crossings))
+    if total == 0:
+        return []
+    edge = np.repeat(np.arange(len(crossings)), crossings)
+    offsets = np.cumsum(crossings) - crossings
+    line = first[edge] + np.arange(total) - offsets[edge]
+    y = scanlines[line]
+    x0 = starts.real[edge]
+    y0 = sy[edge]
+    x1 = ends.real[edge]
+    y1 = ey[edge]
+    x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+
+    # Every other scanline runs backwards, pairs are taken in the direction of the scanline.
+    backwards = (line % 2).astype(bool)
+    order = np.lexsort((np.where(backwards, -x, x), line))
+    line = line[order]
+    x = x[order]
+    y = y[order]
+    counts = np.bincount(line)
+    line_start = np.cumsum(counts) - counts
+    position = np.arange(total) - line_start[line]
+    keep = position < (counts[line] // 2) * 2
+    hatch = (x[keep] + 1j * y[keep]) / rotation
+
+    points = [None] * (len(hatch) // 2 * 3)
+    xs = hatch.real.tolist()
+    ys = hatch.imag.tolist()
+    points[0::3] = zip(xs[0::2], ys[0::2])
+    points[1::3] = zip(xs[1::2], ys[1::2])
+    return points
+
+
 def circle(wobble, x0, y0, x1, y1):
     if x1 is None or y1 is None:
         yield x0, y0
@@ -295,6 +409,7 @@ def plugin(kernel, lifecycle):
         context = kernel.root
         context.register("hatch/scanline", scanline_fill)
         context.register("hatch/eulerian", eulerian_fill)
+        context.register("hatch/fast_scanline", fast_scanline_fill)
         context.register("wobble/circle", circle)
         context.register("wobble/circle_right", circle_right)
         context.register("wobble/circle_left", circle_left)
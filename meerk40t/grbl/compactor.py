@@ -0,0 +1,151 @@
+"""
+GRBL Gcode Compactor
+
+Reduces the number of lines and the number of words of the moves written by the GRBL driver. Consecutive
+collinear moves with the same motion mode, power and feedrate are merged into a single move. Words which
+repeat the modal state of the controller (G0/G1, unchanged X or Y, S and F) are dropped.
+
+The compactor holds the last move until the following move shows whether it can be merged, so it must
+be flushed before any other gcode is written.
+"""
+
+
+class GcodeCompactor:
+    def __init__(self, write, line_end="\r", tolerance=0.0):
+        """
+        @param write: function that is given each compacted gcode line.
+        @param line_end: line ending to use for each line.
+        @param tolerance: maximal distance, in gcode units, merged points may be away from the merged move.
+        """
+        self.write = write
+        self.line_end = line_end
+        self.tolerance = tolerance
+        self.lines = 0
+        self.moves = 0
+
+        # Modal state of the controller, None is unknown.
+        self._g = None
+        self._x = None
+        self._y = None
+        self._s = None
+        self._f = None
+
+        self._pending = None
+
+    def reset(self):
+        """
+        Forget the modal state, the next move is written with all its words.
+        @return:
+        """
+        self.flush()
+        self._g = None
+        self._x = None
+        self._y = None
+        self._s = None
+        self._f = None
+
+    def move(self, g, x, y, s=None, f=None):
+        """
+        Adds a move. Power and feedrate are only given if they are to be set by this move, otherwise
+        the modal power and feedrate apply.
+
+        @param g: motion mode 0 or 1
+        @param x: x position in gcode units
+        @param y: y position in gcode units
+        @param s: power value or None
+        @param f: feedrate value or None
+        @return:
+        """
+        self.moves += 1
+        x = round(x, 3)
+        y = round(y, 3)
+        pending = self._pending
+        if pending is not None:
+            p_g, start, points, end, p_s, p_f = pending
+        else:
+            p_g, start, points, end, p_s, p_f = (
+                self._g,
+                None,
+                None,
+                (self._x, self._y),
+                self._s,
+                self._f,
+            )
+        s = p_s if s is None else f"{s:.1f}"
+        f = p_f if f is None else f"{f:.1f}"
+        if pending is not None:
+            if start == end:
+                # Pending move only changed the modal state, the new move carries that state.
+                self._pending = g, start, [], (x, y), s, f
+                return
+            if g == p_g and s == p_s and f == p_f:
+                if end == (x, y):
+                    # Zero length move, with no changes.
+                    return
+                if self._collinear(start, points, end, (x, y)):
+                    points.append(end)
+                    self._pending = g, start, points, (x, y), s, f
+                    return
+            self.flush()
+        self._pending = g, end, [], (x, y), s, f
+
+    def _collinear(self, start, points, end, new_end):
+        """
+        Checks whether the move from start through points and end can be replaced by start to new_end.
+        """
+        if start[0] is None or start[1] is None:
+            return False
+        sx, sy = start
+        ex, ey = end
+        nx, ny = new_end
+        # The new segment must continue in the same direction.
+        if (ex - sx) * (nx - ex) + (ey - sy) * (ny - ey) <= 0:
+            return False
+        dx = nx - sx
+        dy = ny - sy
+        length = (dx * dx + dy * dy) ** 0.5
+        if self.tolerance <= 0:
+            # Exactly collinear with the pending move, which is itself a straight line.
+            return abs((ex - sx) * (ny - ey) - (ey - sy) * (nx - ex)) <= 1e-9 * length
+        limit = self.tolerance * length
+        if abs(dx * (ey - sy) - dy * (ex - sx)) > limit:
+            return False
+        for px, py in points:
+            if abs(dx * (py - sy) - dy * (px - sx)) > limit:
+                return False
+        return True
+
+    def flush(self):
+        """
+        Writes the pending move.
+        @return:
+        """
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        g, start, points, end, s, f = pending
+        x, y = end
+        words = []
+        if x != self._x:
+            words.append(f"X{x:.3f}")
+        if y != self._y:
+            words.append(f"Y{y:.3f}")
+        if s is not None and s != self._s:
+            words.append(f"S{s}")
+        if f is not None and f != self._f:
+            words.append(f"F{f}")
+        if not words:
+            # Nothing moves or changes, a change of motion mode alone does nothing.
+            return
+        if g != self._g:
+            words.insert(0, f"G{g}")
+        self._g = g
+        self._x = x
+        self._y = y
+        if s is not None:
+            self._s = s
+        if f is not None:
+            self._f = f
+        self.lines += 1
+        self.write(" ".join(words) + self.line_end)
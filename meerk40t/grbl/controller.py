@@ -39,6 +39,10 @@ class GrblController:
         self.old_x = 0
         self.old_y = 0
         self._buffer_fail = 0
+        # Streaming mode limits the buffer signals to this interval in seconds.
+        self.signal_interval = 0.1
+        self._last_buffer_signal = 0
+        self._pipe_running = None
         self.grbl_settings = {
             0: 10,  # step pulse microseconds
             1: 25,  # step idle delay
@@ -127,9 +131,13 @@ class GrblController:
         self.service.signal("serial;write", data)
         with self._lock:
             self._sending_queue.append(data)
-            self.service.signal(
-                "serial;buffer", len(self._sending_queue) + len(self._realtime_queue)
-            )
+            if self.service.buffer_mode == "streaming":
+                self._signal_buffer()
+            else:
+                self.service.signal(
+                    "serial;buffer",
+                    len(self._sending_queue) + len(self._realtime_queue),
+                )
             self._lock.notify()
 
     def realtime(self, data):
@@ -325,7 +333,35 @@ class GrblController:
         response = None
         while not response:
             response = self.connection.read()
-        self.service.signal("serial;response", response)
+        return self._process_response(response)
+
+    def _recv_pending_responses(self):
+        """
+        Read and process all responses which are already waiting, without blocking.
+
+        @return: number of "ok" responses
+        """
+        count = 0
+        while self.commands_in_device_buffer:
+            response = self.connection.read()
+            if not response:
+                break
+            if self._process_response(response, signal=response != "ok"):
+                count += 1
+        if count:
+            self.service.signal("serial;response", "ok")
+        return count
+
+    def _process_response(self, response, signal=True):
+        """
+        Process a single response from grbl.
+
+        @param response: response line read from the connection
+        @param signal: send serial;response signal for this response
+        @return: True if the response was an "ok"
+        """
+        if signal:
+            self.service.signal("serial;response", response)
         # print(f"Response: '{response}'")
         if response == "ok":
             try:
@@ -449,6 +485,59 @@ class GrblController:
                     pass
                     # we should do something like raising an error... for tat to decide
 
+    def _signal_buffer(self):
+        """
+        Signal the size of the sending queue, at most once per signal_interval.
+
+        @return:
+        """
+        t = time.time()
+        if t - self._last_buffer_signal < self.signal_interval and self._sending_queue:
+            return
+        self._last_buffer_signal = t
+        self.service.signal(
+            "serial;buffer", len(self._sending_queue) + len(self._realtime_queue)
+        )
+
+    def _sending_streaming(self):
+        """
+        Streaming connection fills the planning buffer with as many lines as fit and sends
+        them with a single write. Then all the responses already received are processed
+        together, and only if no room was freed does it wait for the next response.
+
+        @return:
+        """
+        while self._realtime_queue:
+            self._sending_realtime()
+        lines = []
+        with self._lock:
+            queue = self._sending_queue
+            count = 0
+            # A line longer than the buffer is sent on its own, into an empty buffer.
+            while count < len(queue) and (
+                self.device_buffer_size > self.buffered_characters + len(queue[count])
+                or not self.commands_in_device_buffer
+            ):
+                line = queue[count]
+                lines.append(line)
+                self.commands_in_device_buffer.append(line)
+                self.buffered_characters += len(line)
+                count += 1
+            del queue[:count]
+        if lines:
+            data = "".join(lines)
+            self.connection.write(data)
+            self.send(data)
+            self._signal_buffer()
+            self._buffer_fail = 0
+        if self.commands_in_device_buffer:
+            if not self._recv_pending_responses() and not lines:
+                # Buffer is full and nothing was pending, wait for a response.
+                self._recv_response()
+                self._recv_pending_responses()
+        elif not lines:
+            self._buffer_fail += 1
+
     def _sending_sync(self):
         """
         Synchronous mode sends 1 line and waits to receive 1 "ok" from the laser
@@ -469,23 +558,37 @@ class GrblController:
         @return:
         """
         while self.connection.connected:
-            self.service.signal("pipe;running", True)
+            self._signal_running(True)
             if (
                 not self._sending_queue
                 and not self._realtime_queue
                 and not self.commands_in_device_buffer
             ):
                 # There is nothing to write, or read
-                self.service.signal("pipe;running", False)
+                self._signal_running(False)
                 with self._lock:
                     # We wait until new data is put in the buffer.
                     self._lock.wait()
-                self.service.signal("pipe;running", True)
+                self._signal_running(True)
             if self.service.buffer_mode == "sync":
                 self._sending_sync()
+            elif self.service.buffer_mode == "streaming":
+                self._sending_streaming()
             else:
                 self._sending_buffered()
-        self.service.signal("pipe;running", False)
+        self._signal_running(False)
+        self._pipe_running = None
+
+    def _signal_running(self, running):
+        """
+        Signal pipe;running only when the running state changes.
+
+        @param running:
+        @return:
+        """
+        if self._pipe_running != running:
+            self._pipe_running = running
+            self.service.signal("pipe;running", running)
 
     def __repr__(self):
         return f"GRBLSerial('{self.service.serial_port}:{str(self.service.serial_baud_rate)}')"
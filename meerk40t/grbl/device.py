@@ -4,6 +4,7 @@ GRBL Device
 Defines the interactions between the device service and the meerk40t's viewport.
 Registers relevant commands and options.
 """
+
 from time import sleep
 
 import serial.tools.list_ports
@@ -13,6 +14,7 @@ from meerk40t.kernel import CommandSyntaxError, Service
 from ..core.laserjob import LaserJob
 from ..core.spoolers import Spooler
 from ..core.units import UNITS_PER_MIL, Length, ViewPort
+from ..device.basedevice import register_estimate_choices
 from .controller import GrblController
 from .driver import GRBLDriver
 
@@ -221,10 +223,10 @@ class GRBLDevice(Service, ViewPort):
                 "default": "buffered",
                 "type": str,
                 "style": "combo",
-                "choices": ["buffered", "sync"],
+                "choices": ["buffered", "streaming", "sync"],
                 "label": _("Sending Protocol"),
                 "tip": _(
-                    "Buffered sends data as long as the planning buffer permits it being sent. Sync requires an 'ok' between each line sent."
+                    "Buffered sends data as long as the planning buffer permits it being sent. Streaming does the same but sends several lines at once and processes all waiting responses together. Sync requires an 'ok' between each line sent."
                 ),
                 "section": "_20_Protocol",
                 "subsection": "_00_",
@@ -239,6 +241,32 @@ class GRBLDevice(Service, ViewPort):
                 "section": "_20_Protocol",
                 "subsection": "_00_",
             },
+            {
+                "attr": "gcode_compaction",
+                "object": self,
+                "default": False,
+                "type": bool,
+                "label": _("Compact Gcode"),
+                "tip": _(
+                    "Merge collinear moves with the same power and drop words that repeat the current state, to send fewer and shorter lines."
+                ),
+                "section": "_20_Protocol",
+                "subsection": "_10_Compaction",
+            },
+            {
+                "attr": "gcode_tolerance",
+                "object": self,
+                "default": 0.0,
+                "type": float,
+                "label": _("Tolerance"),
+                "trailer": "mm",
+                "tip": _(
+                    "Distance merged points may be away from the merged move, 0 merges only exactly collinear moves."
+                ),
+                "section": "_20_Protocol",
+                "subsection": "_10_Compaction",
+                "conditional": (self, "gcode_compaction"),
+            },
             {
                 "attr": "interpolate",
                 "object": self,
@@ -247,6 +275,16 @@ class GRBLDevice(Service, ViewPort):
                 "label": _("Curve Interpolation"),
                 "tip": _("Distance of the curve interpolation in mils"),
             },
+            {
+                "attr": "curve_tolerance",
+                "object": self,
+                "default": "0.01mm",
+                "type": Length,
+                "label": _("Curve Tolerance"),
+                "tip": _(
+                    "Maximal distance of the interpolated curves from the curves, 0 interpolates a fixed number of points."
+                ),
+            },
             {
                 "attr": "line_end",
                 "object": self,
@@ -331,6 +369,7 @@ class GRBLDevice(Service, ViewPort):
         self.channel("grbl-realtime").watch(self.controller.realtime)
 
         self.spooler = Spooler(self, driver=self.driver)
+        register_estimate_choices(self)
         self.add_service_delegate(self.spooler)
         self.add_service_delegate(self.driver)
 
@@ -17,11 +17,13 @@ from meerk40t.core.cutcode.quadcut import QuadCut
 from meerk40t.core.cutcode.setorigincut import SetOriginCut
 from meerk40t.core.cutcode.waitcut import WaitCut
 
+from ..core.drivers import curve_points, curve_tolerance
 from ..core.parameters import Parameters
 from ..core.plotplanner import PlotPlanner
 from ..core.units import UNITS_PER_INCH, UNITS_PER_MIL, UNITS_PER_MM
 from ..device.basedevice import PLOT_FINISH, PLOT_JOG, PLOT_RAPID, PLOT_SETTING
 from ..kernel import signal_listener
+from .compactor import GcodeCompactor
 
 
 class GRBLDriver(Parameters):
@@ -68,6 +70,7 @@ class GRBLDriver(Parameters):
         self.move_mode = 0
         self.reply = None
         self.elements = None
+        self.compactor = None
 
     def __repr__(self):
         return f"GRBLDriver({self.name})"
@@ -219,6 +222,14 @@ class GRBLDriver(Parameters):
             self.grbl(f"M3{self.line_end}")
         else:
             self.grbl(f"M4{self.line_end}")
+        if self.service.gcode_compaction:
+            # Tolerance is given in mm.
+            tolerance = self.service.gcode_tolerance
+            tolerance *= UNITS_PER_MM / self.stepper_step_size / self.unit_scale
+            self.compactor = GcodeCompactor(
+                lambda line: self.grbl(line), self.line_end, tolerance
+            )
+        tolerance = curve_tolerance(self.service)
         for q in self.queue:
             x = self.native_x
             y = self.native_y
@@ -251,19 +262,15 @@ class GRBLDriver(Parameters):
                 self._move(*q.end)
             elif isinstance(q, (QuadCut, CubicCut)):
                 self.move_mode = 1
-                interp = self.service.interpolate
-                step_size = 1.0 / float(interp)
-                t = step_size
-                for p in range(int(interp)):
+                for p in curve_points(q, tolerance, self.service.interpolate):
                     while self.paused:
                         time.sleep(0.05)
-                    self._move(*q.point(t))
-                    t += step_size
-                last_x, last_y = q.end
-                self._move(last_x, last_y)
+                    self._move(*p)
             elif isinstance(q, WaitCut):
+                self._flush_moves()
                 self.wait(q.dwell_time)
             elif isinstance(q, HomeCut):
+                self._flush_moves()
                 self.home()
             elif isinstance(q, GotoCut):
                 start = q.start
@@ -276,6 +283,7 @@ class GRBLDriver(Parameters):
                     x, y = q.start
                 self.set_origin(x, y)
             elif isinstance(q, DwellCut):
+                self._flush_moves()
                 self.dwell(q.dwell_time)
             elif isinstance(q, (InputCut, OutputCut)):
                 # GRBL has no core GPIO functionality
@@ -315,6 +323,8 @@ class GRBLDriver(Parameters):
                     self.on_value = on
                     self._move(x, y)
         self.queue.clear()
+        self._flush_moves()
+        self.compactor = None
 
         self.grbl(f"G1 S0{self.line_end}")
         self.grbl(f"M5{self.line_end}")
@@ -554,13 +564,25 @@ class GRBLDriver(Parameters):
         else:
             self.native_x += x
             self.native_y += y
+        x /= self.unit_scale
+        y /= self.unit_scale
+        if self.compactor is not None:
+            power = None
+            speed = None
+            if self.power_dirty:
+                if self.power is not None:
+                    power = self.power * self.on_value
+                self.power_dirty = False
+            if self.speed_dirty:
+                speed = self.feed_convert(self.speed)
+                self.speed_dirty = False
+            self.compactor.move(self.move_mode, x, y, power, speed)
+            return
         line = []
         if self.move_mode == 0:
             line.append("G0")
         else:
             line.append("G1")
-        x /= self.unit_scale
-        y /= self.unit_scale
         line.append(f"X{x:.3f}")
         line.append(f"Y{y:.3f}")
         if self.power_dirty:
@@ -572,6 +594,14 @@ class GRBLDriver(Parameters):
             self.speed_dirty = False
         self.grbl(" ".join(line) + self.line_end)
 
+    def _flush_moves(self):
+        """
+        Writes any move held by the compactor, and forgets the modal state since other gcode follows.
+        @return:
+        """
+        if self.compactor is not None:
+            self.compactor.reset()
+
     def _clean(self):
         if self.absolute_dirty:
             if self._absolute:
@@ -1,5 +1,6 @@
 import wx
 
+from meerk40t.core.element_types import elem_nodes
 from meerk40t.gui.scene.scene import (
     HITCHAIN_HIT,
     RESPONSE_CHAIN,
@@ -122,7 +123,24 @@ class RectSelectWidget(Widget):
             sy = min(self.start_location[1], self.end_location[1])
             ex = max(self.start_location[0], self.end_location[0])
             ey = max(self.start_location[1], self.end_location[1])
-            for node in elements.elems():
+            # Only elements overlapping the rectangle can be hit.
+            hits = [
+                node
+                for node in elements.element_index.query(
+                    (sx, sy, ex, ey), ordered=False
+                )
+                if node.type in elem_nodes
+            ]
+            if not ("shift" in self.modifiers or "ctrl" in self.modifiers):
+                # Replace Selection, elements outside the rectangle are unselected.
+                hit_ids = set(id(node) for node in hits)
+                others = list(elements.elems(emphasized=True))
+                others.extend(elements.elems(selected=True))
+                for node in others:
+                    if id(node) not in hit_ids:
+                        node.emphasized = False
+                        node.selected = False
+            for node in hits:
                 try:
                     q = node.bounds
                 except AttributeError:
@@ -1820,23 +1820,29 @@ class SimulationWidget(Widget):
                     # if msg != self.last_msg:
                     #     print (msg)
                     #     self.last_msg = msg
+                    # Scanline reached, taken from the encoded runs of the raster.
+                    pos_x, pos_y = cut.position_at(residual)
+                    row = int((pos_y - cut.offset_y) / cut.step_y)
+                    row = max(0, min(row, cut._cache_height - 1))
+                    col = int((pos_x - cut.offset_x) / cut.step_x)
+                    col = max(0, min(col, cut._cache_width - 1))
                     if mode == "T2B":
                         clip_w = cut._cache_width
-                        clip_h = int(residual * cut._cache_height)
+                        clip_h = row + 1
                         clip_x = 0
                         clip_y = 0
                     elif mode == "B2T":
                         clip_w = cut._cache_width
-                        clip_h = int(residual * cut._cache_height)
+                        clip_h = cut._cache_height - row
                         clip_x = 0
                         clip_y = cut._cache_height - clip_h
                     elif mode == "L2R":
-                        clip_w = int(residual * cut._cache_width)
+                        clip_w = col + 1
                         clip_h = cut._cache_height
                         clip_x = 0
                         clip_y = 0
                     elif mode == "R2L":
-                        clip_w = int(residual * cut._cache_width)
+                        clip_w = cut._cache_width - col
                         clip_h = cut._cache_height
                         clip_x = cut._cache_width - clip_w
                         clip_y = 0
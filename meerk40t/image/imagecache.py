@@ -0,0 +1,257 @@
+"""
+Image Cache
+
+Caches the processed images of image nodes. Processing converts the image to grayscale, masks, transforms, applies
+the raster script and dithers. The result depends only on the image pixels and the processing parameters, so it is
+stored under a key hashing both. Replanning an unchanged image reuses the processed image rather than processing it
+again.
+
+The cache keeps the most recently used images in memory, up to a limit in bytes. Optionally, the processed images
+are also written to a directory, which keeps them between sessions.
+
+Images are treated as immutable: the pixel hash is computed once per image object.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+from ..svgelements import Matrix
+
+
+def _image_bytes(image):
+    try:
+        return image.width * image.height * len(image.getbands())
+    except AttributeError:
+        return 0
+
+
+class ImageCache:
+    def __init__(self, memory_limit=256 * 1024 * 1024, directory=None, disk_limit=None):
+        """
+        @param memory_limit: maximal bytes of the images kept in memory
+        @param directory: directory of the disk cache, None for no disk cache.
+        @param disk_limit: maximal bytes of the files in the disk cache, None for unlimited.
+        """
+        self.memory_limit = memory_limit
+        self.directory = directory
+        self.disk_limit = disk_limit
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (matrix, image, state, size)
+        self._entries = OrderedDict()
+        self._memory = 0
+        # id(image) -> (weakref of image, digest)
+        self._digests = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def digest(self, image):
+        """
+        Hash of the image pixels, mode and size. The hash is remembered for as long as the image exists.
+
+        @param image: PIL image
+        @return: hex digest
+        """
+        key = id(image)
+        with self._lock:
+            entry = self._digests.get(key)
+        if entry is not None and entry[0]() is image:
+            return entry[1]
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{image.mode} {image.width} {image.height}".encode())
+        h.update(image.tobytes())
+        palette = image.getpalette()
+        if palette:
+            h.update(bytes(palette))
+        digest = h.hexdigest()
+
+        def forget(ref, key=key):
+            with self._lock:
+                entry = self._digests.get(key)
+                if entry is not None and entry[0] is ref:
+                    del self._digests[key]
+
+        with self._lock:
+            self._digests[key] = weakref.ref(image, forget), digest
+        return digest
+
+    def key(self, image, parameters):
+        """
+        Cache key of the image processed with the given parameters.
+
+        @param image: PIL image
+        @param parameters: repr-able parameters of the processing
+        @return: hex key
+        """
+        h = hashlib.blake2b(digest_size=20)
+        h.update(self.digest(image).encode())
+        h.update(repr(parameters).encode())
+        return h.hexdigest()
+
+    def get(self, key):
+        """
+        Finds the cached processed image.
+
+        @param key: cache key
+        @return: (matrix, image, state) or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                matrix, image, state, size = entry
+                return Matrix(matrix), image, state
+        entry = self._read(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        matrix, image, state = entry
+        self._store(key, matrix, image, state)
+        return Matrix(matrix), image, state
+
+    def put(self, key, matrix, image, state=None):
+        """
+        Adds the processed image to the cache.
+
+        @param key: cache key
+        @param matrix: matrix of the processed image
+        @param image: processed PIL image
+        @param state: additional json values to restore with the image
+        @return:
+        """
+        matrix = Matrix(matrix)
+        self._store(key, matrix, image, state)
+        self._write(key, matrix, image, state)
+
+    def clear(self, disk=False):
+        """
+        Removes all images from memory, and with disk set from the disk cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._memory = 0
+        if disk:
+            for name, path, size, mtime in self._files():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        """
+        @return: dict of entries, memory and disk bytes, hits and misses.
+        """
+        return {
+            "entries": len(self._entries),
+            "memory": self._memory,
+            "disk": sum(f[2] for f in self._files()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _store(self, key, matrix, image, state):
+        size = _image_bytes(image)
+        if self.memory_limit is not None and size > self.memory_limit:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._memory -= old[3]
+            self._entries[key] = matrix, image, state, size
+            self._memory += size
+            if self.memory_limit is None:
+                return
+            while self._memory > self.memory_limit and self._entries:
+                oldest, entry = self._entries.popitem(last=False)
+                self._memory -= entry[3]
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _files(self):
+        if self.directory is None:
+            return []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        files = []
+        for name in names:
+            if not name.endswith(".png"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((name, path, stat.st_size, stat.st_mtime))
+        return files
+
+    def _read(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            from PIL import Image
+
+            with Image.open(path) as file:
+                image = file.copy()
+                info = dict(file.info)
+            matrix = Matrix(*json.loads(info["matrix"]))
+            state = json.loads(info["state"])
+            os.utime(path)
+        except Exception:
+            # Damaged or foreign file, ignored and replaced.
+            return None
+        return matrix, image, state
+
+    def _write(self, key, matrix, image, state):
+        if self.directory is None:
+            return
+        try:
+            from PIL.PngImagePlugin import PngInfo
+
+            os.makedirs(self.directory, exist_ok=True)
+            info = PngInfo()
+            info.add_text(
+                "matrix",
+                json.dumps(
+                    [matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f]
+                ),
+            )
+            info.add_text("state", json.dumps(state))
+            path = self._path(key)
+            temp = f"{path}.{threading.get_ident()}.tmp"
+            image.save(temp, format="PNG", pnginfo=info, compress_level=1)
+            os.replace(temp, path)
+        except (OSError, TypeError, ValueError):
+            return
+        self._prune()
+
+    def _prune(self):
+        if self.disk_limit is None:
+            return
+        files = sorted(self._files(), key=lambda f: f[3])
+        total = sum(f[2] for f in files)
+        for name, path, size, mtime in files:
+            if total <= self.disk_limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+image_cache = ImageCache()
@@ -2,11 +2,12 @@ import os
 import subprocess
 from copy import copy
 
-from meerk40t.kernel import CommandSyntaxError
+from meerk40t.kernel import CommandSyntaxError, get_safe_path
 
 from ..core.exceptions import BadFileError
 from ..core.units import DEFAULT_PPI, UNITS_PER_PIXEL
 from ..svgelements import Angle, Color, Matrix, Path
+from .imagecache import image_cache
 
 
 def plugin(kernel, lifecycle=None):
@@ -59,11 +60,70 @@ def plugin(kernel, lifecycle=None):
             "page": "Input/Output",
             "section": "Input",
         },
+        {
+            "attr": "image_cache_memory",
+            "object": kernel.elements,
+            "default": 256,
+            "type": int,
+            "label": _("Image cache (MB)"),
+            "tip": _(
+                "Memory used to keep processed images, unchanged images are not processed again when a job is planned."
+            ),
+            "page": "Input/Output",
+            "section": "Images",
+            "signals": "image_cache",
+        },
+        {
+            "attr": "image_cache_disk",
+            "object": kernel.elements,
+            "default": False,
+            "type": bool,
+            "label": _("Keep processed images on disk"),
+            "tip": _(
+                "Processed images are also stored in the profile directory, they are reused in later sessions."
+            ),
+            "page": "Input/Output",
+            "section": "Images",
+            "signals": "image_cache",
+        },
     ]
     kernel.register_choices("preferences", choices)
 
     context = kernel.root
 
+    def configure_image_cache(*args):
+        elements = kernel.elements
+        image_cache.memory_limit = max(0, elements.image_cache_memory) * 1024 * 1024
+        if elements.image_cache_disk:
+            image_cache.directory = os.path.join(
+                get_safe_path(kernel.name, create=True), "imagecache"
+            )
+            # The disk cache may hold four times the memory cache.
+            image_cache.disk_limit = 4 * image_cache.memory_limit
+        else:
+            image_cache.directory = None
+
+    configure_image_cache()
+    context.listen("image_cache", configure_image_cache)
+
+    @context.console_argument("action", type=str, help=_("clear"))
+    @context.console_command(
+        "imagecache",
+        help=_("imagecache [clear]"),
+    )
+    def imagecache(command, channel, _, action=None, **kwargs):
+        if action == "clear":
+            image_cache.clear(disk=True)
+            channel(_("Image cache cleared."))
+        elif action is not None:
+            raise CommandSyntaxError
+        stats = image_cache.stats()
+        channel(
+            _(
+                "Image cache: {entries} images, {memory} bytes in memory, {disk} bytes on disk, {hits} hits, {misses} misses."
+            ).format(**stats)
+        )
+
     def update_image_node(node):
         if hasattr(node, "node"):
             node.node.altered()
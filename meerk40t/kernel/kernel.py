@@ -1,4 +1,5 @@
 import functools
+import heapq
 import inspect
 import os
 import platform
@@ -28,6 +29,9 @@ from .states import *
 
 KERNEL_VERSION = "0.0.10"
 
+# Seconds between checks of a due job whose conditional is not met.
+CONDITIONAL_RECHECK = 0.005
+
 RE_ACTIVE = re.compile("service/(.*)/active")
 RE_AVAILABLE = re.compile("service/(.*)/available")
 
@@ -103,11 +107,19 @@ class Kernel(Settings):
         self.scheduler_handles_main_thread_jobs = True
         self.scheduler_handles_default_thread_jobs = True
 
-        self.state = STATE_INITIALIZE
-
         # Scheduler
         self.jobs = {}
         self.scheduler_thread = None
+        # Timer queue of the scheduler thread, (time, sequence, job) ordered by time.
+        self._job_heap = []
+        # Sequence of the current entry of each scheduled job, older entries are skipped.
+        self._job_entries = {}
+        self._job_sequence = 0
+        self._job_handles = None
+        self._scheduler_condition = threading.Condition()
+        self._signals_idle = False
+
+        self.state = STATE_INITIALIZE
 
         # Signal Listener
         self.signal_job = None
@@ -1721,6 +1733,17 @@ class Kernel(Settings):
     # SCHEDULER
     # ==========
 
+    @property
+    def state(self):
+        return self._kernel_state
+
+    @state.setter
+    def state(self, state):
+        self._kernel_state = state
+        # The scheduler thread waits on the condition, and must see state changes.
+        with self._scheduler_condition:
+            self._scheduler_condition.notify_all()
+
     def scheduler_main(self, *args):
         self.schedule_run(defaults=False, mains=True)
 
@@ -1749,45 +1772,162 @@ class Kernel(Settings):
                     # Do not attempt to run defaults.
                     continue
             if job.scheduled:
-                job._next_run = 0  # Set to zero while running.
-                if job._remaining is not None:
-                    job._remaining = job._remaining - 1
-                    if job._remaining <= 0:
-                        del jobs[job_name]
-                    if job._remaining < 0:
-                        continue
-                try:
-                    if job.args is None:
-                        job.process()
-                    else:
-                        job.process(*job.args)
-                except Exception:
-                    import sys
+                self._execute_job(job_name, job)
 
-                    sys.excepthook(*sys.exc_info())
-                job._last_run = time.time()
-                job._next_run += job._last_run + job.interval
+    def _execute_job(self, job_name, job):
+        """
+        Runs a due job, counting down its remaining runs and setting its next run.
+
+        @param job_name: name the job is scheduled under
+        @param job: job
+        @return:
+        """
+        jobs = self.jobs
+        job._next_run = 0  # Set to zero while running.
+        if job._remaining is not None:
+            job._remaining = job._remaining - 1
+            if job._remaining <= 0:
+                if jobs.get(job_name) is job:
+                    del jobs[job_name]
+            if job._remaining < 0:
+                return
+        try:
+            if job.args is None:
+                job.process()
+            else:
+                job.process(*job.args)
+        except Exception:
+            import sys
+
+            sys.excepthook(*sys.exc_info())
+        job._last_run = time.time()
+        job._next_run += job._last_run + job.interval
+
+    def _handles_job(self, job):
+        if job.run_main:
+            return self.scheduler_handles_main_thread_jobs
+        return self.scheduler_handles_default_thread_jobs
+
+    def _queue_job(self, job, when):
+        """
+        Adds the time the job is due to the timer queue of the scheduler thread, replacing any earlier entry of the job.
+
+        @param job: scheduled job
+        @param when: time the job is due
+        @return:
+        """
+        with self._scheduler_condition:
+            self._job_sequence += 1
+            self._job_entries[job.job_name] = self._job_sequence
+            entry = (when, self._job_sequence, job)
+            heapq.heappush(self._job_heap, entry)
+            if self._job_heap[0] is entry:
+                # Sooner than the thread was waiting for.
+                self._scheduler_condition.notify_all()
+
+    def _requeue_jobs(self):
+        """
+        Rebuilds the timer queue from the scheduled jobs. Called by the scheduler thread, holding the condition.
+        """
+        self._job_heap.clear()
+        self._job_entries.clear()
+        for job_name, job in list(self.jobs.items()):
+            if self._handles_job(job) and job._next_run is not None:
+                self._job_sequence += 1
+                self._job_entries[job_name] = self._job_sequence
+                self._job_heap.append((job._next_run, self._job_sequence, job))
+        heapq.heapify(self._job_heap)
+
+    def _signals_pending(self):
+        return (
+            len(self._message_queue) != 0
+            or len(self._adding_listeners) != 0
+            or len(self._removing_listeners) != 0
+        )
+
+    def _wake_signals(self):
+        """
+        Queues the signal job again, if the scheduler thread stopped timing it for lack of signals.
+        """
+        if not self._signals_idle:
+            return
+        with self._scheduler_condition:
+            if not self._signals_idle:
+                return
+            self._signals_idle = False
+            job = self.signal_job
+            if job is not None and self.jobs.get(job.job_name) is job:
+                self._queue_job(job, job._next_run)
+
+    def _next_job(self):
+        """
+        Waits until the earliest job of the timer queue is due.
+
+        @return: job and its entry sequence, or None if the scheduler should end.
+        """
+        condition = self._scheduler_condition
+        heap = self._job_heap
+        with condition:
+            while True:
+                while self.state == STATE_PAUSE:
+                    # The scheduler is paused.
+                    condition.wait(0.1)
+                if self.state in (STATE_END, STATE_TERMINATE):
+                    return None
+                handles = (
+                    self.scheduler_handles_default_thread_jobs,
+                    self.scheduler_handles_main_thread_jobs,
+                )
+                if handles != self._job_handles:
+                    self._job_handles = handles
+                    self._requeue_jobs()
+                if not heap:
+                    condition.wait()
+                    continue
+                when, sequence, job = heap[0]
+                if self._job_entries.get(job.job_name) != sequence:
+                    # Replaced by a later entry, or unscheduled.
+                    heapq.heappop(heap)
+                    continue
+                delay = when - time.time()
+                if delay > 0:
+                    condition.wait(delay)
+                    continue
+                heapq.heappop(heap)
+                del self._job_entries[job.job_name]
+                return job
 
     def run(self, *args) -> None:
         """
         Scheduler main loop.
 
-        Check the Scheduler thread state, and whether it should abort or pause.
-        Check each job, and if that job is scheduled to run. Executes that job.
+        The thread sleeps until the earliest job of the timer queue is due, or it is woken by a change of the jobs or
+        of the kernel state. Jobs run by the main thread are only timed here if the scheduler handles them.
         @return:
         """
         self.state = STATE_ACTIVE
-        while self.state != STATE_END:
-            time.sleep(0.005)  # 200 ticks a second.
-            while self.state == STATE_PAUSE:
-                # The scheduler is paused.
-                time.sleep(0.1)
-            if self.state == STATE_TERMINATE:
+        while True:
+            job = self._next_job()
+            if job is None:
                 break
-            self.schedule_run(
-                self.scheduler_handles_default_thread_jobs,
-                self.scheduler_handles_main_thread_jobs,
-            )
+            job_name = job.job_name
+            if self.jobs.get(job_name) is not job or not self._handles_job(job):
+                continue
+            if job.conditional is not None and not job.conditional():
+                self._queue_job(job, time.time() + CONDITIONAL_RECHECK)
+                continue
+            self._execute_job(job_name, job)
+            if self.jobs.get(job_name) is not job:
+                continue  # Unscheduled or replaced.
+            if job is self.signal_job:
+                with self._scheduler_condition:
+                    # Idle until the next signal. Set before checking, a signal queued meanwhile sees it.
+                    self._signals_idle = True
+                    if not self._signals_pending():
+                        continue
+                    self._signals_idle = False
+            if self._job_entries.get(job_name) is None:
+                self._queue_job(job, job._next_run)
         self.state = STATE_END
 
     def schedule(self, job: "Job") -> "Job":
@@ -1797,6 +1937,8 @@ class Kernel(Settings):
         except AttributeError:
             pass
         self.jobs[job.job_name] = job
+        if job._next_run is not None:
+            self._queue_job(job, job._next_run)
         return job
 
     def unschedule(self, job: "Job") -> "Job":
@@ -1804,6 +1946,8 @@ class Kernel(Settings):
             del self.jobs[job.job_name]
         except KeyError:
             pass  # No such job.
+        with self._scheduler_condition:
+            self._job_entries.pop(job.job_name, None)
         return job
 
     def add_job(
@@ -1884,6 +2028,7 @@ class Kernel(Settings):
         """
         with self._signal_lock:
             self._message_queue[code] = path, message
+        self._wake_signals()
 
     def _process_add_listeners(self):
         # Process any adding listeners.
@@ -2006,6 +2151,7 @@ class Kernel(Settings):
         """
         with self._add_lock:
             self._adding_listeners.append((signal, funct, lifecycle_object))
+        self._wake_signals()
 
     def unlisten(
         self,
@@ -2023,6 +2169,7 @@ class Kernel(Settings):
         """
         with self._remove_lock:
             self._removing_listeners.append((signal, funct, lifecycle_object))
+        self._wake_signals()
         # if len(self._removing_listeners) != len(set(self._removing_listeners)):
         #     print("Warning duplicate listener removing.")
 
@@ -126,6 +126,18 @@ crc_table = [
 ]
 
 
+def _crc_byte_table():
+    """
+    Full 256 entry table, from the 32 entry table of the nibbles.
+    """
+    return bytes(
+        crc_table[b & 0x0F] ^ crc_table[16 + ((b >> 4) & 0x0F)] for b in range(256)
+    )
+
+
+crc_byte_table = _crc_byte_table()
+
+
 def onewire_crc_lookup(line):
     """
     License: 2-clause "simplified" BSD license
@@ -136,12 +148,125 @@ def onewire_crc_lookup(line):
     @return: 8 bit crc of line.
     """
     crc = 0
-    for i in range(0, 30):
-        crc = line[i] ^ crc
-        crc = crc_table[crc & 0x0F] ^ crc_table[16 + ((crc >> 4) & 0x0F)]
+    table = crc_byte_table
+    for b in memoryview(line)[:30]:
+        crc = table[crc ^ b]
     return crc
 
 
+def frame_packet(packet, default_checksum=True):
+    """
+    Frames a 30 byte packet for sending, a leading 0 and the trailing crc.
+
+    @param packet: 30 byte packet
+    @param default_checksum: whether the crc is correct, or deliberately failed.
+    @return: 32 byte frame
+    """
+    frame = bytearray(32)
+    view = memoryview(frame)
+    view[1:31] = packet
+    crc = onewire_crc_lookup(view[1:31])
+    view.release()
+    frame[31] = crc if default_checksum else crc ^ 0xFF
+    return bytes(frame)
+
+
+class PacketBuffer:
+    """
+    Byte buffer which is consumed from its front, packet by packet. Consumed bytes are skipped over rather than deleted,
+    the buffer is compacted once the consumed part is larger than the remaining part. Consuming a large buffer takes
+    linear rather than quadratic time.
+    """
+
+    def __init__(self, data=b""):
+        self._data = bytearray(data)
+        self._start = 0
+        # Position of the front within all data ever written.
+        self.position = 0
+
+    def __len__(self):
+        return len(self._data) - self._start
+
+    def __bytes__(self):
+        return bytes(self._data[self._start :])
+
+    def __iadd__(self, other):
+        self._data += other
+        return self
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            if item < 0:
+                item += len(self)
+            if not 0 <= item < len(self):
+                raise IndexError
+            return self._data[self._start + item]
+        start, stop, step = item.indices(len(self))
+        return bytes(self._data[self._start + start : self._start + stop : step])
+
+    def find(self, sub, start=0, end=None):
+        if end is None:
+            end = len(self)
+        index = self._data.find(sub, self._start + start, self._start + end)
+        if index == -1:
+            return -1
+        return index - self._start
+
+    def consume(self, length):
+        """
+        Removes length bytes from the front of the buffer.
+        """
+        length = min(length, len(self))
+        self._start += length
+        self.position += length
+        if self._start > len(self._data) - self._start:
+            del self._data[: self._start]
+            self._start = 0
+
+
+PIPE_COMMANDS = (b"-", b"*", b"&", b"!", b"#", b"%", b"\x18")
+
+
+def parse_packet(buffer):
+    """
+    Finds the next packet within the buffer, up to 30 bytes or a line end, with its pipe command. Full packets are
+    padded to 30 bytes.
+
+    @param buffer: PacketBuffer or bytes
+    @return: length of the buffer used, packet, pipe command or None
+    """
+    find = buffer.find(b"\n", 0, 30)
+    if find == -1:  # No end found.
+        length = min(30, len(buffer))
+    else:  # Line end found.
+        length = min(30, len(buffer), find + 1)
+    packet = buffer[:length]
+
+    # edge condition of catching only pipe command without '\n'
+    if packet.endswith(PIPE_COMMANDS):
+        packet += buffer[length : length + 1]
+        length += 1
+    command = None
+
+    # find pipe commands.
+    if packet.endswith(b"\n"):
+        packet = packet[:-1]
+        if packet.endswith((b"-", b"*", b"&", b"!", b"%", b"\x18")):
+            command = packet[-1:]
+            packet = packet[:-1]
+        if len(packet) != 0:
+            if packet.endswith(b"#"):
+                packet = packet[:-1]
+                try:
+                    c = packet[-1]
+                except IndexError:
+                    c = ord("F")  # Packet was simply #. We can do nothing.
+                packet += bytes([c]) * (30 - len(packet))  # Padding. '\n'
+            else:
+                packet += b"F" * (30 - len(packet))  # Padding. '\n'
+    return length, packet, command
+
+
 class LihuiyuController:
     """
     K40 Controller controls the Lihuiyu boards sending any queued data to the USB when the signal is not busy.
@@ -158,11 +283,13 @@ class LihuiyuController:
 
         self._thread = None
         self._buffer = (
-            bytearray()
+            PacketBuffer()
         )  # Threadsafe buffered commands to be sent to controller.
         self._realtime_buffer = (
-            bytearray()  # Threadsafe realtime buffered commands to be sent to the controller.
+            PacketBuffer()  # Threadsafe realtime buffered commands to be sent to the controller.
         )
+        # Next packet of the buffer, parsed and framed while the last packet was confirmed.
+        self._prepared = None
         self._queue = bytearray()  # Thread-unsafe additional commands to append.
         self._preempt = (
             bytearray()
@@ -376,9 +503,10 @@ class LihuiyuController:
             self.update_state(STATE_ACTIVE)
 
     def abort(self):
-        self._buffer = bytearray()
+        self._buffer = PacketBuffer()
         self._queue = bytearray()
-        self._realtime_buffer = bytearray()
+        self._realtime_buffer = PacketBuffer()
+        self._prepared = None
         self.context.signal("pipe;buffer", 0)
         self.update_state(STATE_TERMINATE)
 
@@ -562,53 +690,24 @@ class LihuiyuController:
                 # The buffer and realtime buffers are empty. No packet creation possible.
                 return False
 
-        # Find buffer of 30 or containing '\n'.
-        find = buffer.find(b"\n", 0, 30)
-        if find == -1:  # No end found.
-            length = min(30, len(buffer))
-        else:  # Line end found.
-            length = min(30, len(buffer), find + 1)
-        packet = bytes(buffer[:length])
-
-        # edge condition of catching only pipe command without '\n'
-        if packet.endswith((b"-", b"*", b"&", b"!", b"#", b"%", b"\x18")):
-            packet += buffer[length : length + 1]
-            length += 1
+        length, packet, frame, command = self._packet(buffer)
         post_send_command = None
         default_checksum = True
 
-        # find pipe commands.
-        if packet.endswith(b"\n"):
-            packet = packet[:-1]
-            if packet.endswith(b"-"):  # wait finish
-                packet = packet[:-1]
-                post_send_command = self.wait_finished
-            elif packet.endswith(b"*"):  # abort
-                post_send_command = self.abort
-                packet = packet[:-1]
-            elif packet.endswith(b"&"):  # resume
-                self._resume_busy()
-                packet = packet[:-1]
-            elif packet.endswith(b"!"):  # pause
-                self._pause_busy()
-                packet = packet[:-1]
-            elif packet.endswith(b"%"):  # alt-checksum
-                default_checksum = False
-                packet = packet[:-1]
-            elif packet.endswith(b"\x18"):
-                self.state = STATE_TERMINATE
-                self.is_shutdown = True
-                packet = packet[:-1]
-            if len(packet) != 0:
-                if packet.endswith(b"#"):
-                    packet = packet[:-1]
-                    try:
-                        c = packet[-1]
-                    except IndexError:
-                        c = b"F"  # Packet was simply #. We can do nothing.
-                    packet += bytes([c]) * (30 - len(packet))  # Padding. '\n'
-                else:
-                    packet += b"F" * (30 - len(packet))  # Padding. '\n'
+        # pipe commands.
+        if command == b"-":  # wait finish
+            post_send_command = self.wait_finished
+        elif command == b"*":  # abort
+            post_send_command = self.abort
+        elif command == b"&":  # resume
+            self._resume_busy()
+        elif command == b"!":  # pause
+            self._pause_busy()
+        elif command == b"%":  # alt-checksum
+            default_checksum = False
+        elif command == b"\x18":
+            self.state = STATE_TERMINATE
+            self.is_shutdown = True
         if not realtime and self.state in (STATE_PAUSE, STATE_BUSY):
             return False  # Processing normal queue, PAUSE and BUSY apply.
 
@@ -619,12 +718,13 @@ class LihuiyuController:
             # We have a sendable packet.
             if not self.pre_ok:
                 self.wait_until_accepting_packets()
-            if default_checksum:
-                packet = b"\x00" + packet + bytes([onewire_crc_lookup(packet)])
-            else:
-                packet = b"\x00" + packet + bytes([onewire_crc_lookup(packet) ^ 0xFF])
-            self.connection.write(packet)
+            if frame is None:
+                frame = frame_packet(packet, default_checksum)
+            self.connection.write(frame)
             self.pre_ok = False
+            if not realtime:
+                # Prepare the following packet while this packet is confirmed.
+                self._prepare(buffer, length)
 
             # Packet is sent, trying to confirm.
             status = 0
@@ -674,13 +774,10 @@ class LihuiyuController:
             # We have an empty packet of only commands. Continue work.
 
         # Packet was processed. Remove that data.
-        if realtime:
-            del self._realtime_buffer[:length]
-        else:
-            del self._buffer[:length]
+        buffer.consume(length)
         if len(packet) != 0:
             # Packet was completed and sent. Only then update the channel.
-            self.update_packet(packet)
+            self.update_packet(frame)
         self.update_buffer()
 
         if post_send_command is not None:
@@ -692,6 +789,53 @@ class LihuiyuController:
                 pass
         return True  # A packet was prepped and sent correctly.
 
+    def _packet(self, buffer):
+        """
+        Next packet of the buffer, as prepared ahead or parsed now.
+
+        @param buffer: PacketBuffer
+        @return: length, packet, frame or None, pipe command
+        """
+        prepared = self._prepared
+        self._prepared = None
+        if (
+            prepared is not None
+            and prepared[0] is buffer
+            and prepared[1] == buffer.position
+        ):
+            return prepared[2:]
+        length, packet, command = parse_packet(buffer)
+        return length, packet, None, command
+
+    def _prepare(self, buffer, offset):
+        """
+        Parses and frames the packet which follows the given offset of the buffer. Only full packets are prepared, a
+        partial packet could still be completed by more data.
+
+        @param buffer: PacketBuffer
+        @param offset: length of the packet being sent.
+        @return:
+        """
+        find = buffer.find(b"\n", offset, offset + 31)
+        if find == -1:
+            if len(buffer) - offset < 31:
+                return
+            end = offset + 31
+        else:
+            end = find + 1
+        length, packet, command = parse_packet(buffer[offset:end])
+        if len(packet) != 30:
+            return
+        frame = frame_packet(packet, command != b"%")
+        self._prepared = (
+            buffer,
+            buffer.position + offset,
+            length,
+            packet,
+            frame,
+            command,
+        )
+
     def update_status(self):
         try:
             self._status = self.connection.get_status()
@@ -12,6 +12,7 @@ from meerk40t.core.spoolers import Spooler
 from meerk40t.kernel import STATE_ACTIVE, STATE_PAUSE, CommandSyntaxError, Service
 
 from ..core.units import UNITS_PER_MIL, Length, ViewPort
+from ..device.basedevice import register_estimate_choices
 from .controller import LihuiyuController
 from .driver import LihuiyuDriver
 from .tcp_connection import TCPOutput
@@ -155,6 +156,7 @@ class LihuiyuDevice(Service, ViewPort):
 
         self.driver = LihuiyuDriver(self)
         self.spooler = Spooler(self, driver=self.driver)
+        register_estimate_choices(self)
         self.add_service_delegate(self.spooler)
 
         self.tcp = TCPOutput(self)
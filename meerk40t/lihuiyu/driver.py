@@ -137,7 +137,7 @@ class LihuiyuDriver(Parameters):
         self.origin_x = 0
         self.origin_y = 0
 
-        self.plot_planner = PlotPlanner(self.settings)
+        self.plot_planner = PlotPlanner(self.settings, batch=True)
         self.plot_planner.force_shift = service.plot_shift
         self.plot_data = None
 
@@ -617,6 +617,34 @@ class LihuiyuDriver(Parameters):
             self.plot_data = self.plot_planner.gen()
         self._plotplanner_process()
 
+    def prepare(self, cutcodes, aborted=None):
+        """
+        Prepares the cutcode of a queued job while the current job runs. The steps of the cuts given to the plotplanner
+        are computed ahead.
+
+        @param cutcodes: cutcode of the job
+        @param aborted: function returning whether to stop preparing
+        @return:
+        """
+        cuts = [
+            q
+            for cutcode in cutcodes
+            for q in cutcode.flat()
+            if not isinstance(
+                q,
+                (
+                    InputCut,
+                    OutputCut,
+                    DwellCut,
+                    WaitCut,
+                    HomeCut,
+                    GotoCut,
+                    SetOriginCut,
+                ),
+            )
+        ]
+        self.plot_planner.prepare(cuts, aborted)
+
     def set(self, key, value):
         """
         Sets a laser parameter this could be speed, power, wobble, number_of_unicorns, or any unknown parameters for
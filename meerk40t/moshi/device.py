@@ -10,6 +10,7 @@ from meerk40t.kernel import STATE_ACTIVE, STATE_PAUSE, Service
 
 from ..core.spoolers import Spooler
 from ..core.units import UNITS_PER_MIL, Length, ViewPort
+from ..device.basedevice import register_estimate_choices
 from .controller import MoshiController
 from .driver import MoshiDriver
 
@@ -170,6 +171,17 @@ class MoshiDevice(Service, ViewPort):
                 "tip": _("Distance of the curve interpolation in mils"),
                 "section": "_20_Behaviour",
             },
+            {
+                "attr": "curve_tolerance",
+                "object": self,
+                "default": "0.01mm",
+                "type": Length,
+                "label": _("Curve Tolerance"),
+                "tip": _(
+                    "Maximal distance of the interpolated curves from the curves, 0 interpolates a fixed number of points."
+                ),
+                "section": "_20_Behaviour",
+            },
             {
                 "attr": "mock",
                 "object": self,
@@ -226,6 +238,7 @@ class MoshiDevice(Service, ViewPort):
         self.add_service_delegate(self.controller)
 
         self.spooler = Spooler(self, driver=self.driver)
+        register_estimate_choices(self)
         self.add_service_delegate(self.spooler)
 
         _ = self.kernel.translation
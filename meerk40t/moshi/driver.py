@@ -16,6 +16,7 @@ from ..core.cutcode.outputcut import OutputCut
 from ..core.cutcode.quadcut import QuadCut
 from ..core.cutcode.setorigincut import SetOriginCut
 from ..core.cutcode.waitcut import WaitCut
+from ..core.drivers import curve_points, curve_tolerance
 from ..core.parameters import Parameters
 from ..core.plotplanner import PlotPlanner
 from ..device.basedevice import (
@@ -53,7 +54,7 @@ class MoshiDriver(Parameters):
         self.origin_x = 0
         self.origin_y = 0
 
-        self.plot_planner = PlotPlanner(self.settings)
+        self.plot_planner = PlotPlanner(self.settings, batch=True)
         self.queue = list()
 
         self.program = MoshiBuilder()
@@ -119,6 +120,7 @@ class MoshiDriver(Parameters):
 
         @return:
         """
+        tolerance = curve_tolerance(self.service)
         for q in self.queue:
             x = self.native_x
             y = self.native_y
@@ -129,16 +131,10 @@ class MoshiDriver(Parameters):
             if isinstance(q, LineCut):
                 self._goto_absolute(*q.end, 1)
             elif isinstance(q, (QuadCut, CubicCut)):
-                interp = self.service.interpolate
-                step_size = 1.0 / float(interp)
-                t = step_size
-                for p in range(int(interp)):
+                for p in curve_points(q, tolerance, self.service.interpolate):
                     while self.hold_work(0):
                         time.sleep(0.05)
-                    self._goto_absolute(*q.point(t), 1)
-                    t += step_size
-                last_x, last_y = q.end
-                self._goto_absolute(last_x, last_y, 1)
+                    self._goto_absolute(*p, 1)
             elif isinstance(q, HomeCut):
                 self.home()
             elif isinstance(q, GotoCut):
@@ -213,6 +209,37 @@ class MoshiDriver(Parameters):
                     self._goto_absolute(x, y, on & 1)
         self.queue.clear()
 
+    def prepare(self, cutcodes, aborted=None):
+        """
+        Spooler preparation of a queued job, while the current job runs. Lines and curves are sent as moves, the steps
+        of the other cuts such as rasters are computed ahead for the plotplanner.
+
+        @param cutcodes: cutcode of the job
+        @param aborted: function returning whether to stop preparing
+        @return:
+        """
+        cuts = [
+            q
+            for cutcode in cutcodes
+            for q in cutcode.flat()
+            if not isinstance(
+                q,
+                (
+                    LineCut,
+                    QuadCut,
+                    CubicCut,
+                    HomeCut,
+                    GotoCut,
+                    SetOriginCut,
+                    WaitCut,
+                    DwellCut,
+                    InputCut,
+                    OutputCut,
+                ),
+            )
+        ]
+        self.plot_planner.prepare(cuts, aborted)
+
     def move_ori(self, x, y):
         """
         Requests laser move to origin offset position x,y in physical units
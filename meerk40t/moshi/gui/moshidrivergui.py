@@ -69,17 +69,22 @@ class MoshiDriverGui(MWindow):
         self.panels = []
 
         panel_config = MoshiConfigurationPanel(self, wx.ID_ANY, context=self.context)
+        panel_estimate = ChoicePropertyPanel(
+            self, wx.ID_ANY, context=self.context, choices="estimate"
+        )
 
         panel_warn = WarningPanel(self, id=wx.ID_ANY, context=self.context)
         panel_actions = DefaultActionPanel(self, id=wx.ID_ANY, context=self.context)
         newpanel = FormatterPanel(self, id=wx.ID_ANY, context=self.context)
 
         self.panels.append(panel_config)
+        self.panels.append(panel_estimate)
         self.panels.append(panel_warn)
         self.panels.append(panel_actions)
         self.panels.append(newpanel)
 
         self.notebook_main.AddPage(panel_config, _("Configuration"))
+        self.notebook_main.AddPage(panel_estimate, _("Time Estimate"))
         self.notebook_main.AddPage(panel_warn, _("Warning"))
         self.notebook_main.AddPage(panel_actions, _("Default Actions"))
         self.notebook_main.AddPage(newpanel, _("Display Options"))
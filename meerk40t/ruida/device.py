@@ -10,6 +10,7 @@ from meerk40t.kernel import Service
 
 from ..core.spoolers import Spooler
 from ..core.units import Length, ViewPort
+from ..device.basedevice import register_estimate_choices
 
 
 class RuidaDevice(Service, ViewPort):
@@ -95,6 +96,7 @@ class RuidaDevice(Service, ViewPort):
         self.state = 0
 
         self.spooler = Spooler(self)
+        register_estimate_choices(self)
 
         self.viewbuffer = ""
 
@@ -3,7 +3,16 @@ from copy import copy
 
 import numpy as np
 
-from meerk40t.svgelements import Matrix, Path
+from meerk40t.svgelements import (
+    Arc,
+    Close,
+    CubicBezier,
+    Line,
+    Matrix,
+    Move,
+    Path,
+    QuadraticBezier,
+)
 from meerk40t.tools.zinglplotter import ZinglPlotter
 
 """
@@ -673,6 +682,41 @@ class Geomstr:
 
         self._settings = dict()
 
+    @classmethod
+    def svg(cls, path):
+        """
+        Create a geomstr from an svgelements path. Each subpath is ended, elliptical arcs are converted to cubics.
+
+        @param path: svgelements Path
+        @return: Geomstr
+        """
+        geomstr = cls()
+        for seg in path:
+            if isinstance(seg, Move):
+                if geomstr.index:
+                    geomstr.end()
+                continue
+            start = complex(*seg.start)
+            end = complex(*seg.end)
+            if isinstance(seg, (Line, Close)):
+                if start != end:
+                    geomstr.line(start, end)
+            elif isinstance(seg, QuadraticBezier):
+                geomstr.quad(start, complex(*seg.control), end)
+            elif isinstance(seg, CubicBezier):
+                geomstr.cubic(
+                    start, complex(*seg.control1), complex(*seg.control2), end
+                )
+            elif isinstance(seg, Arc):
+                for curve in seg.as_cubic_curves():
+                    geomstr.cubic(
+                        complex(*curve.start),
+                        complex(*curve.control1),
+                        complex(*curve.control2),
+                        complex(*curve.end),
+                    )
+        return geomstr
+
     def __str__(self):
         return f"Geomstr({self.index} segments)"
 
@@ -2512,6 +2556,96 @@ class Geomstr:
         if last != self.index:
             yield Geomstr(self.segments[last : self.index])
 
+    def as_polylines(self, tolerance=1.0):
+        """
+        Flatten the geometry into polylines. Each connected run of lines, quads, cubics and arcs gives one polyline.
+        Curves are subdivided adaptively, into as many equal parameter steps as needed for the polyline to stay
+        within tolerance of the curve, lines are not subdivided.
+
+        @param tolerance: maximal distance between the curves and the polylines.
+        @return: list of complex numpy arrays of the polyline points.
+        """
+        segments = self.segments[: self.index]
+        if not len(segments):
+            return []
+        infos = np.real(segments[:, 2]).astype(int)
+        start = segments[:, 0]
+        c0 = segments[:, 1]
+        c1 = segments[:, 3]
+        end = segments[:, 4]
+        tolerance = max(tolerance, 1e-9)
+
+        # Number of steps for each segment, a polyline of n equal parameter steps is within |B''| / (8 n^2) of
+        # a bezier curve.
+        steps = np.ones(len(segments), dtype=int)
+        q = infos == TYPE_QUAD
+        if np.any(q):
+            d2 = 2 * np.abs(start[q] - 2 * c0[q] + end[q])
+            steps[q] = np.ceil(np.sqrt(d2 / (8 * tolerance)))
+        q = infos == TYPE_CUBIC
+        if np.any(q):
+            d2 = 6 * np.maximum(
+                np.abs(start[q] - 2 * c0[q] + c1[q]),
+                np.abs(c0[q] - 2 * c1[q] + end[q]),
+            )
+            steps[q] = np.ceil(np.sqrt(d2 / (8 * tolerance)))
+        arcs = np.nonzero(infos == TYPE_ARC)[0]
+        for e in arcs:
+            line = segments[e]
+            center = self.arc_center(line=line)
+            radius = abs(center - line[0])
+            if radius <= tolerance or not np.isfinite(radius):
+                continue
+            sweep = self.arc_sweep(line=line, center=center)
+            step = 2 * math.acos(1 - tolerance / radius)
+            steps[e] = math.ceil(abs(sweep) / step)
+        steps = np.clip(steps, 1, 10000)
+
+        # Parameter t of each point, excluding the start point of each segment.
+        offsets = np.zeros(len(segments) + 1, dtype=int)
+        np.cumsum(steps, out=offsets[1:])
+        index = np.repeat(np.arange(len(segments)), steps)
+        t = (np.arange(offsets[-1]) - offsets[index] + 1) / steps[index]
+        kinds = infos[index]
+        points = np.empty(len(t), dtype=complex)
+        points[:] = end[index]
+
+        q = kinds == TYPE_LINE
+        tq = t[q]
+        i = index[q]
+        points[q] = start[i] + (end[i] - start[i]) * tq
+        q = kinds == TYPE_QUAD
+        tq = t[q]
+        nq = 1 - tq
+        i = index[q]
+        points[q] = nq * nq * start[i] + 2 * nq * tq * c0[i] + tq * tq * end[i]
+        q = kinds == TYPE_CUBIC
+        tq = t[q]
+        nq = 1 - tq
+        i = index[q]
+        points[q] = (
+            nq * nq * nq * start[i]
+            + 3 * nq * nq * tq * c0[i]
+            + 3 * nq * tq * tq * c1[i]
+            + tq * tq * tq * end[i]
+        )
+        for e in arcs:
+            points[offsets[e] : offsets[e + 1]] = self._arc_position(
+                segments[e], t[offsets[e] : offsets[e + 1]]
+            )
+
+        # Split into connected runs.
+        drawable = np.isin(infos, (TYPE_LINE, TYPE_QUAD, TYPE_CUBIC, TYPE_ARC))
+        connected = np.zeros(len(segments), dtype=bool)
+        connected[1:] = drawable[1:] & drawable[:-1] & (start[1:] == end[:-1])
+        breaks = np.append(np.nonzero(~connected)[0], len(segments))
+        begins = np.nonzero(drawable & ~connected)[0]
+        ends = breaks[np.searchsorted(breaks, begins, side="right")]
+        return [
+            np.concatenate(([start[b]], points[offsets[b] : offsets[e]]))
+            for b, e in zip(begins, ends)
+        ]
+
     def draw(self, draw, offset_x, offset_y):
         """
         Though not a requirement, this draws with the given ImageDraw api found in Pillow.
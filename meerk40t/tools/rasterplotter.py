@@ -18,6 +18,8 @@ The rasters can either be BIDIRECTIONAL or UNIDIRECTIONAL meaning they raster on
 or only on forward swing.
 """
 
+from bisect import bisect_right
+
 
 class RasterPlotter:
     def __init__(
@@ -525,3 +527,221 @@ class RasterPlotter:
             y = next_y
             yield x, y, 0
             dx = -dx
+
+
+class NumpyRasterPlotter(RasterPlotter):
+    """
+    RasterPlotter backed by numpy. The data is an array-like of shape (height, width), such as a
+    PIL image or numpy array, rather than something accessed through data[x,y]. The filter, if given,
+    is applied once to the entire array and so must work elementwise on numpy arrays.
+
+    Scanline extents are found in bulk for all scanlines and each scanline is walked run by run of
+    equal pixels rather than pixel by pixel. The values yielded by plot() are identical to those of
+    RasterPlotter.
+    """
+
+    def __init__(self, data, width, height, *args, **kwargs):
+        self._pixels = None
+        self._row_extents = None
+        self._column_extents = None
+        RasterPlotter.__init__(self, data, width, height, *args, **kwargs)
+
+    def clear(self):
+        """
+        Release the filtered pixels and extents, they are recalculated if needed again.
+        """
+        self._pixels = None
+        self._row_extents = None
+        self._column_extents = None
+
+    @property
+    def pixels(self):
+        """
+        Filtered pixels as numpy array of shape (height, width).
+        """
+        if self._pixels is None:
+            import numpy as np
+
+            pixels = np.asarray(self.data)
+            if pixels.dtype == bool:
+                # Mode "1" images are 0 and 255 when accessed by pixel.
+                pixels = pixels.astype(np.uint8) * 255
+            if self.filter is not None:
+                pixels = self.filter(pixels)
+            self._pixels = pixels
+        return self._pixels
+
+    @staticmethod
+    def _extents(mask):
+        """
+        First and last set index along each row of the mask, -1 for rows that are not set.
+        """
+        import numpy as np
+
+        length = mask.shape[1]
+        found = mask.any(axis=1)
+        first = np.where(found, np.argmax(mask, axis=1), -1)
+        last = np.where(found, length - 1 - np.argmax(mask[:, ::-1], axis=1), -1)
+        return first.tolist(), last.tolist()
+
+    def row_extents(self):
+        """
+        Leftmost and rightmost pixel not equal to skip_pixel for each row.
+        """
+        if self._row_extents is None:
+            self._row_extents = self._extents(self.pixels != self.skip_pixel)
+        return self._row_extents
+
+    def column_extents(self):
+        """
+        Topmost and bottommost pixel not equal to skip_pixel for each column.
+        """
+        if self._column_extents is None:
+            self._column_extents = self._extents((self.pixels != self.skip_pixel).T)
+        return self._column_extents
+
+    def px(self, x, y):
+        if 0 <= y < self.height and 0 <= x < self.width:
+            return self.pixels[y, x].item()
+        raise IndexError
+
+    def leftmost_not_equal(self, y):
+        if not 0 <= y < self.height:
+            raise IndexError
+        x = self.row_extents()[0][y]
+        return x if x != -1 else None
+
+    def rightmost_not_equal(self, y):
+        if not 0 <= y < self.height:
+            raise IndexError
+        x = self.row_extents()[1][y]
+        return x if x != -1 else None
+
+    def topmost_not_equal(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError
+        y = self.column_extents()[0][x]
+        return y if y != -1 else None
+
+    def bottommost_not_equal(self, x):
+        if not 0 <= x < self.width:
+            raise IndexError
+        y = self.column_extents()[1][x]
+        return y if y != -1 else None
+
+    def _plot_pixels(self):
+        if self.horizontal:
+            x, y = self.initial_position()
+            yield from self._plot_scanlines(
+                self.pixels,
+                self.row_extents(),
+                x,
+                y,
+                1 if self.start_on_left else -1,
+                1 if self.start_on_top else -1,
+            )
+        else:
+            x, y = self.initial_position()
+            for py, px, on in self._plot_scanlines(
+                self.pixels.T,
+                self.column_extents(),
+                y,
+                x,
+                1 if self.start_on_top else -1,
+                1 if self.start_on_left else -1,
+            ):
+                yield px, py, on
+
+    def _plot_scanlines(self, lines, extents, pos, line, d_pos, d_line):
+        """
+        Walks the scanlines, yielding the position, scanline and value at the end of each run.
+
+        This follows _plot_horizontal exactly, with the changes of pixel value within a scanline
+        found by numpy rather than by nextcolor_right and nextcolor_left.
+
+        @param lines: 2d array of filtered pixels, one scanline per row.
+        @param extents: first and last lists of non-skipped pixel for each scanline.
+        @param pos: initial position within scanline
+        @param line: initial scanline
+        @param d_pos: initial direction within scanline
+        @param d_line: direction of scanline steps
+        @return:
+        """
+        import numpy as np
+
+        count, size = lines.shape
+        skip_pixel = self.skip_pixel
+        overscan = self.overscan
+        first, last = extents
+
+        def next_line(index):
+            while 0 <= index < count:
+                if first[index] != -1:
+                    return index
+                index += d_line
+            return None
+
+        yield pos, line, 0
+        while 0 <= line < count:
+            lower_bound = first[line]
+            if lower_bound == -1:
+                line += d_line
+                yield pos, line, 0
+                continue
+            upper_bound = last[line]
+
+            next_index = next_line(line + d_line)
+            if next_index is not None:
+                next_pos = first[next_index] if d_pos <= 0 else last[next_index]
+                upper_bound = max(next_pos, upper_bound) + overscan
+                lower_bound = min(next_pos, lower_bound) - overscan
+
+            scanline = lines[line]
+            values = scanline.tolist()
+            # Indexes at which the pixel value differs from the previous pixel.
+            changes = (np.flatnonzero(scanline[1:] != scanline[:-1]) + 1).tolist()
+
+            while (d_pos > 0 and pos <= upper_bound) or (
+                d_pos < 0 and lower_bound <= pos
+            ):
+                pixel = values[pos] if 0 <= pos < size else 0
+                if d_pos > 0:
+                    bound = upper_bound
+                    if pos < -1:
+                        pos = -1
+                    elif pos == -1:
+                        pos = 0
+                    elif pos == size - 1:
+                        pos = size
+                    elif size <= pos:
+                        pos = upper_bound
+                    else:
+                        i = bisect_right(changes, pos)
+                        pos = changes[i] if i < len(changes) else size - 1
+                    pos = min(pos, upper_bound)
+                else:
+                    bound = lower_bound
+                    if pos <= -1:
+                        pos = lower_bound
+                    elif pos == 0:
+                        pos = -1
+                    elif pos == size:
+                        pos = size - 1
+                    elif size < pos:
+                        pos = size
+                    else:
+                        i = bisect_right(changes, pos) - 1
+                        pos = changes[i] - 1 if i >= 0 else 0
+                    pos = max(pos, lower_bound)
+                if pixel == skip_pixel:
+                    yield pos, line, 0
+                else:
+                    yield pos, line, pixel
+                if pos == bound:
+                    break
+            if next_index is None:
+                # remaining image is blank, we stop right here.
+                break
+            line = next_index
+            yield pos, line, 0
+            d_pos = -d_pos
@@ -1,3 +1,4 @@
+from itertools import chain
 from math import ceil, cos, floor, sin, sqrt, tan, tau
 
 from meerk40t.svgelements import Point
@@ -9,7 +10,8 @@ The Zingl-Bresenham plotting algorithms are from Alois Zingl's "The Beauty of Br
 In the case of Zingl's work this isn't explicit from his website, however from personal
 correspondence "'Free and open source' means you can do anything with it like the MIT licence."
 
-The Zingl-Bresenham algorithms are provided in a static fashion and generate x and y locations.
+The Zingl-Bresenham algorithms are provided in a static fashion and generate x and y locations. The array variants
+return the same locations as numpy arrays of x and y.
 
 This work is MIT Licensed.
 """
@@ -118,6 +120,34 @@ class ZinglPlotter:
                 err += dx
                 y0 += sy
 
+    @staticmethod
+    def plot_line_array(x0, y0, x1, y1):
+        """
+        Zingl-Bresenham line draw algorithm, as arrays.
+
+        Each step moves along the major axis. The minor axis moves when the line is half a step or more past the
+        current position, which are the steps of plot_line().
+
+        returns x, y arrays
+        """
+        import numpy as np
+
+        x0 = int(x0)
+        y0 = int(y0)
+        x1 = int(x1)
+        y1 = int(y1)
+        dx = abs(x1 - x0)
+        dy = abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        if dx >= dy:
+            major = np.arange(dx + 1, dtype=np.int64)
+            minor = (2 * dy * major + dx) // (2 * dx) if dx else major
+            return x0 + sx * major, y0 + sy * minor
+        major = np.arange(dy + 1, dtype=np.int64)
+        minor = (2 * dx * major + dy) // (2 * dy)
+        return x0 + sx * minor, y0 + sy * major
+
     @staticmethod
     def plot_quad_bezier_seg(x0, y0, x1, y1, x2, y2):
         """plot a limited quadratic Bezier segment
@@ -289,6 +319,17 @@ class ZinglPlotter:
             for plot in reversed(points):
                 yield plot
 
+    @staticmethod
+    def plot_quad_bezier_array(x0, y0, x1, y1, x2, y2):
+        """
+        Zingl-Bresenham quad bezier draw algorithm, as arrays.
+
+        The steps of a curve depend on the error of the step before, these are collected from plot_quad_bezier().
+
+        returns x, y arrays
+        """
+        return _plot_arrays(ZinglPlotter.plot_quad_bezier(x0, y0, x1, y1, x2, y2))
+
     @staticmethod
     def plot_cubic_bezier_seg(x0, y0, x1, y1, x2, y2, x3, y3):
         """
@@ -591,3 +632,23 @@ class ZinglPlotter:
             fx0 = fx3
             fy0 = fy3
             t1 = t2
+
+    @staticmethod
+    def plot_cubic_bezier_array(x0, y0, x1, y1, x2, y2, x3, y3):
+        """
+        Zingl-Bresenham cubic bezier draw algorithm, as arrays.
+
+        The steps of a curve depend on the error of the step before, these are collected from plot_cubic_bezier().
+
+        returns x, y arrays
+        """
+        return _plot_arrays(
+            ZinglPlotter.plot_cubic_bezier(x0, y0, x1, y1, x2, y2, x3, y3)
+        )
+
+
+def _plot_arrays(plot):
+    import numpy as np
+
+    points = np.fromiter(chain.from_iterable(plot), dtype=np.int64).reshape(-1, 2)
+    return points[:, 0], points[:, 1]
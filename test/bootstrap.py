@@ -40,6 +40,10 @@ def bootstrap():
 
     kernel.add_plugin(grbldevice.plugin)
 
+    from meerk40t.balormk import plugin as balormkdevice
+
+    kernel.add_plugin(balormkdevice.plugin)
+
     from meerk40t.ruida import plugin as ruidadevice
 
     kernel.add_plugin(ruidadevice.plugin)
@@ -3,10 +3,14 @@ import unittest
 
 from PIL import Image, ImageDraw
 
+import numpy as np
+
+from meerk40t.core.cutcode.cubiccut import CubicCut
 from meerk40t.core.cutcode.cutcode import CutCode
 from meerk40t.core.cutcode.linecut import LineCut
 from meerk40t.core.cutcode.quadcut import QuadCut
 from meerk40t.core.cutcode.rastercut import RasterCut
+from meerk40t.core.drivers import curve_points
 from meerk40t.core.node.elem_image import ImageNode
 from meerk40t.core.node.elem_path import PathNode
 from meerk40t.core.node.op_cut import CutOpNode
@@ -416,3 +420,63 @@ class TestCutcode(unittest.TestCase):
                 self.assertNotEqual(y_dir, ry_dir)
             else:
                 self.assertNotEqual(x_dir, rx_dir)
+
+    def test_rastercut_runs(self):
+        """
+        The encoded runs of a rastercut must match the plotted raster.
+        """
+        image = Image.new("L", (40, 30), "white")
+        draw = ImageDraw.Draw(image)
+        draw.ellipse((5, 5, 30, 25), "black")
+        draw.rectangle((12, 10, 20, 18), "white")
+        for horizontal in (True, False):
+            rastercut = RasterCut(
+                image, 100, 200, 2, 3, horizontal=horizontal, overscan=4
+            )
+            expected = list(rastercut.plot.plot())
+            self.assertEqual(list(rastercut.generator()), expected)
+            # Encoded once, generator can be repeated.
+            self.assertEqual(list(rastercut.generator()), expected)
+            length = 0
+            last = rastercut.start
+            for x, y, on in expected:
+                length += Point.distance(last, (x, y))
+                last = (x, y)
+            self.assertAlmostEqual(rastercut.length(), length)
+            self.assertAlmostEqual(CutCode([rastercut]).length_cut(), length)
+            self.assertEqual(rastercut.position_at(0), expected[0][:2])
+            self.assertEqual(rastercut.position_at(1), expected[-1][:2])
+
+    def test_curve_flatten(self):
+        """
+        Adaptive curve flattening stays within tolerance and gives more points to larger curves.
+        """
+
+        def distance(points, cut):
+            # Largest distance of the curve from the polyline.
+            line = np.array([complex(*cut.start)] + [complex(*p) for p in points])
+            a = line[:-1]
+            d = line[1:] - a
+            worst = 0.0
+            for t in np.linspace(0, 1, 500):
+                p = complex(*cut.point(t))
+                length = np.maximum(np.abs(d) ** 2, 1e-12)
+                u = np.clip(((p - a) * d.conjugate()).real / length, 0, 1)
+                worst = max(worst, np.min(np.abs(a + u * d - p)))
+            return worst
+
+        tolerance = 2.0
+        small = CubicCut((0, 0), (10, 20), (30, -20), (40, 0))
+        large = CubicCut((0, 0), (1000, 2000), (3000, -2000), (4000, 0))
+        quad = QuadCut((0, 0), (500, 1000), (1000, 0))
+        for cut in (small, large, quad):
+            points = curve_points(cut, tolerance)
+            self.assertEqual(points[-1], cut.end)
+            self.assertLessEqual(distance(points, cut), tolerance)
+        self.assertLess(len(curve_points(small, tolerance)), 10)
+        self.assertGreater(len(curve_points(large, tolerance)), 30)
+
+        # Without tolerance a fixed number of points is interpolated.
+        points = curve_points(large, None, 50)
+        self.assertEqual(len(points), 50)
+        self.assertEqual(points[-1], large.end)
@@ -0,0 +1,226 @@
+import os
+import random
+import unittest
+from test import bootstrap
+
+from meerk40t.core.cutcode.cutcode import CutCode
+from meerk40t.core.cutplan import (
+    inner_first_ident,
+    is_inside,
+    short_travel_cutcode,
+    short_travel_cutcode_oropt,
+)
+from meerk40t.core.node.nutils import path_to_cutobjects
+from meerk40t.svgelements import Path
+
+
+def random_cutcode(count, seed, passes=1):
+    random.seed(seed)
+    settings = dict()
+    cutcode = CutCode()
+    for i in range(count):
+        x = random.randint(0, 20000)
+        y = random.randint(0, 20000)
+        w = random.randint(100, 3000)
+        h = random.randint(100, 3000)
+        shape = random.randint(0, 3)
+        if shape == 0:
+            path = Path(f"M{x},{y}h{w}v{h}h{-w}z")
+        elif shape == 1:
+            path = Path(f"M{x},{y}l{w},{h}l{-w},{h}")
+        elif shape == 2:
+            # Nested rectangles.
+            path = Path(
+                f"M{x},{y}h{w}v{h}h{-w}z"
+                f"M{x + w // 4},{y + h // 4}h{w // 2}v{h // 2}h{-w // 2}z"
+            )
+        else:
+            path = Path(f"M{x},{y}q{w},{h} {w},{-h}c{w},0 {w},{h} 0,{h}")
+        cutcode.extend(path_to_cutobjects(path, settings, passes=passes))
+    return cutcode
+
+
+def nested_cutcode(count, seed):
+    random.seed(seed)
+    settings = dict()
+    cutcode = CutCode()
+    for i in range(count):
+        x = random.randint(0, 5000)
+        y = random.randint(0, 5000)
+        r = random.randint(100, 3000)
+        shape = random.randint(0, 2)
+        if shape == 0:
+            path = Path(f"M{x},{y}h{r}v{r}h{-r}z")
+        elif shape == 1:
+            # Circle of cubic curves.
+            k = r * 0.276
+            path = Path(
+                f"M{x},{y}c{k},{-r / 2 + k} {r / 2},{-r / 2} {r / 2},{-r / 2}"
+                f"s{r / 2},{r / 2 - k} {r / 2},{r / 2}s{-r / 2 + k},{r / 2} {-r / 2},{r / 2}"
+                f"s{-r / 2},{-r / 2 + k} {-r / 2},{-r / 2}z"
+            )
+        else:
+            path = Path(f"M{x},{y}l{r},{r // 3}l{-r // 2},{r}z")
+        cutcode.extend(path_to_cutobjects(path, settings))
+    return cutcode
+
+
+def ordering(cutcode):
+    return [(c.start, c.end) for c in cutcode.flat()]
+
+
+class TestCutPlan(unittest.TestCase):
+    def test_short_travel_spatial_index(self):
+        """
+        The spatial index must produce exactly the same order as the linear scan.
+        """
+        for seed in range(2):
+            for passes in (1, 2):
+                for complete_path in (False, True):
+                    for inner_first in (False, True):
+                        for grouped_inner in (False, True):
+                            results = list()
+                            for spatial_index in (False, True):
+                                cutcode = random_cutcode(40, seed, passes=passes)
+                                if inner_first:
+                                    inner_first_ident(cutcode)
+                                ordered = short_travel_cutcode(
+                                    cutcode,
+                                    complete_path=complete_path,
+                                    grouped_inner=grouped_inner,
+                                    spatial_index=spatial_index,
+                                )
+                                results.append(ordering(ordered))
+                            self.assertEqual(results[0], results[1])
+                            self.assertTrue(results[0])
+
+    def test_short_travel_oropt(self):
+        """
+        Or-opt returns a reordering of the same cuts which is never longer than the input and
+        does not reverse cuts which are not reversible.
+        """
+        for seed in range(3):
+            cutcode = random_cutcode(30, seed)
+            cuts = list(cutcode.flat())
+            fixed = cuts[::5]
+            for cut in fixed:
+                cut.reversible = lambda: False
+            start_length = CutCode(cutcode.flat()).length_travel(True)
+            ordered = short_travel_cutcode_oropt(cutcode, time_limit=0.2)
+            self.assertEqual(
+                sorted(id(c) for c in ordered.flat()), sorted(id(c) for c in cuts)
+            )
+            for cut in fixed:
+                self.assertTrue(cut.normal)
+            self.assertLessEqual(ordered.length_travel(True), start_length)
+
+            greedy = short_travel_cutcode(random_cutcode(30, seed))
+            greedy_length = greedy.length_travel(True)
+            ordered = short_travel_cutcode_oropt(greedy, time_limit=0.2)
+            self.assertLessEqual(ordered.length_travel(True), greedy_length + 1e-6)
+
+    def test_inner_first_ident(self):
+        """
+        The containment found by inner_first_ident must equal the pairwise is_inside test.
+        """
+        for seed in range(3):
+            for cutcode in (random_cutcode(60, seed), nested_cutcode(60, seed)):
+                inner_first_ident(cutcode)
+                groups = list(cutcode)
+                expected = 0
+                for outer in groups:
+                    if not outer.closed:
+                        continue
+                    for inner in groups:
+                        if inner is outer:
+                            continue
+                        if inner.contains and outer in inner.contains:
+                            continue
+                        if is_inside(inner, outer):
+                            expected += 1
+                            self.assertTrue(any(c is inner for c in outer.contains))
+                            self.assertTrue(any(c is outer for c in inner.inside))
+                found = sum(len(g.contains) for g in groups if g.contains)
+                self.assertEqual(found, expected)
+                self.assertEqual(cutcode.constrained, expected > 0)
+
+    def test_parallel_plan(self):
+        """
+        Planning with several workers gives the same job as planning with one worker.
+
+        @return:
+        """
+        results = []
+        for workers in (1, 4):
+            file1 = f"tp{workers}.gcode"
+            self.addCleanup(os.remove, file1)
+
+            kernel = bootstrap.bootstrap()
+            try:
+                kernel.console("service device start -i grbl 0\n")
+                opt_workers = kernel.planner.opt_workers
+                kernel.console("operation* remove\n")
+                kernel.console("rect 2cm 2cm 1cm 1cm raster -s 15\n")
+                kernel.console("rect 4cm 2cm 1cm 1cm hatch -s 20\n")
+                kernel.console("rect 2cm 4cm 1cm 1cm engrave -s 25\n")
+                kernel.console("rect 4cm 4cm 1cm 1cm raster -s 30\n")
+                kernel.console(
+                    f"plan copy workers {workers} preprocess validate blob preopt optimize save_job {file1}\n"
+                )
+                # The count is set for this plan only.
+                self.assertEqual(kernel.planner.opt_workers, opt_workers)
+            finally:
+                kernel.shutdown()
+            with open(file1) as f:
+                results.append(f.read())
+        self.assertEqual(results[0], results[1])
+        # Hatch lines.
+        self.assertIn("F1200.0", results[0])
+
+    def test_operation_cache(self):
+        """
+        Planning an unchanged job again reuses the processed operations, changed elements and penbox passes are
+        processed again.
+
+        @return:
+        """
+        file1 = "toc.gcode"
+        self.addCleanup(os.remove, file1)
+        results = []
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i grbl 0\n")
+            kernel.console("rect 2cm 2cm 1cm 1cm raster -s 15\n")
+            kernel.console("rect 4cm 2cm 1cm 1cm hatch -s 20\n")
+            kernel.console("rect 2cm 4cm 1cm 1cm engrave -s 25\n")
+            cache = kernel.planner.operation_cache
+            job = f"plan clear copy preprocess validate blob preopt optimize save_job {file1}\n"
+            for i in range(3):
+                if i == 2:
+                    kernel.console("element* select\n")
+                    kernel.console("element* translate 1cm 0\n")
+                hits = cache.hits
+                kernel.console(job)
+                results.append((cache.hits - hits, open(file1).read()))
+
+            # Penbox edits are not notified, but change the hatch.
+            hatch = [op for op in kernel.elements.ops() if op.type == "op hatch"][0]
+            hatch.settings["penbox_pass"] = "test"
+            kernel.elements.penbox["test"] = [{"hatch_angle": "0deg"}]
+            kernel.console(job)
+            for angle in ("0deg", "90deg"):
+                kernel.elements.penbox["test"][0]["hatch_angle"] = angle
+                hits = cache.hits
+                kernel.console(job)
+                results.append((cache.hits - hits, open(file1).read()))
+            del kernel.elements.penbox["test"]
+        finally:
+            kernel.shutdown()
+        self.assertEqual(results[4][0], results[3][0] - 1)
+        self.assertNotEqual(results[3][1], results[4][1])
+        self.assertEqual(results[0][0], 0)
+        self.assertGreater(results[1][0], 0)
+        self.assertEqual(results[0][1], results[1][1])
+        self.assertEqual(results[2][0], 0)
+        self.assertNotEqual(results[1][1], results[2][1])
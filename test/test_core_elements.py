@@ -133,3 +133,128 @@ class TestElements(unittest.TestCase):
             kernel_root("grid 2 2 1in 1foo\n")
         finally:
             kernel.shutdown()
+
+    def test_elements_undo(self):
+        """
+        Undo states share unchanged nodes, undo and redo restore the tree.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            kernel.console("element* delete\n")
+            kernel.console("rect 1cm 1cm 1cm 1cm\n")
+            kernel.console("rect 3cm 3cm 1cm 1cm\n")
+            kernel.console("element* classify\n")
+            undo = elements.undo
+
+            def snapshot():
+                return [
+                    (n.type, tuple(n.bounds), [r.node.type for r in n._references])
+                    for n in elements.elems_nodes()
+                ] + [
+                    (n.type, [tuple(c.node.bounds) for c in n.children])
+                    for n in elements.ops()
+                ]
+
+            undo.mark("start")
+            before = snapshot()
+            copies = undo.stats()["copies"]
+            undo.mark("unchanged")
+            self.assertEqual(undo.stats()["copies"], copies)
+
+            kernel.console("element* translate 1cm 1cm\n")
+            undo.mark("translated")
+            after = snapshot()
+            self.assertNotEqual(before, after)
+            # Only the two moved rects are copied again.
+            self.assertEqual(undo.stats()["copies"], copies + 2)
+
+            self.assertTrue(undo.undo())
+            self.assertTrue(undo.undo())
+            self.assertEqual(snapshot(), before)
+            self.assertTrue(undo.redo())
+            self.assertTrue(undo.redo())
+            self.assertEqual(snapshot(), after)
+            self.assertFalse(undo.redo())
+
+            kernel.console("undo stats\n")
+            undo.memory_limit = 1
+            undo.mark("limited")
+            self.assertEqual(undo.stats()["states"], 1)
+            self.assertFalse(undo.undo())
+        finally:
+            kernel.shutdown()
+
+    def test_elements_spatial_index(self):
+        """
+        The element index finds the same nodes as testing the bounds of every node.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            elements = kernel.elements
+            kernel.console("element* delete\n")
+            for i in range(10):
+                for j in range(10):
+                    kernel.console(f"rect {i * 2}cm {j * 2}cm 1cm 1cm\n")
+            kernel.console("element* classify\n")
+            index = elements.element_index
+
+            def linear(box):
+                return [
+                    n
+                    for n in elements.elems_nodes()
+                    if n.bounds is not None and elements.bbox_overlap(n.bounds, box)
+                ]
+
+            rects = list(elements.elems())
+            b = rects[11].bounds
+            boxes = [
+                b,
+                (b[0] - 1, b[1] - 1, b[0] - 1, b[1] - 1),
+                (b[0], b[1], b[0] + (b[2] - b[0]) * 4, b[1] + (b[3] - b[1]) * 4),
+                (-1e9, -1e9, 1e9, 1e9),
+            ]
+            for box in boxes:
+                self.assertEqual(index.query(box), linear(box))
+
+            # Translated, removed and added elements are followed.
+            rects[11].matrix.post_translate(1e6, 0)
+            rects[11].translated(1e6, 0)
+            rects[12].remove_node()
+            kernel.console("rect 30cm 30cm 1cm 1cm\n")
+            added = list(elements.elems())[-1]
+            for box in boxes + [added.bounds, rects[11].bounds]:
+                self.assertEqual(index.query(box), linear(box))
+            self.assertEqual(index.at(*added.bounds[:2]), [added])
+
+            elements.set_emphasis(None)
+            elements.set_emphasized_by_position(added.bounds[:2])
+            self.assertEqual(list(elements.elems(emphasized=True)), [added])
+
+            # Emphasized elements are not hit again, the largest unemphasized element is added.
+            kernel.console("rect 29cm 29cm 3cm 3cm\n")
+            large = list(elements.elems())[-1]
+            elements.set_emphasis(None)
+            elements.set_emphasized_by_position(large.bounds[:2])
+            self.assertEqual(list(elements.elems(emphasized=True)), [large])
+            center = (
+                (added.bounds[0] + added.bounds[2]) / 2,
+                (added.bounds[1] + added.bounds[3]) / 2,
+            )
+            elements.set_emphasized_by_position(center, keep_old_selection=True)
+            self.assertEqual(list(elements.elems(emphasized=True)), [added, large])
+
+            self.assertTrue(
+                elements.group_elements_overlap(
+                    [(r, r.bounds) for r in rects[:20]],
+                    [(r, r.bounds) for r in rects[10:]],
+                )
+            )
+            self.assertFalse(
+                elements.group_elements_overlap(
+                    [(r, r.bounds) for r in rects[:10]],
+                    [(r, r.bounds) for r in rects[20:]],
+                )
+            )
+        finally:
+            kernel.shutdown()
@@ -0,0 +1,142 @@
+import unittest
+from math import sqrt
+from test import bootstrap
+from test.test_drivers_lihuiyu import benchmark_plan
+
+from PIL import Image, ImageDraw
+
+from meerk40t.core.cutcode.cutcode import CutCode
+from meerk40t.core.cutcode.linecut import LineCut
+from meerk40t.core.cutcode.rastercut import RasterCut
+from meerk40t.core.estimator import (
+    DEFAULT_FACTORS,
+    MotionEstimator,
+    device_estimator,
+)
+
+SETTINGS = {"native_mm": 1.0, "native_speed": 100.0, "native_rapid_speed": 200.0}
+
+
+class TestEstimator(unittest.TestCase):
+    def test_estimator_lines(self):
+        """
+        Lines accelerate to their speed, joined collinear lines do not stop and corners slow down.
+        """
+        estimator = MotionEstimator(acceleration=1000.0, junction_deviation=0.05)
+        # 5mm to accelerate, 90mm at speed, 5mm to stop.
+        cutcode = CutCode([LineCut((0, 0), (100, 0), settings=SETTINGS)])
+        self.assertAlmostEqual(estimator.components([cutcode])["cut"], 1.1)
+        cutcode = CutCode(
+            [
+                LineCut((0, 0), (50, 0), settings=SETTINGS),
+                LineCut((50, 0), (100, 0), settings=SETTINGS),
+            ]
+        )
+        self.assertAlmostEqual(estimator.components([cutcode])["cut"], 1.1)
+        # Speed is not reached within 4mm, 2mm to accelerate and 2mm to stop.
+        cutcode = CutCode([LineCut((0, 0), (4, 0), settings=SETTINGS)])
+        self.assertAlmostEqual(estimator.components([cutcode])["cut"], 2 * sqrt(0.004))
+
+        square = CutCode(
+            [
+                LineCut((0, 0), (100, 0), settings=SETTINGS),
+                LineCut((100, 0), (100, 100), settings=SETTINGS),
+                LineCut((100, 100), (0, 100), settings=SETTINGS),
+                LineCut((0, 100), (0, 0), settings=SETTINGS),
+                LineCut((500, 0), (600, 0), settings=SETTINGS),
+            ]
+        )
+        components = estimator.components([square])
+        # Corners slow down without stopping.
+        self.assertGreater(components["cut"], 5.0)
+        self.assertLess(components["cut"], 5 * 1.1)
+        # 20mm to accelerate, 460mm at rapid speed, 20mm to stop.
+        self.assertAlmostEqual(components["travel"], 2.7)
+        self.assertEqual(components["cuts"], 5)
+
+        constant = MotionEstimator(acceleration=0).components([square])
+        self.assertAlmostEqual(constant["cut"], square.duration_cut())
+        self.assertAlmostEqual(constant["travel"], square.duration_travel())
+
+    def test_estimator_raster(self):
+        """
+        Rasters turn around at the end of each scanline, after the overscan.
+        """
+        image = Image.new("L", (100, 20), 255)
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((10, 0, 89, 19), 0)
+        estimates = []
+        for overscan in (0, 20):
+            cut = RasterCut(image, 0, 0, 1, 1, overscan=overscan, settings=SETTINGS)
+            components = MotionEstimator().components([CutCode([cut])])
+            self.assertEqual(components["turnarounds"], 19)
+            estimates.append(components["raster"])
+        self.assertGreater(estimates[1], estimates[0])
+        # Each line of 80mm stops at its ends.
+        self.assertGreater(estimates[0], 20 * 0.8 + 19 * 0.1)
+
+    def test_estimator_calibrate(self):
+        """
+        Calibration recovers the factors of the logged durations.
+        """
+        factors = {"cut": 1.2, "raster": 1.5, "travel": 0.9, "turnarounds": 0.08}
+        samples = []
+        for i in range(8):
+            components = {
+                "cut": 10.0 * (i % 3),
+                "raster": 7.0 * (i % 4),
+                "travel": 3.0 + i,
+                "turnarounds": 100 * (i % 2),
+                "cuts": 0,
+                "dwell": 2.0,
+            }
+            duration = sum(factors[k] * components[k] for k in factors) + 2.0
+            samples.append((components, duration))
+        estimator = MotionEstimator()
+        self.assertEqual(estimator.calibrate(samples), 8)
+        for key, value in factors.items():
+            self.assertAlmostEqual(estimator.factors[key], value)
+        self.assertEqual(estimator.factors["cuts"], 0.0)
+        self.assertEqual(estimator.factors["dwell"], 1.0)
+
+        # A single job scales the estimate.
+        estimator = MotionEstimator()
+        self.assertEqual(estimator.calibrate(samples[1:2]), 1)
+        self.assertAlmostEqual(estimator.total(samples[1][0]), samples[1][1])
+
+    def test_plan_estimate(self):
+        """
+        The plan estimate command estimates the plan, and calibrates the device from the logged jobs.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i lhystudios 0\n")
+            device = kernel.device
+            # Factors and logs persist between runs.
+            for key, value in DEFAULT_FACTORS.items():
+                setattr(device, f"estimate_factor_{key}", value)
+            kernel.logging.logs.clear()
+            items = benchmark_plan(kernel, "mixed", count=4)
+            components = device_estimator(device).components(items)
+            self.assertGreater(components["cut"], 0)
+            self.assertGreater(components["raster"], 0)
+            self.assertGreater(components["turnarounds"], 0)
+
+            for i in range(3):
+                kernel.logging.event(
+                    {
+                        "uid": kernel.logging.uid("job"),
+                        "status": "completed",
+                        "loop": 2,
+                        "duration": 2 * 1.5 * MotionEstimator().total(components),
+                        "device": device.label,
+                        "motion": components,
+                    }
+                )
+            kernel.console("plan estimate --calibrate\n")
+            self.assertAlmostEqual(
+                device_estimator(device).estimate(items),
+                1.5 * MotionEstimator().estimate(items),
+            )
+        finally:
+            kernel.shutdown()
@@ -1,4 +1,5 @@
 import random
+import sys
 import unittest
 
 from PIL import Image, ImageDraw
@@ -395,3 +396,125 @@ class TestPlotplanner(unittest.TestCase):
                     setting_changed = True
                 else:
                     setting_changed = False
+
+
+def batch_cutcode(settings_list, count=60, seed=3):
+    """
+    Vector lines and curves, and a raster, for each of the given settings.
+    """
+    rng = random.Random(seed)
+    cutcode = CutCode()
+    for settings in settings_list:
+        for i in range(count):
+            start = Point(rng.randint(0, 300), rng.randint(0, 300))
+            if i % 3:
+                # Joined and disjoined lines.
+                start = Point(rng.randint(-2, 2), rng.randint(-2, 2)) + (
+                    cutcode[-1].end if cutcode else start
+                )
+            end = Point(rng.randint(0, 300), rng.randint(0, 300))
+            cutcode.append(LineCut(start, end, settings=settings))
+        vectorop = EngraveOpNode(**settings)
+        vectorop.add_node(
+            PathNode(path=Path(Circle(cx=127, cy=127, r=rng.randint(20, 128))))
+        )
+        cutcode.extend(vectorop.as_cutobjects())
+        image = Image.new("RGBA", (64, 48))
+        draw = ImageDraw.Draw(image)
+        draw.ellipse((0, 0, 63, 47), "black")
+        draw.rectangle((10, 10, 30, 20), "gray")
+        inode = ImageNode(image=image.convert("L"), dpi=1000.0, matrix=Matrix())
+        inode.step_x = 1
+        inode.step_y = 1
+        inode.process_image()
+        rasterop = RasterOpNode(**settings)
+        rasterop.add_node(inode)
+        rasterop.raster_step_x = 1
+        rasterop.raster_step_y = 1
+        cutcode.extend(rasterop.as_cutobjects())
+    return cutcode
+
+
+class TestPlotplannerBatch(unittest.TestCase):
+    def test_plotplanner_batch(self):
+        """
+        Batch processing of step arrays emits the plot stream of the tuple processing.
+        """
+        settings_list = [
+            {"power": 1000},
+            {"power": 500},
+            {"power": 333.3},
+            {"power": 600, "shift_enabled": True},
+            {"power": 1000, "dot_length": 3},
+        ]
+        cutcode = batch_cutcode(settings_list)
+        streams = []
+        for batch in (False, True):
+            plan = PlotPlanner({"power": 1000}, batch=batch)
+            plan.jog_distance = 15
+            for c in cutcode.flat():
+                plan.push(c)
+            streams.append(list(plan.gen()))
+        self.assertGreater(len(streams[0]), 1000)
+        self.assertEqual(streams[0], streams[1])
+        for x, y, on in streams[1]:
+            self.assertIsInstance(on, int)
+
+    def test_plotplanner_batch_prepare(self):
+        """
+        Prepared steps give the plot stream of computed steps, and are used once.
+        """
+        settings_list = [{"power": 1000}, {"power": 333.3}]
+        cutcode = batch_cutcode(settings_list, count=20)
+        streams = []
+        for prepare in (False, True, False):
+            plan = PlotPlanner({"power": 1000}, batch=True)
+            if prepare:
+                plan.prepare(cutcode.flat())
+                self.assertEqual(len(plan._prepared), len(list(cutcode.flat())))
+            for c in cutcode.flat():
+                plan.push(c)
+            streams.append(list(plan.gen()))
+            self.assertFalse(plan._prepared)
+        self.assertEqual(streams[0], streams[1])
+        self.assertEqual(streams[0], streams[2])
+
+    def test_plotplanner_batch_without_numpy(self):
+        """
+        Without numpy, batch planners fall back to the tuple processing.
+        """
+        settings = {"power": 1000}
+        cuts = [
+            LineCut(Point(0, 0), Point(100, 30), settings=settings),
+            LineCut(Point(200, 30), Point(150, 90), settings=settings),
+        ]
+        streams = []
+        numpy = sys.modules["numpy"]
+        sys.modules["numpy"] = None
+        try:
+            for batch in (False, True):
+                plan = PlotPlanner(settings, batch=batch)
+                self.assertFalse(plan.batch)
+                for c in cuts:
+                    plan.push(c)
+                streams.append(list(plan.gen()))
+        finally:
+            sys.modules["numpy"] = numpy
+        self.assertGreater(len(streams[0]), 1)
+        self.assertEqual(streams[0], streams[1])
+
+    def test_plotplanner_batch_abort(self):
+        """
+        Aborting a batch stops the plot stream.
+        """
+        settings = {"power": 1000}
+        plan = PlotPlanner(settings, batch=True)
+        for i in range(10):
+            plan.push(LineCut(Point(0, 0), Point(1000, 10 * i), settings=settings))
+            plan.push(LineCut(Point(1000, 10 * i), Point(0, 0), settings=settings))
+        count = 0
+        for x, y, on in plan.gen():
+            count += 1
+            if count == 20:
+                plan.clear()
+        self.assertLess(count, 25)
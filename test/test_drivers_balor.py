@@ -0,0 +1,207 @@
+import struct
+import time
+import unittest
+from test import bootstrap
+
+import numpy as np
+
+from meerk40t.balormk import driver as driver_module
+from meerk40t.balormk.controller import READY, GalvoController
+from meerk40t.balormk.driver import BalorDriver
+from meerk40t.core.cutcode.linecut import LineCut
+from meerk40t.core.cutcode.plotcut import PlotCut
+
+
+def star_cutcode(count, settings=None):
+    """
+    Lines from the center outwards and back, count lines long.
+    """
+    if settings is None:
+        settings = {"speed": 100.0, "power": 500.0, "frequency": 30.0}
+    cuts = []
+    for i in range(count):
+        x = 0x1000 + (i * 37) % 0xE000
+        y = 0x1000 + (i * 91) % 0xE000
+        if i % 2:
+            cuts.append(LineCut((x, y), (0x8000, 0x8000), settings=settings))
+        else:
+            cuts.append(LineCut((0x8000, 0x8000), (x, y), settings=settings))
+    return cuts
+
+
+def recording_driver(service):
+    """
+    Galvo driver on the mock connection, which collects the list packets it writes. Status reads report ready, the
+    random status of the mock connection would make the timings meaningless.
+    """
+    driver = BalorDriver(service, force_mock=True)
+    con = driver.connection
+    con.connect_if_needed()
+    mock = con.connection
+    mock.send = None
+    packets = []
+    write = mock.write
+
+    def collect(index=0, packet=None):
+        if len(packet) == 0xC00:
+            packets.append(bytes(packet))
+        write(index, packet)
+
+    status = struct.pack("<4H", 0, 0, 0, READY)
+    mock.write = collect
+    mock.read = lambda index=0: status
+    return driver, packets
+
+
+def run_job(driver, cuts):
+    for cut in cuts:
+        driver.plot(cut)
+    driver.plot_start()
+
+
+def benchmark(service, count=20000, passes=5):
+    """
+    Measures the list packets per second the driver sends to the mock connection, when building the packets and when
+    sending the recorded packets of a repeated job.
+
+    @return: build rate, replay rate, packets per pass
+    """
+    driver, packets = recording_driver(service)
+    cuts = star_cutcode(count)
+    driver._compiled = None
+    t = time.perf_counter()
+    run_job(driver, cuts)
+    build_time = time.perf_counter() - t
+    per_pass = len(packets)
+    t = time.perf_counter()
+    for p in range(passes):
+        run_job(driver, cuts)
+    replay_time = time.perf_counter() - t
+    return per_pass / build_time, per_pass * passes / replay_time, per_pass
+
+
+class TestDriverBalor(unittest.TestCase):
+    def test_driver_compiled_replay(self):
+        """
+        Repeating a job sends the compiled packets, which are the packets the job builds.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            driver, packets = recording_driver(kernel.device)
+            cuts = star_cutcode(500)
+
+            run_job(driver, cuts)
+            built = list(packets)
+            self.assertGreater(len(built), 2)
+            compiled = driver._compiled[2]
+            self.assertEqual(compiled.packets, built[:-1])
+
+            # Repeated, the recorded packets are sent.
+            packets.clear()
+            run_job(driver, cuts)
+            self.assertEqual(packets, built)
+            self.assertIs(driver._compiled[2], compiled)
+
+            # Changed settings are built again.
+            packets.clear()
+            cuts[0].settings["power"] = 250.0
+            run_job(driver, cuts)
+            self.assertIsNot(driver._compiled[2], compiled)
+            self.assertNotEqual(packets, built)
+
+            build_rate, replay_rate, per_pass = benchmark(
+                kernel.device, count=2000, passes=2
+            )
+            self.assertGreater(per_pass, 2)
+            self.assertGreater(replay_rate, 0)
+        finally:
+            kernel.shutdown()
+
+    def test_driver_plotcut_without_numpy(self):
+        """
+        Without numpy plotcuts are marked point by point, which writes the lists of the packed marks.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            settings = {"speed": 100.0, "power": 500.0, "frequency": 30.0}
+            cut = PlotCut(settings=settings)
+            for i in range(3000):
+                cut.plot_append(
+                    0x1000 + 7 * i, 0x2000 + (i * 31) % 900, (i // 40) % 5 / 4
+                )
+            np = driver_module.np
+            results = []
+            try:
+                for numpy in (np, None):
+                    driver_module.np = numpy
+                    driver, packets = recording_driver(kernel.device)
+                    run_job(driver, [cut])
+                    results.append(packets)
+            finally:
+                driver_module.np = np
+            self.assertGreater(len(results[0]), 1)
+            self.assertEqual(results[0], results[1])
+        finally:
+            kernel.shutdown()
+
+    def test_controller_plot_points(self):
+        """
+        Packed marks and jumps write the same lists as marking and jumping point by point.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i balor 0\n")
+            rng = np.random.default_rng(5)
+            for trial in range(20):
+                count = int(rng.integers(1, 1500))
+                # Includes repeated and out of range points.
+                x = rng.integers(-3, 30, count) * 2300.0
+                y = rng.integers(-3, 30, count) * 2300.0
+                if trial % 2:
+                    x += rng.random(count) * 3
+                marks = rng.random(count) > 0.3
+                powers = rng.choice([np.nan, 10.0, 20.0, 45.5], count)
+                lists = []
+                for packed in (False, True):
+                    con = GalvoController(kernel.device, force_mock=True)
+                    if trial % 4 == 0:
+                        con._mark_speed = 100.0
+                        con._goto_speed = 2000.0
+                    sent = []
+
+                    def list_end(con=con, sent=sent):
+                        sent.append(bytes(con._active_list[: con._active_index]))
+                        con._active_list = None
+                        con._active_index = 0
+
+                    con._list_end = list_end
+                    if packed:
+                        con.plot_points(x, y, marks, powers)
+                    else:
+                        for i in range(count):
+                            if not np.isnan(powers[i]):
+                                con.power(float(powers[i]))
+                            if marks[i]:
+                                con.mark(x[i], y[i])
+                            else:
+                                con.goto(x[i], y[i])
+                    con.list_end_of_list()
+                    con._list_end()
+                    lists.append((sent, con.get_last_xy(), con._power))
+                self.assertEqual(lists[0], lists[1])
+        finally:
+            kernel.shutdown()
+
+
+if __name__ == "__main__":
+    kernel = bootstrap.bootstrap()
+    try:
+        kernel.console("service device start -i balor 0\n")
+        build_rate, replay_rate, per_pass = benchmark(kernel.device)
+        print(f"{per_pass} packets per pass")
+        print(f"built: {build_rate:.0f} packets/s")
+        print(f"compiled: {replay_rate:.0f} packets/s")
+    finally:
+        kernel.shutdown()
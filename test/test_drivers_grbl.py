@@ -1,7 +1,11 @@
 import os
+import time
 import unittest
 from test import bootstrap
 
+from meerk40t.grbl.compactor import GcodeCompactor
+from meerk40t.grbl.emulator import GRBLEmulator
+
 gcode_rect = """G90
 G94
 G21
@@ -15,9 +19,74 @@ G1 S0
 M5
 """
 
+gcode_rect_compact = """G90
+G94
+G21
+M4
+G0 X19.990 Y205.003 S0.0 F600.0
+G1 Y215.011 S1000.0 F900.0
+X29.997
+Y205.003
+X19.990
+G1 S0
+M5
+"""
+
 gcode_blank = ""
 
 
+class EmulatedConnection:
+    """
+    Stand-in for the serial connection, backed by the GRBL emulator.
+
+    Each write costs a fixed latency plus the transfer time at the baud rate. The emulator
+    replies to every line it parses, which is read back one line at a time.
+    """
+
+    def __init__(self, service, write_latency=0.001, baud_rate=115200, rx_size=128):
+        self.emulator = GRBLEmulator(service, "emulated")
+        self.emulator.set_reply(self.reply)
+        self.write_latency = write_latency
+        self.baud_rate = baud_rate
+        self.rx_size = rx_size
+        self.read_buffer = ""
+        self.connected = False
+        self.lines = []
+        self.writes = 0
+        self.unacknowledged = 0
+        self.overflow = False
+
+    def reply(self, data):
+        if data.startswith("ok"):
+            self.unacknowledged -= len(self.lines[-1])
+        self.read_buffer += data
+
+    def read(self):
+        f = self.read_buffer.find("\n")
+        if f == -1:
+            return None
+        response = self.read_buffer[:f].strip()
+        self.read_buffer = self.read_buffer[f + 1 :]
+        return response
+
+    def write(self, line):
+        self.writes += 1
+        time.sleep(self.write_latency + len(line) * 10 / self.baud_rate)
+        self.unacknowledged += len(line)
+        if self.unacknowledged > self.rx_size:
+            self.overflow = True
+        for part in line.splitlines(keepends=True):
+            self.lines.append(part)
+            self.emulator.write(part)
+
+    def connect(self):
+        self.connected = True
+        self.read_buffer += "Grbl 1.1f ['$' for help]\r\n"
+
+    def disconnect(self):
+        self.connected = False
+
+
 class TestDriverGRBL(unittest.TestCase):
     def test_driver_basic_rect_engrave(self):
         """
@@ -59,6 +128,79 @@ class TestDriverGRBL(unittest.TestCase):
             data = f.read()
         self.assertEqual(data, gcode_rect)
 
+    def test_driver_rect_compaction(self):
+        """
+        @return:
+        """
+        file1 = "tcc.gcode"
+        self.addCleanup(os.remove, file1)
+
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i grbl 0\n")
+            kernel.device.gcode_compaction = True
+            kernel.console("operation* remove\n")
+            kernel.console(
+                f"rect 2cm 2cm 1cm 1cm cut -s 15 plan copy-selected preprocess validate blob preopt optimize save_job {file1}\n"
+            )
+        finally:
+            kernel.device.gcode_compaction = False
+            kernel.shutdown()
+        with open(file1) as f:
+            data = f.read()
+        self.assertEqual(data, gcode_rect_compact)
+
+    def test_compactor(self):
+        """
+        Collinear moves with equal power merge, redundant words are dropped.
+
+        @return:
+        """
+        lines = []
+        compactor = GcodeCompactor(lines.append, "\n")
+        compactor.move(0, 0, 0, 0, 600)
+        compactor.move(1, 0, 0, 500, 900)
+        for i in range(1, 11):
+            compactor.move(1, i, 0)
+        compactor.move(1, 11, 0, 250)
+        compactor.move(1, 11, 1)
+        compactor.move(1, 11, 2)
+        compactor.move(1, 10, 2)
+        compactor.move(1, 5, 7)
+        compactor.move(1, 4, 8)
+        compactor.move(0, 3, 8, 0)
+        compactor.flush()
+        self.assertEqual(
+            lines,
+            [
+                "G0 X0.000 Y0.000 S0.0 F600.0\n",
+                "G1 X10.000 S500.0 F900.0\n",
+                "X11.000 S250.0\n",
+                "Y2.000\n",
+                "X10.000\n",
+                "X4.000 Y8.000\n",
+                "G0 X3.000 S0.0\n",
+            ],
+        )
+        self.assertEqual(compactor.moves, 19)
+
+        # With tolerance, nearly collinear moves merge as well.
+        lines = []
+        compactor = GcodeCompactor(lines.append, "\n", tolerance=0.01)
+        compactor.move(1, 0, 0, 500, 900)
+        compactor.move(1, 1, 0.005)
+        compactor.move(1, 2, 0)
+        compactor.move(1, 3, 0.05)
+        compactor.flush()
+        self.assertEqual(
+            lines,
+            [
+                "G1 X0.000 Y0.000 S500.0 F900.0\n",
+                "X2.000\n",
+                "X3.000 Y0.050\n",
+            ],
+        )
+
     def test_driver_basic_rect_raster(self):
         """
         Attempts a raster operation however wxPython isn't available so nothing is produced.
@@ -80,3 +222,54 @@ class TestDriverGRBL(unittest.TestCase):
         with open(file1) as f:
             data = f.read()
         self.assertEqual(data, gcode_blank)
+
+
+class TestGRBLStreaming(unittest.TestCase):
+    def test_streaming_throughput(self):
+        """
+        Sends dense raster-like gcode with the buffered and streaming protocols through the
+        emulated connection. Both must deliver every line in order without overflowing the
+        planning buffer, streaming with far fewer writes.
+
+        @return:
+        """
+        lines = [f"G1 X{i % 97 / 10.0:.3f} S{i % 1000:.1f}\r" for i in range(500)]
+        results = dict()
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i grbl 0\n")
+            device = kernel.device
+            controller = device.controller
+            buffer_mode = device.buffer_mode
+            try:
+                for mode in ("buffered", "streaming"):
+                    device.buffer_mode = mode
+                    connection = EmulatedConnection(device)
+                    controller.connection = connection
+                    t = time.time()
+                    for line in lines:
+                        controller.write(line)
+                    while (
+                        controller._sending_queue
+                        or controller.commands_in_device_buffer
+                    ):
+                        self.assertLess(time.time() - t, 30)
+                        time.sleep(0.001)
+                    elapsed = time.time() - t
+                    self.assertEqual(connection.lines, lines)
+                    self.assertFalse(connection.overflow)
+                    self.assertEqual(controller.buffered_characters, 0)
+                    controller.close()
+                    with controller._lock:
+                        controller._lock.notify()
+                    while controller.sending_thread is not None:
+                        time.sleep(0.001)
+                    results[mode] = connection.writes, len(lines) / elapsed
+            finally:
+                device.buffer_mode = buffer_mode
+        finally:
+            kernel.shutdown()
+        buffered_writes, buffered_rate = results["buffered"]
+        streaming_writes, streaming_rate = results["streaming"]
+        self.assertEqual(buffered_writes, len(lines))
+        self.assertLess(streaming_writes * 4, buffered_writes)
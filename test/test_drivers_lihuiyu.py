@@ -1,12 +1,28 @@
 import os
+import time
 import unittest
 from test import bootstrap
 
 from PIL import Image, ImageDraw
 
+from meerk40t.core.laserjob import LaserJob
 from meerk40t.core.node.elem_image import ImageNode
+from meerk40t.core.node.op_cut import CutOpNode
+from meerk40t.core.node.op_engrave import EngraveOpNode
+from meerk40t.core.node.op_image import ImageOpNode
 from meerk40t.core.units import UNITS_PER_MM
-from meerk40t.svgelements import Matrix
+from meerk40t.device.ch341.simulated import SimulatedCH341
+from meerk40t.kernel import STATE_PAUSE, STATE_WAIT
+from meerk40t.lihuiyu.controller import (
+    STATUS_BUSY,
+    STATUS_FINISH,
+    STATUS_OK,
+    LihuiyuController,
+    PacketBuffer,
+    onewire_crc_lookup,
+)
+from meerk40t.lihuiyu.driver import LihuiyuDriver
+from meerk40t.svgelements import Ellipse, Matrix, Rect
 
 egv_rect = """Document type : LHYMICRO-GL file
 File version: 1.0.01
@@ -59,6 +75,163 @@ ICV2490731016000027CNLBS1EDz139Rz139Tz139Lz139FNSE-
 """
 
 
+class PacketConnection:
+    """
+    Stand-in for the ch341 connection, confirming every packet.
+    """
+
+    def __init__(self):
+        self.frames = []
+
+    def open(self):
+        pass
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+    def get_status(self):
+        return [255, STATUS_OK, 0, 0, 0, 1]
+
+
+def onewire_crc(data):
+    # Bitwise Dallas/Maxim CRC-8.
+    crc = 0
+    for b in data:
+        crc ^= b
+        for i in range(8):
+            crc = (crc >> 1) ^ 0x8C if crc & 1 else crc >> 1
+    return crc
+
+
+def benchmark_plan(kernel, kind, count=10):
+    """
+    Plans a representative job on the current device.
+
+    @param kind: "vector" for rows of engraved circles and cut rectangles, "raster" for a dithered image, "mixed" for
+        both.
+    @param count: shapes per row and side of the image in tens of pixels.
+    @return: plan items
+    """
+    elements = kernel.elements
+    elements.clear_elements_and_operations()
+    if kind in ("raster", "mixed"):
+        size = count * 10
+        image = Image.new("RGBA", (size, size), "white")
+        draw = ImageDraw.Draw(image)
+        draw.ellipse((size // 8, size // 8, size * 7 // 8, size * 7 // 8), "black")
+        draw.rectangle((size // 4, size // 2, size * 3 // 4, size * 3 // 4), "gray")
+        matrix = Matrix.scale(UNITS_PER_MM / 10)
+        matrix.post_translate(UNITS_PER_MM * 5, UNITS_PER_MM * 5)
+        node = ImageNode(image=image, matrix=matrix, dpi=250)
+        elements.elem_branch.add_node(node)
+        op = ImageOpNode()
+        op.speed = 150.0
+        op.dpi = 250
+        elements.add_op(op)
+        op.add_reference(node)
+    if kind in ("vector", "mixed"):
+        engrave = EngraveOpNode()
+        engrave.speed = 35.0
+        cut = CutOpNode()
+        cut.speed = 15.0
+        elements.add_op(engrave)
+        elements.add_op(cut)
+        for i in range(count):
+            for j in range(count):
+                x = UNITS_PER_MM * (10 + 12 * i)
+                y = UNITS_PER_MM * (10 + 12 * j)
+                circle = elements.elem_branch.add(
+                    shape=Ellipse(cx=x, cy=y, r=UNITS_PER_MM * 4), type="elem ellipse"
+                )
+                rect = elements.elem_branch.add(
+                    shape=Rect(
+                        x - UNITS_PER_MM * 5,
+                        y - UNITS_PER_MM * 5,
+                        UNITS_PER_MM * 10,
+                        UNITS_PER_MM * 10,
+                    ),
+                    type="elem rect",
+                )
+                engrave.add_reference(circle)
+                cut.add_reference(rect)
+    kernel.console("plan clear copy preprocess validate blob preopt optimize\n")
+    return list(kernel.planner.default_plan.plan)
+
+
+class EgvPipe:
+    """
+    Output of the driver collecting the egv written to it, never holding the driver.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        self.data += data
+
+    def __len__(self):
+        return 0
+
+
+def benchmark(service, items, connection=None, timeout=120.0):
+    """
+    Runs the plan items through a LihuiyuDriver and the LihuiyuController of the device to the simulated connection.
+    The buffer limit of the device is lifted, otherwise the driver waits on the buffer in 50ms steps rather than
+    generating.
+
+    @param service: lihuiyu device
+    @param items: plan items
+    @param connection: simulated connection, default answers instantly.
+    @param timeout: seconds to wait for the controller to send the data.
+    @return: dict of seconds, egv, packets, generated bytes/s, sent bytes/s and sent packets/s
+    """
+    if connection is None:
+        connection = SimulatedCH341()
+    results = {}
+
+    # Generation alone.
+    driver = LihuiyuDriver(service)
+    driver.out_pipe = EgvPipe()
+    t = time.perf_counter()
+    LaserJob("benchmark", list(items), driver=driver).execute()
+    results["generate_seconds"] = time.perf_counter() - t
+    results["egv"] = bytes(driver.out_pipe.data)
+    results["generate_bytes_per_second"] = len(results["egv"]) / max(
+        results["generate_seconds"], 1e-9
+    )
+
+    # Generation while the controller sends the packets.
+    buffer_limit = service.buffer_limit
+    service.buffer_limit = False
+    controller = service.controller
+    original = controller.connection
+    controller.connection = connection
+    driver = LihuiyuDriver(service)
+    driver.out_pipe = controller
+    try:
+        t = time.perf_counter()
+        LaserJob("benchmark", list(items), driver=driver).execute()
+        end = time.perf_counter() + timeout
+        # Jobs end waiting for the board to finish, sent once the board reported finishing.
+        while (
+            len(controller)
+            or not connection.finished
+            or controller.state in (STATE_PAUSE, STATE_WAIT)
+        ):
+            if time.perf_counter() > end:
+                raise TimeoutError("Controller did not send the job.")
+            time.sleep(0.001)
+        seconds = time.perf_counter() - t
+    finally:
+        service.buffer_limit = buffer_limit
+        controller.connection = original
+    results["seconds"] = seconds
+    results["packets"] = connection.packet_count
+    results["bytes_per_second"] = connection.byte_count / seconds
+    results["packets_per_second"] = connection.packet_count / seconds
+    return results
+
+
 class TestDriverLihuiyu(unittest.TestCase):
     def test_driver_basic_rect_engrave(self):
         """
@@ -415,3 +588,130 @@ class TestDriverLihuiyuOverrideSpeed(unittest.TestCase):
             self.assertEqual(data[-3], data[-1])
         finally:
             kernel.shutdown()
+
+
+class TestControllerLihuiyu(unittest.TestCase):
+    def test_controller_packets(self):
+        """
+        The controller splits the buffer into padded packets at line ends, frames them with their crc and consumes the
+        buffer.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i lhystudios 0\n")
+            controller = LihuiyuController(kernel.device)
+            connection = PacketConnection()
+            controller.connection = connection
+            controller._queue = bytearray(
+                b"IBzzzvRzzzvS1P\n"
+                + b"B" * 95
+                + b"\n"
+                + b"ICV2490731016000027CNLBS1EDz#\n"
+                + b"FNSE%\n"
+            )
+            while controller.process_queue():
+                pass
+            packets = [
+                b"IBzzzvRzzzvS1P" + b"F" * 16,
+                b"B" * 30,
+                b"B" * 30,
+                b"B" * 30,
+                b"BBBBB" + b"F" * 25,
+                b"ICV2490731016000027CNLBS1EDzzz",
+                b"FNSE" + b"F" * 26,
+            ]
+            self.assertEqual(
+                connection.frames,
+                [b"\x00" + p + bytes([onewire_crc(p)]) for p in packets[:-1]]
+                # The alternate checksum fails the crc.
+                + [b"\x00" + packets[-1] + bytes([onewire_crc(packets[-1]) ^ 0xFF])],
+            )
+            self.assertEqual(len(controller._buffer), 0)
+        finally:
+            kernel.shutdown()
+
+    def test_packet_buffer(self):
+        """
+        The packet buffer is consumed from its front without moving the remaining data each time.
+        """
+        for i in range(256):
+            self.assertEqual(onewire_crc_lookup(bytes([i]) * 30), onewire_crc([i] * 30))
+        buffer = PacketBuffer(b"0123456789")
+        buffer += b"abcdef\n"
+        buffer.consume(3)
+        self.assertEqual(bytes(buffer), b"3456789abcdef\n")
+        self.assertEqual(buffer[:4], b"3456")
+        self.assertEqual(buffer[-1], ord("\n"))
+        self.assertEqual(buffer.find(b"\n"), 13)
+        self.assertEqual(buffer.find(b"\n", 0, 5), -1)
+        buffer.consume(10)
+        self.assertEqual(bytes(buffer), b"def\n")
+        self.assertEqual(buffer.position, 13)
+        # Consumed data is dropped once it outweighs the rest.
+        self.assertLess(len(buffer._data), 17)
+
+
+class TestDriverLihuiyuSimulated(unittest.TestCase):
+    def test_simulated_connection(self):
+        """
+        The simulated connection answers packets with BUSY, then OK or ERROR, and FINISH once they are executed.
+        """
+        connection = SimulatedCH341(busy_polls=2, packet_time=0.05)
+        connection.open()
+        packet = b"I" + b"F" * 29
+        connection.write(b"\x00" + packet + bytes([onewire_crc(packet)]))
+        statuses = [connection.get_status()[1] for i in range(4)]
+        self.assertEqual(statuses, [STATUS_BUSY, STATUS_BUSY, STATUS_OK, STATUS_OK])
+        time.sleep(0.06)
+        self.assertEqual(connection.get_status()[1], STATUS_FINISH)
+        self.assertEqual(connection.get_status()[1], STATUS_OK)
+        connection.write(b"\x00" + packet + b"\x00")
+        self.assertEqual(connection.get_status()[1], STATUS_BUSY)
+        self.assertEqual(connection.get_status()[1], STATUS_BUSY)
+        self.assertNotEqual(connection.get_status()[1], STATUS_OK)
+        self.assertEqual(connection.packets, [packet])
+        self.assertEqual(connection.error_count, 1)
+
+    def test_benchmark(self):
+        """
+        Vector, raster and mixed jobs are sent through the driver and controller to the simulated connection, the
+        packets sent being the egv the driver generates.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("service device start -i lhystudios 0\n")
+            for kind in ("vector", "raster", "mixed"):
+                items = benchmark_plan(kernel, kind, count=3)
+                connection = SimulatedCH341(busy_polls=1)
+                results = benchmark(kernel.device, items, connection)
+                self.assertGreater(results["packets"], 0, kind)
+                self.assertEqual(connection.error_count, 0)
+                # Each line is sent in packets of 30 bytes, without its wait command and padded.
+                packets = []
+                for line in results["egv"].split(b"\n")[:-1]:
+                    if line.endswith(b"-"):
+                        line = line[:-1]
+                    for i in range(0, len(line), 30):
+                        packets.append(line[i : i + 30].ljust(30, b"F"))
+                self.assertEqual(connection.packets, packets, kind)
+        finally:
+            kernel.shutdown()
+
+
+if __name__ == "__main__":
+    kernel = bootstrap.bootstrap()
+    try:
+        kernel.console("service device start -i lhystudios 0\n")
+        for kind in ("vector", "raster", "mixed"):
+            items = benchmark_plan(kernel, kind, count=20)
+            results = benchmark(kernel.device, items)
+            print(
+                f"{kind}: {len(results['egv'])} egv bytes, {results['packets']} packets"
+            )
+            print(f"  generated: {results['generate_bytes_per_second']:.0f} bytes/s")
+            print(
+                f"  sent: {results['bytes_per_second']:.0f} bytes/s, "
+                f"{results['packets_per_second']:.0f} packets/s"
+            )
+    finally:
+        kernel.shutdown()
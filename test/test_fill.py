@@ -3,7 +3,8 @@ from copy import copy
 from test import bootstrap
 
 from meerk40t.core.cutplan import CutPlan
-from meerk40t.fill.fills import eulerian_fill, scanline_fill
+from meerk40t.core.units import UNITS_PER_MIL
+from meerk40t.fill.fills import eulerian_fill, fast_scanline_fill, scanline_fill
 from meerk40t.svgelements import Matrix, Rect
 
 
@@ -132,6 +133,61 @@ class TestFill(unittest.TestCase):
         finally:
             kernel.shutdown()
 
+    def test_fill_hatch_fast_scanline(self):
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("circle 1in 1in 1in\n")
+            kernel.console("operation* delete\n")
+            kernel.console("hatch\n")
+            hatch = list(kernel.elements.ops())[0]
+            circle = list(kernel.elements.elems())[0]
+            shapes = []
+            for hatch_type in ("scanline", "fast_scanline"):
+                hatch.hatch_type = hatch_type
+                hatch.remove_all_children()
+                hatch.add_node(copy(circle))
+                c = CutPlan("q", kernel.planner)
+                hatch.preprocess(kernel.root, Matrix(), c)
+                c.execute()
+                shapes.append([list(node.shape) for node in hatch.children])
+            self.assertTrue(shapes[0])
+            self.assertEqual(len(shapes[0]), len(shapes[1]))
+            for a, b in zip(*shapes):
+                self.assertEqual(len(a), len(b))
+                for p, q in zip(a, b):
+                    self.assertAlmostEqual(p[0], q[0], places=3)
+                    self.assertAlmostEqual(p[1], q[1], places=3)
+        finally:
+            kernel.shutdown()
+
+    def test_fill_hatch_tolerance(self):
+        """
+        Outlines are flattened within 0.01mm of the curves in the device units of mils.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            kernel.console("circle 1in 1in 1in\n")
+            kernel.console("operation* delete\n")
+            kernel.console("hatch\n")
+            hatch = list(kernel.elements.ops())[0]
+            hatch.hatch_type = "scanline"
+            circle = copy(list(kernel.elements.elems())[0])
+            matrix = Matrix.scale(1.0 / UNITS_PER_MIL)
+            circle.matrix *= matrix
+            hatch.add_node(circle)
+            c = CutPlan("q", kernel.planner)
+            hatch.preprocess(kernel.root, matrix, c)
+            c.execute()
+            ends = [p for node in hatch.children for p in node.shape]
+            self.assertTrue(ends)
+            tolerance = 0.01 / 0.0254
+            for p in ends:
+                distance = abs(complex(p[0] - 1000, p[1] - 1000))
+                self.assertLess(distance, 1000 + 1e-3)
+                self.assertGreater(distance, 1000 - tolerance)
+        finally:
+            kernel.shutdown()
+
     def test_fill_scanline(self):
         w = 10000
         h = 10000
@@ -159,10 +215,66 @@ class TestFill(unittest.TestCase):
             x, y = p
             self.assertIn(x, (500, 2500, 7500, 9500))
 
+    def test_fill_array_outlines(self):
+        """
+        Outlines given as complex arrays fill the same as outlines given as points.
+        """
+        import numpy as np
+
+        w = 10000
+        h = 10000
+        paths = (
+            ((w * 0.05, h * 0.05), (w * 0.95, h * 0.05), (w * 0.5, h * 0.95)),
+            ((w * 0.25, h * 0.25), (w * 0.75, h * 0.25), (w * 0.5, h * 0.75)),
+        )
+        arrays = [np.array([complex(x, y) for x, y in p]) for p in paths]
+        settings = {"hatch_angle": "30deg"}
+        for fill in (scanline_fill, eulerian_fill):
+            expected = list(fill(settings=settings, outlines=paths, matrix=None))
+            result = list(fill(settings=settings, outlines=arrays, matrix=None))
+            self.assertEqual(len(result), len(expected))
+            for p, q in zip(result, expected):
+                if p is None or q is None:
+                    self.assertIs(p, q)
+                    continue
+                self.assertAlmostEqual(p[0], q[0])
+                self.assertAlmostEqual(p[1], q[1])
+
+    def test_fill_fast_scanline(self):
+        """
+        The numpy scanline fill gives the same hatch as the scanline fill.
+        """
+        from meerk40t.svgelements import Circle, Path
+        from meerk40t.tools.geomstr import Geomstr
+
+        outlines = []
+        for shape in (
+            Circle(5000, 5000, 4000),
+            Rect(2000, 2000, 3000, 4000),
+            Circle(9000, 3000, 2500),
+        ):
+            outlines.extend(Geomstr.svg(Path(shape)).as_polylines(tolerance=5))
+        for angle in ("0deg", "17deg", "90deg", "135deg"):
+            settings = {"hatch_angle": angle, "hatch_distance": "0.3mm"}
+            expected = scanline_fill(settings=settings, outlines=outlines, matrix=None)
+            result = fast_scanline_fill(
+                settings=settings, outlines=outlines, matrix=None
+            )
+            self.assertTrue(expected)
+            self.assertEqual(len(result), len(expected))
+            for p, q in zip(result, expected):
+                if p is None or q is None:
+                    self.assertIs(p, q)
+                    continue
+                self.assertAlmostEqual(p[0], q[0], places=5)
+                self.assertAlmostEqual(p[1], q[1], places=5)
+        self.assertEqual(fast_scanline_fill(settings={}, outlines=[], matrix=None), [])
+
     def test_fill_kernel_registered(self):
         kernel = bootstrap.bootstrap()
         try:
             eulerian_fill_k = kernel.lookup("hatch/eulerian")
             self.assertIs(eulerian_fill_k, eulerian_fill)
+            self.assertIs(kernel.lookup("hatch/fast_scanline"), fast_scanline_fill)
         finally:
             kernel.shutdown()
@@ -217,6 +217,52 @@ class TestGeomstr(unittest.TestCase):
         # print(p.segments)
         # draw(p.segments, w, h)
 
+    def test_geomstr_as_polylines(self):
+        """
+        Flattened curves are within tolerance, lines are not subdivided, each subpath is a polyline.
+        """
+        from meerk40t.svgelements import Circle, Path
+
+        path = Path(Circle(0, 0, 10000)) + Path("M0,0 L100,0 L100,100 Z")
+        path += Path("M500,500 Q600,600 700,500")
+        g = Geomstr.svg(Path(path))
+        for tolerance in (10, 1, 0.1):
+            polylines = g.as_polylines(tolerance=tolerance)
+            self.assertEqual(len(polylines), 3)
+            circle, triangle, quad = polylines
+            self.assertEqual(len(triangle), 4)
+            self.assertEqual(triangle[0], triangle[-1])
+            self.assertEqual(circle[0], circle[-1])
+            self.assertEqual(quad[0], 500 + 500j)
+            self.assertEqual(quad[-1], 700 + 500j)
+        self.assertGreater(
+            len(g.as_polylines(tolerance=0.1)[0]), len(g.as_polylines(10)[0])
+        )
+
+        g = Geomstr()
+        g.cubic(0j, 3000 + 5000j, 6000 - 4000j, 9000 + 1000j)
+        t = np.linspace(0, 1, 20001)
+        curve = (
+            (1 - t) ** 3 * 0
+            + 3 * (1 - t) ** 2 * t * (3000 + 5000j)
+            + 3 * (1 - t) * t**2 * (6000 - 4000j)
+            + t**3 * (9000 + 1000j)
+        )
+        for tolerance in (20, 5, 2):
+            polyline = g.as_polylines(tolerance=tolerance)[0]
+            # Chord midpoints stay within tolerance of the curve.
+            mids = (polyline[1:] + polyline[:-1]) / 2
+            distances = np.min(np.abs(mids[:, None] - curve[None, :]), axis=1)
+            self.assertLess(np.max(distances), tolerance)
+
+        g = Geomstr()
+        g.arc(0j, 100 + 100j, 200 + 0j)
+        arc = g.as_polylines(tolerance=0.1)[0]
+        self.assertEqual(arc[0], 0j)
+        self.assertAlmostEqual(arc[-1], 200 + 0j)
+        mids = (arc[1:] + arc[:-1]) / 2
+        self.assertLess(np.max(100 - np.abs(mids - (100 + 0j))), 0.11)
+
     def test_geomstr_arc_center(self):
         for i in range(1000):
             start = complex(random.random() * 100, random.random() * 100)
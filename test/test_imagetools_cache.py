@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from copy import copy
+
+from PIL import Image, ImageDraw
+
+from meerk40t.core.node.elem_image import ImageNode
+from meerk40t.core.units import UNITS_PER_INCH
+from meerk40t.image.imagecache import ImageCache, image_cache
+from meerk40t.svgelements import Matrix
+
+
+def draw_image():
+    image = Image.new("RGBA", (256, 256), "white")
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((50, 50, 150, 150), "black")
+    draw.rectangle((120, 20, 200, 90), (128, 64, 32, 255))
+    return image
+
+
+class TestImageCache(unittest.TestCase):
+    def test_image_cache_process(self):
+        """
+        Processing an unchanged image with unchanged settings reuses the processed image.
+        """
+        image_cache.clear()
+        node = ImageNode(image=draw_image(), matrix=Matrix.scale(2), dpi=500)
+        step = UNITS_PER_INCH / 500
+        processed = node.active_image
+        matrix = node.active_matrix
+        hits = image_cache.hits
+
+        # The copy processes its image on creation.
+        node_copy = copy(node)
+        self.assertEqual(image_cache.hits, hits + 1)
+        node_copy.process_image(step, step)
+        self.assertEqual(image_cache.hits, hits + 2)
+        self.assertIs(node_copy.active_image, processed)
+        self.assertEqual(node_copy.active_matrix, matrix)
+
+        # Same result as processing without the cache.
+        m, image = node_copy._process_image(step, step)
+        self.assertEqual(image.tobytes(), processed.tobytes())
+
+        # Changed settings are processed again.
+        node_copy.invert = True
+        node_copy.process_image(step, step)
+        self.assertIsNot(node_copy.active_image, processed)
+        self.assertEqual(image_cache.hits, hits + 2)
+
+    def test_image_cache_disk(self):
+        """
+        Images written to the disk cache are found by a new cache using that directory.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ImageCache(directory=directory)
+            image = Image.new("1", (64, 32), 1)
+            ImageDraw.Draw(image).line((0, 0, 63, 31), 0)
+            key = cache.key(image, ("test", 1))
+            cache.put(key, Matrix.translate(3, 4), image, [True, "Floyd-Steinberg"])
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+            cache = ImageCache(directory=directory)
+            matrix, cached, state = cache.get(key)
+            self.assertEqual(matrix, Matrix.translate(3, 4))
+            self.assertEqual(cached.mode, "1")
+            self.assertEqual(cached.tobytes(), image.tobytes())
+            self.assertEqual(state, [True, "Floyd-Steinberg"])
+            self.assertIsNone(cache.get(cache.key(image, ("test", 2))))
+
+            cache.clear(disk=True)
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_image_cache_limit(self):
+        """
+        The least recently used images are dropped above the memory limit.
+        """
+        cache = ImageCache(memory_limit=3 * 100 * 100)
+        images = [Image.new("L", (100, 100), i) for i in range(4)]
+        keys = [cache.key(image, ()) for image in images]
+        self.assertEqual(len(set(keys)), 4)
+        for key, image in zip(keys, images):
+            cache.put(key, Matrix(), image)
+            # Use the first image, it remains cached.
+            cache.get(keys[0])
+        self.assertEqual(len(cache), 3)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[3]))
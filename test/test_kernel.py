@@ -1,3 +1,4 @@
+import time
 import unittest
 from test import bootstrap
 
@@ -113,3 +114,58 @@ class TestEchoCommand(unittest.TestCase):
                 kernel.console(echo + "\n")
         finally:
             kernel.shutdown()
+
+
+class TestScheduler(unittest.TestCase):
+    def test_scheduler_timers(self):
+        """
+        Jobs run when they are due, including jobs added while the scheduler waits for a later job, and the scheduler
+        sleeps while no signals are sent.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            runs = {"slow": [], "fast": [], "removed": [], "conditional": []}
+            allowed = []
+            start = time.time()
+            kernel.add_job(
+                lambda: runs["slow"].append(time.time()), "slow", interval=30
+            )
+            kernel.add_job(
+                lambda: runs["fast"].append(time.time()),
+                "fast",
+                interval=0.05,
+                times=3,
+            )
+            removed = kernel.add_job(
+                lambda: runs["removed"].append(time.time()), "removed", interval=0.05
+            )
+            kernel.add_job(
+                lambda: runs["conditional"].append(time.time()),
+                "conditional",
+                interval=0.05,
+                times=1,
+                conditional=lambda: allowed,
+            )
+            kernel.remove_job(removed)
+            time.sleep(0.3)
+            allowed.append(True)
+            time.sleep(0.1)
+
+            self.assertEqual(runs["slow"], [])
+            self.assertEqual(runs["removed"], [])
+            self.assertEqual(len(runs["fast"]), 3)
+            self.assertNotIn("fast", kernel.jobs)
+            for i, t in enumerate(runs["fast"]):
+                self.assertGreaterEqual(t - start, 0.05 * (i + 1) - 0.001)
+            self.assertEqual(len(runs["conditional"]), 1)
+            self.assertGreater(runs["conditional"][0] - start, 0.3)
+
+            # The signal job is only timed while signals are queued.
+            self.assertTrue(kernel._signals_idle)
+            received = []
+            kernel.listen("test_signal", lambda origin, *m: received.append(m))
+            kernel.signal("test_signal", "/", 1)
+            time.sleep(0.05)
+            self.assertEqual(received, [(1,)])
+        finally:
+            kernel.shutdown()
@@ -0,0 +1,86 @@
+import random
+import unittest
+
+from PIL import Image
+
+from meerk40t.tools.rasterplotter import NumpyRasterPlotter, RasterPlotter
+
+
+def random_image(width, height, seed, mode="L"):
+    random.seed(seed)
+    image = Image.new("L", (width, height), 255)
+    # Runs of equal pixels, with blank rows and columns.
+    for y in range(height):
+        if random.random() < 0.2:
+            continue
+        x = random.randint(0, width)
+        while x < width:
+            run = random.randint(1, 6)
+            value = random.choice((0, 0, 128, 255))
+            for i in range(x, min(x + run, width)):
+                image.putpixel((i, y), value)
+            x += run + random.randint(0, 4)
+    if mode == "1":
+        image = image.convert("1")
+    return image
+
+
+class TestRasterPlotter(unittest.TestCase):
+    def test_numpy_rasterplotter_equivalence(self):
+        """
+        NumpyRasterPlotter must plot exactly the same values as RasterPlotter.
+        """
+        for seed in range(4):
+            for mode in ("L", "1"):
+                image = random_image(23 + seed, 17 + seed, seed, mode)
+                for inverted in (False, True):
+                    if inverted:
+                        skip_pixel = 255
+
+                        def image_filter(pixel):
+                            return pixel / 255.0
+
+                    else:
+                        skip_pixel = 0
+
+                        def image_filter(pixel):
+                            return (255 - pixel) / 255.0
+
+                    for horizontal in (True, False):
+                        for start_on_top in (True, False):
+                            for start_on_left in (True, False):
+                                for overscan in (0, 3):
+                                    kwargs = dict(
+                                        width=image.width,
+                                        height=image.height,
+                                        horizontal=horizontal,
+                                        start_on_top=start_on_top,
+                                        start_on_left=start_on_left,
+                                        skip_pixel=skip_pixel,
+                                        overscan=overscan,
+                                        offset_x=5,
+                                        offset_y=7,
+                                        step_x=2,
+                                        step_y=3,
+                                        filter=image_filter,
+                                    )
+                                    plotter = RasterPlotter(data=image.load(), **kwargs)
+                                    numpy_plotter = NumpyRasterPlotter(
+                                        data=image, **kwargs
+                                    )
+                                    expected = list(plotter.plot())
+                                    self.assertEqual(
+                                        list(numpy_plotter.plot()), expected
+                                    )
+                                    self.assertEqual(
+                                        numpy_plotter.final_position_in_scene(),
+                                        plotter.final_position_in_scene(),
+                                    )
+
+    def test_numpy_rasterplotter_blank(self):
+        image = Image.new("L", (10, 10), 255)
+        plotter = NumpyRasterPlotter(
+            data=image, width=10, height=10, filter=lambda p: (255 - p) / 255.0
+        )
+        self.assertIsNone(plotter.initial_x)
+        self.assertEqual(list(plotter.plot()), [])
@@ -1,6 +1,14 @@
+import threading
+import time
 import unittest
 from test import bootstrap
 
+from meerk40t.core.cutcode.cutcode import CutCode
+from meerk40t.core.cutcode.cutgroup import CutGroup
+from meerk40t.core.cutcode.linecut import LineCut
+from meerk40t.core.laserjob import LaserJob
+from meerk40t.core.spoolers import Spooler
+
 
 class TestJob:
     def __init__(
@@ -56,3 +64,170 @@ class TestSpooler(unittest.TestCase):
             kernel.device.spooler.remove(j)
         finally:
             kernel.shutdown()
+
+
+class BlockingJob(TestJob):
+    """
+    Job executing until it is released.
+    """
+
+    def __init__(self, service):
+        super().__init__(service)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def execute(self, driver):
+        self.stopped = False
+        self.started.set()
+        self.release.wait(10)
+        self.stopped = True
+        return True
+
+
+def wait_for(condition, timeout=10):
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestSpoolerQueue(unittest.TestCase):
+    def test_spooler_priority(self):
+        """
+        Jobs are queued by priority, and in the order they were sent within a priority.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            spooler = Spooler(kernel.device, driver=RecordingDriver())
+            jobs = []
+            for i, priority in enumerate((0, 2, 0, -1, 2, 1, 0)):
+                job = TestJob(kernel.device)
+                job.priority = priority
+                job.index = i
+                jobs.append(job)
+                spooler.send(job)
+            self.assertEqual(
+                [job.index for job in spooler.queue], [1, 4, 5, 0, 2, 6, 3]
+            )
+            spooler.remove(jobs[4])
+            spooler.remove(jobs[0])
+            self.assertEqual([job.index for job in spooler.queue], [1, 5, 2, 6, 3])
+            self.assertEqual(len(spooler), 5)
+            spooler.clear_queue()
+            self.assertEqual(spooler.queue, [])
+        finally:
+            kernel.shutdown()
+
+    def test_spooler_prepare(self):
+        """
+        The next job is prepared while the current job executes.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            spooler = kernel.device.spooler
+            driver = spooler.driver
+            recording = RecordingDriver()
+            spooler.driver = recording
+            try:
+                blocking = BlockingJob(kernel.device)
+                spooler.send(blocking)
+                self.assertTrue(blocking.started.wait(10))
+                cutcode = CutCode([LineCut((0, 0), (10, 10))])
+                spooler.laserjob(["home", cutcode])
+                job = spooler.queue[1]
+                self.assertTrue(wait_for(lambda: recording.calls))
+                self.assertEqual(recording.calls, ["prepare"])
+                self.assertTrue(job.prepared)
+                self.assertEqual(job.steps_total, 3)
+                self.assertIs(recording.prepared[0], cutcode)
+
+                blocking.release.set()
+                self.assertTrue(wait_for(lambda: not spooler.queue))
+                self.assertEqual(
+                    recording.calls, ["prepare", "home", "plot", "plot_start"]
+                )
+            finally:
+                blocking.release.set()
+                spooler.clear_queue()
+                spooler.driver = driver
+        finally:
+            kernel.shutdown()
+
+    def test_spooler_log_motion(self):
+        """
+        The motion of completed jobs is logged outside the spooler thread, unless estimate_log_motion is turned off.
+        """
+        kernel = bootstrap.bootstrap()
+        try:
+            device = kernel.device
+            choices = device.lookup("choices", "estimate")
+            self.assertIn("estimate_log_motion", [choice["attr"] for choice in choices])
+            spooler = Spooler(device, driver=RecordingDriver())
+            cutcode = CutCode([LineCut((0, 0), (1000, 1000))])
+            events = []
+            for log_motion in (False, True):
+                device.estimate_log_motion = log_motion
+                job = LaserJob("test", [cutcode], driver=spooler.driver)
+                job.uid = kernel.logging.uid("job")
+                spooler.remove(job)
+                events.append(kernel.logging.logs[job.uid])
+            self.assertTrue(wait_for(lambda: "motion" in events[1]))
+            self.assertNotIn("motion", events[0])
+            self.assertEqual(events[1]["motion"]["cuts"], 1)
+            self.assertEqual(events[1]["status"], "completed")
+        finally:
+            kernel.shutdown()
+
+
+class RecordingDriver:
+    def __init__(self):
+        self.calls = []
+
+    def plot(self, cut):
+        self.calls.append("plot")
+
+    def plot_start(self):
+        self.calls.append("plot_start")
+
+    def home(self):
+        self.calls.append("home")
+
+    def hold_work(self, priority):
+        return False
+
+    def prepare(self, cutcodes, aborted=None):
+        self.calls.append("prepare")
+        self.prepared = list(cutcodes)
+
+
+class TestLaserJob(unittest.TestCase):
+    def test_laserjob_steps(self):
+        """
+        Steps are counted without generating the cutcode, and are the steps done once a pass completed.
+        """
+        cutcode = CutCode()
+        group = CutGroup(cutcode)
+        for i in range(5):
+            group.append(LineCut((0, 0), (i, 10)))
+        cutcode.append(group)
+        cutcode.append(LineCut((10, 10), (20, 20)))
+        generated = []
+
+        def generate():
+            generated.append(True)
+            yield from CutCode.generate(cutcode)
+
+        cutcode.generate = generate
+        driver = RecordingDriver()
+        job = LaserJob("test", ["home", cutcode, ("wait", 5)], driver=driver, loops=2)
+        self.assertEqual(job.steps_total, 8)
+        self.assertFalse(generated)
+
+        job = LaserJob("test", ["home", cutcode, ("wait", 5)], driver=driver, loops=2)
+        self.assertTrue(job.execute(driver))
+        self.assertEqual(len(generated), 2)
+        self.assertEqual(len(driver.calls), 16)
+        self.assertEqual(job.steps_done, 8)
+        self.assertEqual(job.steps_total, 8)
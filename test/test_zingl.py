@@ -1,3 +1,5 @@
+import random
+import time
 import unittest
 from math import ceil
 
@@ -5,6 +7,82 @@ from meerk40t.svgelements import Arc
 from meerk40t.tools.zinglplotter import ZinglPlotter
 
 
+def zingl_cases(count=1000, seed=None):
+    """
+    Random lines, quads and cubics of the test cases, as plotter name and arguments.
+    """
+    rng = random.Random(seed)
+    cases = []
+    for i in range(count):
+        cases.append(
+            (
+                "plot_line",
+                (
+                    rng.randint(0, 100),
+                    rng.randint(0, 100),
+                    rng.randint(0, 100),
+                    rng.randint(0, 100),
+                ),
+            )
+        )
+        cases.append(
+            (
+                "plot_quad_bezier",
+                (
+                    rng.randint(0, 100),
+                    rng.randint(0, 100),
+                    rng.random() * 100,
+                    rng.random() * 100,
+                    rng.randint(0, 100),
+                    rng.randint(0, 100),
+                ),
+            )
+        )
+        cases.append(
+            (
+                "plot_cubic_bezier",
+                (
+                    rng.randint(0, 100),
+                    rng.randint(0, 100),
+                    rng.random() * 100,
+                    rng.random() * 100,
+                    rng.random() * 100,
+                    rng.random() * 100,
+                    rng.randint(0, 100),
+                    rng.randint(0, 100),
+                ),
+            )
+        )
+    return cases
+
+
+def benchmark(cases, scale=1, passes=5):
+    """
+    Measures the steps per second of each plotter and of its array variant.
+
+    @return: dict of plotter name to steps per second, generated and as arrays
+    """
+    results = {}
+    for name in ("plot_line", "plot_quad_bezier", "plot_cubic_bezier"):
+        plot = getattr(ZinglPlotter, name)
+        plot_array = getattr(ZinglPlotter, f"{name}_array")
+        args = [[a * scale for a in c[1]] for c in cases if c[0] == name]
+        steps = 0
+        t = time.perf_counter()
+        for p in range(passes):
+            for a in args:
+                steps += sum(1 for _ in plot(*a))
+        generated = steps / (time.perf_counter() - t)
+        steps = 0
+        t = time.perf_counter()
+        for p in range(passes):
+            for a in args:
+                steps += len(plot_array(*a)[0])
+        arrays = steps / (time.perf_counter() - t)
+        results[name] = generated, arrays
+    return results
+
+
 class TestZingl(unittest.TestCase):
     def test_line(self):
         for x, y in ZinglPlotter.plot_line(0, 0, 100, 100):
@@ -122,3 +200,41 @@ class TestZingl(unittest.TestCase):
             plotter = ZinglPlotter()
             for plot in plotter.plot_arc(arc):
                 pass
+
+    def test_line_array(self):
+        """
+        The array line steps are the generated line steps.
+        """
+        for x0, y0 in ((0, 0), (17, -5)):
+            for x1 in range(-40, 41):
+                for y1 in range(-40, 41):
+                    x, y = ZinglPlotter.plot_line_array(x0, y0, x1, y1)
+                    self.assertEqual(
+                        list(zip(x.tolist(), y.tolist())),
+                        list(ZinglPlotter.plot_line(x0, y0, x1, y1)),
+                    )
+        x, y = ZinglPlotter.plot_line_array(0, 0, 65535, 12347)
+        self.assertEqual(
+            list(zip(x.tolist(), y.tolist())),
+            list(ZinglPlotter.plot_line(0, 0, 65535, 12347)),
+        )
+
+    def test_random_array(self):
+        """
+        The array steps of random test cases are the generated steps.
+        """
+        for name, args in zingl_cases(1000, seed=1):
+            x, y = getattr(ZinglPlotter, f"{name}_array")(*args)
+            self.assertEqual(
+                list(zip(x.tolist(), y.tolist())),
+                list(getattr(ZinglPlotter, name)(*args)),
+            )
+
+    def test_benchmark(self):
+        results = benchmark(zingl_cases(20, seed=2), passes=1)
+        self.assertEqual(len(results), 3)
+
+
+if __name__ == "__main__":
+    for name, (generated, arrays) in benchmark(zingl_cases(1000), scale=10).items():
+        print(f"{name}: {generated:.0f} steps/s generated, {arrays:.0f} steps/s arrays")